@@ -0,0 +1,69 @@
+# Measures the per-step cost of the evolving graph executor over the executable programs,
+# with the conditions compiled and interpreted
+import glob
+import re
+import time
+import json
+import sys
+sys.path.append('../simulation/')
+
+import evolving_graph.environment as environment
+import evolving_graph.utils as utils
+from evolving_graph.environment import EnvironmentGraph
+from evolving_graph.execution import ScriptExecutor
+from evolving_graph.scripts import read_script_from_list_string, ScriptParseException
+
+# Options
+max_programs = 500
+repetitions = 3
+
+# Paths
+original_program_folder = '../dataset/programs_processed_precond_nograb_morepreconds/'
+
+
+def load_programs():
+    """
+    :return: list of (script, init graph dict) of the executable programs
+    """
+    programs = []
+    program_files = sorted(glob.glob('{}/executable_programs/*/*/*.txt'.format(original_program_folder)))
+    for program_file in program_files[:max_programs]:
+        graph_file = program_file.replace('executable_programs', 'init_and_final_graphs').replace('.txt', '.json')
+        with open(program_file, 'r') as f:
+            # instances are written as (instance.node_id), the scripts are executed on node ids
+            lines = [re.sub(r'\((\d+)\.(\d+)\)', r'(\2)', x.strip()) for x in f.readlines()[4:]]
+        try:
+            script = read_script_from_list_string([x for x in lines if len(x) > 0])
+        except ScriptParseException:
+            continue
+        with open(graph_file, 'r') as f:
+            programs.append((script, json.load(f)['init_graph']))
+    return programs
+
+
+def time_steps(programs, name_equivalence):
+    """
+    :return: seconds per executed script line, best of the repetitions
+    """
+    graphs = [EnvironmentGraph(graph_dict) for _, graph_dict in programs]
+    num_steps = sum(len(script) for script, _ in programs)
+    best = None
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        for (script, _), graph in zip(programs, graphs):
+            ScriptExecutor(graph, name_equivalence).execute(script, w_graph_list=False)
+        elapsed = (time.perf_counter() - start) / num_steps
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    programs = load_programs()
+    name_equivalence = utils.load_name_equivalence()
+    print('Programs: {}, steps: {}'.format(len(programs), sum(len(script) for script, _ in programs)))
+    results = {}
+    for compile_conditions in [False, True]:
+        environment.compile_conditions = compile_conditions
+        results[compile_conditions] = time_steps(programs, name_equivalence)
+        print('compile_conditions={}: {:.1f} us/step'.format(compile_conditions, results[compile_conditions] * 1e6))
+    print('Speedup: {:.2f}x'.format(results[False] / results[True]))
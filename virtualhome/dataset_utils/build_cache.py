@@ -0,0 +1,42 @@
+# Builds the binary cache of a dataset: programs, preconditions and graphs are parsed once and pickled,
+# the dataset jobs using the same cache_dir then load them from the cache until the files change
+# Usage: python build_cache.py [graph files...]
+import glob
+import sys
+from tqdm import tqdm
+sys.path.append('../simulation/')
+
+import evolving_graph.common as common
+import evolving_graph.utils as utils
+from evolving_graph.scripts import read_script, ScriptParseException
+
+# Options
+cache_dir = '../dataset/cache'
+
+# Paths
+original_program_folder = '../dataset/programs_processed_precond_nograb_morepreconds/'
+
+
+def build_cache(program_folder, graph_files=()):
+    """
+    :return: number of files in the cache, number of programs that can not be parsed
+    """
+    program_files = sorted(glob.glob('{}/withoutconds/*/*.txt'.format(program_folder)))
+    json_files = sorted(glob.glob('{}/initstate/*/*.json'.format(program_folder)))
+    json_files += sorted(glob.glob('{}/init_and_final_graphs/*/*/*.json'.format(program_folder)))
+    json_files += list(graph_files)
+    not_parsable = 0
+    for program_file in tqdm(program_files):
+        try:
+            read_script(program_file)
+        except ScriptParseException:
+            not_parsable += 1
+    for json_file in tqdm(json_files):
+        utils.load_json(json_file)
+    return len(program_files) + len(json_files) - not_parsable, not_parsable
+
+
+if __name__ == '__main__':
+    common.enable_cache(cache_dir)
+    num_files, not_parsable = build_cache(original_program_folder, sys.argv[1:])
+    print('Cached files: {}, programs that can not be parsed: {}'.format(num_files, not_parsable))
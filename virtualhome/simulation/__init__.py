@@ -1,3 +1,3 @@
-""" from . import evolving_graph
-from . import unity_simulator
+""" from . import evolving_graph
+from . import unity_simulator
 from . import environment """
\ No newline at end of file
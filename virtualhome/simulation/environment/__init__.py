@@ -1 +1,3 @@
-from .unity_environment import UnityEnvironment
+from .unity_environment import UnityEnvironment
+from .unity_environment_pool import UnityEnvironmentPool
+from .image_observations import ImageObservations, SharedImageFrames
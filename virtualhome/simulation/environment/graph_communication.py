@@ -0,0 +1,195 @@
+from collections import OrderedDict
+import copy
+import random
+
+from . import utils as utils_environment
+from evolving_graph import common
+from evolving_graph import utils
+from evolving_graph.environment import EnvironmentGraph, EnvironmentState
+from evolving_graph.execution import ScriptExecutor
+from evolving_graph.scripts import Script, parse_script_line
+
+# Actions of the step scripts named differently in the evolving graph, and actions without symbolic effects
+_ACTION_NAMES = {'walktowards': 'walk', 'put': 'putback'}
+_NO_EFFECT_ACTIONS = {'turnleft', 'turnright', 'walkforward'}
+
+_EMPTY_GRAPH = {'nodes': [], 'edges': []}
+
+
+class GraphCommunication(object):
+    """
+    Simulator-free stand-in of UnityCommunication for symbolic observations. The scripts of render_script are
+    executed on an evolving graph EnvironmentState, and environment_graph returns its graph. It has the commands
+    used by UnityEnvironment to reset, step and get 'partial' or 'full' observations, there are no images.
+
+    :param dict scenes: map: environment id -> graph dictionary, the scenes loaded by reset, not changed afterwards
+    :param name_equivalence: class name equivalence of the executor, loaded from the resources if None
+    :param int seed: seed of the rooms of the characters added without initial_room
+    :param int max_prepared_scenes: number of scenes kept, the graphs loaded by reset, expand_scene and
+        add_character are built once for the same environment id and commands since the reset
+    """
+
+    def __init__(self, scenes=None, name_equivalence=None, seed=None, max_prepared_scenes=16):
+        self.scenes = {} if scenes is None else scenes
+        self.name_equivalence = utils.load_name_equivalence() if name_equivalence is None else name_equivalence
+        self.rnd = random.Random(seed)
+        self.max_prepared_scenes = max_prepared_scenes
+        # map: commands since the reset -> (graph, node dictionaries, EnvironmentState, snapshot of the state)
+        self._prepared_scenes = OrderedDict()
+        self._scene_key = None  # commands since the reset, None once a script changed the scene
+        self._load(_EMPTY_GRAPH)
+
+    def _load(self, graph, key=None):
+        """
+        Loads graph, or the scene prepared by the commands key
+        :param graph: the graph dictionary, or a function returning it
+        """
+        scene = None if key is None else self._prepared_scenes.get(key)
+        if scene is None:
+            graph = graph() if callable(graph) else graph
+            state = EnvironmentState(EnvironmentGraph(graph), self.name_equivalence, instance_selection=True)
+            scene = (graph, {node['id']: node for node in graph['nodes']}, state, state.snapshot())
+            if key is not None and self.max_prepared_scenes > 0:
+                self._prepared_scenes[key] = scene
+                if len(self._prepared_scenes) > self.max_prepared_scenes:
+                    self._prepared_scenes.popitem(last=False)
+        else:
+            self._prepared_scenes.move_to_end(key)
+        graph, self._node_dicts, self._state, snapshot = scene
+        # the scenes and the prepared graphs are kept, environment_graph gives a copy
+        self._graph = copy.deepcopy(graph)
+        self._state.restore(snapshot)
+        self._scene_key = key
+
+    def close(self):
+        pass
+
+    def batch(self):
+        return _GraphCommandBatch(self)
+
+    def reset(self, environment=None):
+        scene = self.scenes.get(environment, _EMPTY_GRAPH)
+        self._load(scene, (('reset', environment),) if self.max_prepared_scenes > 0 else None)
+        return True
+
+    def fast_reset(self, environment=None):
+        return self.reset(environment)
+
+    def environment_graph(self):
+        if self._graph is None:
+            self._graph = graph_dict(self._state, self._node_dicts)
+        return True, self._graph
+
+    def expand_scene(self, new_graph, **kwargs):
+        def scene_graph():
+            # the characters are added with add_character
+            char_ids = {node['id'] for node in new_graph['nodes'] if node['class_name'] == 'character'}
+            return {'nodes': [node for node in new_graph['nodes'] if node['id'] not in char_ids],
+                    'edges': [edge for edge in new_graph['edges']
+                              if edge['from_id'] not in char_ids and edge['to_id'] not in char_ids]}
+        key = None
+        if self._scene_key is not None:
+            key = self._scene_key + (('expand_scene', utils_environment.graph_hash(new_graph)),)
+        self._load(scene_graph, key)
+        return True, {}
+
+    def camera_count(self):
+        return True, 0
+
+    def add_character(self, character_resource='Chars/Male1', position=None, initial_room=""):
+        """
+        Adds a character, with the id of the characters of the simulator (1 for the first one), inside initial_room
+        or a random room. The graph has no coordinates, a position can not be given
+        """
+        if position is not None:
+            raise ValueError('GraphCommunication can not add a character at a position, use initial_room')
+        _, graph = self.environment_graph()
+        char_id = len(list(self._state.get_nodes_by_attr('class_name', 'character'))) + 1
+        if self._state.get_node(char_id) is not None:
+            return False
+        rooms = [node['id'] for node in graph['nodes'] if node['category'] == 'Rooms' and
+                 (len(initial_room) == 0 or node['class_name'] == initial_room)]
+        if len(rooms) == 0:
+            return False
+        room = self.rnd.choice(rooms)
+        char_node = {'id': char_id, 'class_name': 'character', 'category': 'Characters', 'properties': [],
+                     'states': [], 'prefab_name': character_resource.split('/')[-1], 'bounding_box': None}
+        char_edge = {'from_id': char_id, 'relation_type': 'INSIDE', 'to_id': room}
+        key = None
+        if self._scene_key is not None:
+            key = self._scene_key + (('add_character', character_resource, room),)
+        self._load(lambda: {'nodes': graph['nodes'] + [char_node], 'edges': graph['edges'] + [char_edge]}, key)
+        return True
+
+    def render_script(self, script, **kwargs):
+        """
+        Executes the first script of the list, of the form `<char{id}> [{Action}] <{object_name}> ({object_id})|...`,
+        the lines of the agents that can not be executed do not change the graph
+
+        :return: pair success (bool), message: (str) the errors of the lines that can not be executed
+        """
+        state = self._state
+        messages = []
+        for agent_script in script[0].split('|'):
+            char_string, line = agent_script.split(' ', 1)
+            action = line[1:line.index(']')].lower()
+            if action in _NO_EFFECT_ACTIONS:
+                continue
+            line = '[{}]{}'.format(_ACTION_NAMES.get(action, action), line[line.index(']') + 1:])
+            executor = ScriptExecutor(None, self.name_equivalence, int(char_string[len('<char'):-1]))
+            try:
+                script_line = parse_script_line(line, 0)
+                missing = missing_objects(state, script_line)
+                if len(missing) > 0:
+                    # the simulator does not execute the lines of objects it does not have
+                    success, message = False, 'no object {}'.format(', '.join(str(obj) for obj in missing))
+                else:
+                    success, state = executor.execute_one_step(Script([script_line]), state)
+                    message = executor.info.get_error_string()
+            except common.Error as e:
+                success, message = False, str(e)
+            if not success:
+                messages.append('{}: {}'.format(agent_script, message))
+        if state is not self._state:
+            self._state = state
+            self._graph = None
+            self._scene_key = None
+        return len(messages) == 0, ', '.join(messages)
+
+
+class _GraphCommandBatch(object):
+    # the commands are executed when they are queued
+
+    def __init__(self, comm):
+        self._comm = comm
+        self._results = []
+
+    def __getattr__(self, name):
+        method = getattr(self._comm, name)
+
+        def call(*args, **kwargs):
+            self._results.append(method(*args, **kwargs))
+        return call
+
+    def send(self):
+        results = self._results
+        self._results = []
+        return results
+
+
+def missing_objects(state, script_line):
+    """
+    :return: the objects of script_line whose ids are not nodes of state
+    """
+    return [obj for obj in script_line.parameters if state.get_node(obj.instance) is None]
+
+
+def graph_dict(state, node_dicts):
+    """
+    :param node_dicts: map: node id -> node dictionary, whose fields other than the states are kept
+    :return: graph dictionary of an EnvironmentState
+    """
+    graph = state.to_dict()
+    graph['nodes'] = [dict(node_dicts[node['id']], states=node['states']) if node['id'] in node_dicts else node
+                      for node in graph['nodes']]
+    return graph
@@ -0,0 +1,89 @@
+from multiprocessing import shared_memory
+import numpy as np
+
+
+class ImageObservations(object):
+    """
+    Image observations of all the agents of a UnityEnvironment. The cameras of the agents are requested in
+    one camera_image call per frame and decoded into a ring of ring_size frames in shared memory, so that
+    other processes (started with multiprocessing) can read them without copies with
+    SharedImageFrames(*observations.spec()).
+    A frame is overwritten ring_size frames later, readers must be done with it by then.
+
+    :param env: the UnityEnvironment
+    :param int ring_size: number of frames kept
+    :param str mode: camera rendering mode, see `UnityCommunication.camera_image`
+    :param channels: channels of the images of the mode (1 for the depth)
+    :param dtype: type of the pixels of the mode
+    """
+
+    def __init__(self, env, ring_size=4, image_width=None, image_height=None, mode='normal', channels=3,
+                 dtype=np.uint8):
+        self.env = env
+        self.mode = mode
+        self.image_width = env.default_image_width if image_width is None else image_width
+        self.image_height = env.default_image_height if image_height is None else image_height
+        shape = (ring_size, env.num_agents, self.image_height, self.image_width, channels)
+        dtype = np.dtype(dtype)
+        self._shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)) * dtype.itemsize)
+        self.frames = np.ndarray(shape, dtype, buffer=self._shm.buf)
+        self.frame_index = -1
+
+    def spec(self):
+        """
+        :return: (shared memory name, shape, dtype name) of the frames, the arguments of SharedImageFrames
+        """
+        return self._shm.name, self.frames.shape, self.frames.dtype.str
+
+    def next_frame(self):
+        """
+        Renders the cameras of all the agents into the next frame of the ring
+
+        :return: pair frame_index (int), images: array (num_agents, height, width, channels), a view of the frame
+        """
+        env = self.env
+        camera_ids = [env.num_static_cameras + agent_id * env.num_camera_per_agent + env.CAMERA_NUM
+                      for agent_id in range(env.num_agents)]
+        frame = self.frames[(self.frame_index + 1) % len(self.frames)]
+        s, images = env.comm.camera_image(camera_ids, mode=self.mode, image_width=self.image_width,
+                                          image_height=self.image_height, out=frame)
+        if not s:
+            raise RuntimeError('camera_image failed')
+        self.frame_index += 1
+        return self.frame_index, frame
+
+    def close(self):
+        self.frames = None
+        self._shm.close()
+        self._shm.unlink()
+
+
+class SharedImageFrames(object):
+    """
+    Reads the frames of an ImageObservations from another process
+
+    :param str name, shape, dtype: as given by `ImageObservations.spec`
+    """
+
+    def __init__(self, name, shape, dtype):
+        self._shm = _attach_shared_memory(name)
+        self.frames = np.ndarray(shape, np.dtype(dtype), buffer=self._shm.buf)
+
+    def frame(self, frame_index):
+        """
+        :return: array (num_agents, height, width, channels), a view of the frame
+        """
+        return self.frames[frame_index % len(self.frames)]
+
+    def close(self):
+        self.frames = None
+        self._shm.close()
+
+
+def _attach_shared_memory(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # before python 3.13 the memory is tracked by the resource tracker of the process, which is the one
+        # of the creator for the processes started with multiprocessing
+        return shared_memory.SharedMemory(name=name)
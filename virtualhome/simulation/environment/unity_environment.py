@@ -1,275 +1,510 @@
-from .base_environment import BaseEnvironment
-import sys
-import os
-
-curr_dir = os.path.dirname(os.path.realpath(__file__))
-sys.path.append(f'{curr_dir}/../')
-
-from unity_simulator import comm_unity as comm_unity
-from . import utils as utils_environment
-from evolving_graph import utils
-import atexit
-import random
-import pdb
-import ipdb
-import random
-import json
-import numpy as np
-
-class UnityEnvironment(BaseEnvironment):
-
-
-    def __init__(self,
-                 num_agents=2,
-                 max_episode_length=200,
-                 observation_types=None,
-                 use_editor=False,
-                 base_port=8080,
-                 port_id=0,
-                 executable_args={},
-                 recording_options={'recording': False, 
-                                    'output_folder': None, 
-                                    'file_name_prefix': None,
-                                    'cameras': 'PERSON_FROM_BACK',
-                                    'modality': 'normal'},
-                 seed=123):
-
-
-        self.seed = seed
-        self.prev_reward = 0.
-        self.rnd = random.Random(seed)
-        np.random.seed(seed)
-
-
-        self.steps = 0
-        self.env_id = None
-        self.max_ids = {}
-
-
-        self.num_agents = num_agents
-        self.max_episode_length = max_episode_length
-        self.actions_available = [
-            'turnleft',
-            'walkforward',
-            'turnright',
-            'walktowards',
-            'open',
-            'close',
-            'put',
-            'grab',
-            'no_action'
-        ]
-
-        self.recording_options = recording_options
-        self.base_port = base_port
-        self.port_id = port_id
-        self.executable_args = executable_args
-
-        # Observation parameters
-        self.num_camera_per_agent = 6
-        self.CAMERA_NUM = 1  # 0 TOP, 1 FRONT, 2 LEFT..
-        self.default_image_width = 300
-        self.default_image_height = 300
-
-        if observation_types is not None:
-            self.observation_types = observation_types
-        else:
-            self.observation_types = ['partial' for _ in range(num_agents)]
-
-        
-        self.agent_info = {
-            0: 'Chars/Female1',
-            1: 'Chars/Male1'
-        }
-        
-
-        self.changed_graph = True
-        self.rooms = None
-        self.id2node = None
-        self.num_static_cameras = None
-
-
-        if use_editor:
-            # Use Unity Editor
-            self.port_number = 8080
-            self.comm = comm_unity.UnityCommunication()
-        else:
-            # Launch the executable
-            self.port_number = self.base_port + port_id
-            # ipdb.set_trace()
-            self.comm = comm_unity.UnityCommunication(port=str(self.port_number), **self.executable_args)
-
-        atexit.register(self.close)
-        self.reset()
-
-
-
-
-    def close(self):
-        self.comm.close()
-
-    def relaunch(self):
-        self.comm.close()
-        self.comm = comm_unity.UnityCommunication(port=str(self.port_number), **self.executable_args)
-
-    def reward(self):
-        # Define here your reward
-        reward = 0
-        done = False
-        info = {}
-        return reward, done, info
-
-    def step(self, action_dict):
-        script_list = utils_environment.convert_action(action_dict)
-        if len(script_list[0]) > 0:
-            if self.recording_options['recording']:
-                success, message = self.comm.render_script(script_list,
-                                                           recording=True,
-                                                           skip_animation=False,
-                                                           camera_mode=self.recording_options['cameras'],
-                                                           file_name_prefix='task_{}'.format(self.task_id),
-                                                           image_synthesis=self.recording_optios['modality'])
-            else:
-                success, message = self.comm.render_script(script_list,
-                                                           recording=False,
-                                                           skip_animation=True)
-            if not success:
-                print(message)
-            else:
-                self.changed_graph = True
-
-        # Obtain reward
-        reward, done, info = self.reward()
-
-        graph = self.get_graph()
-        self.steps += 1
-        
-        obs = self.get_observations()
-        
-
-        info['finished'] = done
-        info['graph'] = graph
-        if self.steps == self.max_episode_length:
-            done = True
-        return obs, reward, done, info
-
-    def reset(self, environment_graph=None, environment_id=None, init_rooms=None):
-        """
-        :param environment_graph: the initial graph we should reset the environment with
-        :param environment_id: which id to start
-        :param init_rooms: where to intialize the agents
-        """
-        self.env_id = environment_id
-        print("Resetting env", self.env_id)
-
-        if self.env_id is not None:
-            self.comm.reset(self.env_id)
-        else:
-            self.comm.reset()
-
-        s,g = self.comm.environment_graph()
-        if self.env_id not in self.max_ids.keys():
-            max_id = max([node['id'] for node in g['nodes']])
-            self.max_ids[self.env_id] = max_id
-
-        max_id = self.max_ids[self.env_id]
-        #print(max_id)
-        if environment_graph is not None:
-            # TODO: this should be modified to extend well
-            # updated_graph = utils.separate_new_ids_graph(environment_graph, max_id)
-            updated_graph = environment_graph
-            success, m = self.comm.expand_scene(updated_graph)
-        else:
-            success = True
-
-        if not success:
-            print("Error expanding scene")
-            pdb.set_trace()
-            return None
-        self.num_static_cameras = self.comm.camera_count()[1]
-
-        if init_rooms is None or init_rooms[0] not in ['kitchen', 'bedroom', 'livingroom', 'bathroom']:
-            rooms = self.rnd.sample(['kitchen', 'bedroom', 'livingroom', 'bathroom'], 2)
-        else:
-            rooms = list(init_rooms)
-
-        for i in range(self.num_agents):
-            if i in self.agent_info:
-                self.comm.add_character(self.agent_info[i], initial_room=rooms[i])
-            else:
-                self.comm.add_character()
-
-        _, self.init_unity_graph = self.comm.environment_graph()
-
-
-        self.changed_graph = True
-        graph = self.get_graph()
-        self.rooms = [(node['class_name'], node['id']) for node in graph['nodes'] if node['category'] == 'Rooms']
-        self.id2node = {node['id']: node for node in graph['nodes']}
-
-        obs = self.get_observations()
-        self.steps = 0
-        self.prev_reward = 0.
-        return obs
-
-    def get_graph(self):
-        if self.changed_graph:
-            s, graph = self.comm.environment_graph()
-            if not s:
-                pdb.set_trace()
-            self.graph = graph
-            self.changed_graph = False
-        return self.graph
-
-    def get_observations(self):
-        dict_observations = {}
-        for agent_id in range(self.num_agents):
-            obs_type = self.observation_types[agent_id]
-            dict_observations[agent_id] = self.get_observation(agent_id, obs_type)
-        return dict_observations
-
-    def get_action_space(self):
-        dict_action_space = {}
-        for agent_id in range(self.num_agents):
-            if self.observation_types[agent_id] not in ['partial', 'full']:
-                raise NotImplementedError
-            else:
-                # Even if you can see all the graph, you can only interact with visible objects
-                obs_type = 'partial'
-            visible_graph = self.get_observation(agent_id, obs_type)
-            dict_action_space[agent_id] = [node['id'] for node in visible_graph['nodes']]
-        return dict_action_space
-
-    def get_observation(self, agent_id, obs_type, info={}):
-        if obs_type == 'partial':
-            # agent 0 has id (0 + 1)
-            curr_graph = self.get_graph()
-            return utils.get_visible_nodes(curr_graph, agent_id=(agent_id+1))
-
-        elif obs_type == 'full':
-            return self.get_graph()
-
-        elif obs_type == 'visible':
-            # Only objects in the field of view of the agent
-            raise NotImplementedError
-
-        elif obs_type == 'image':
-            camera_ids = [self.num_static_cameras + agent_id * self.num_camera_per_agent + self.CAMERA_NUM]
-            if 'image_width' in info:
-                image_width = info['image_width']
-                image_height = info['image_height']
-            else:
-                image_width, image_height = self.default_image_width, self.default_image_height
-            if 'mode' in info:
-                current_mode = info['mode']
-            else:
-                current_mode = 'normal'
-            s, images = self.comm.camera_image(camera_ids, mode=current_mode, image_width=image_width, image_height=image_height)
-            if not s:
-                pdb.set_trace()
-            return images[0]
-        else:
-            raise NotImplementedError
-
-
-        
+from .base_environment import BaseEnvironment
+import sys
+import os
+
+curr_dir = os.path.dirname(os.path.realpath(__file__))
+sys.path.append(f'{curr_dir}/../')
+
+from unity_simulator import comm_unity as comm_unity
+from . import utils as utils_environment
+from .graph_communication import GraphCommunication, graph_dict, missing_objects
+from evolving_graph import utils
+from evolving_graph import common
+from evolving_graph.environment import EnvironmentGraph, EnvironmentState
+from evolving_graph.execution import ScriptExecutor
+from evolving_graph.scripts import Script, parse_script_line
+from collections import OrderedDict
+import atexit
+import copy
+import random
+import pdb
+import ipdb
+import random
+import json
+import numpy as np
+
+# Errors of the evolving graph on the actions and graphs it does not model, the graph is then fetched instead of
+# predicted
+_PREDICTION_ERRORS = (common.Error, KeyError)
+
+
+class UnityEnvironment(BaseEnvironment):
+
+
+    def __init__(self,
+                 num_agents=2,
+                 max_episode_length=200,
+                 observation_types=None,
+                 use_editor=False,
+                 base_port=8080,
+                 port_id=0,
+                 executable_args={},
+                 recording_options={'recording': False, 
+                                    'output_folder': None, 
+                                    'file_name_prefix': None,
+                                    'cameras': 'PERSON_FROM_BACK',
+                                    'modality': 'normal'},
+                 seed=123,
+                 graph_resync_steps=None,
+                 backend='unity',
+                 max_prepared_scenes=0,
+                 simulator_pool=None):
+
+
+        self.seed = seed
+        self.prev_reward = 0.
+        self.rnd = random.Random(seed)
+        np.random.seed(seed)
+
+
+        self.steps = 0
+        self.env_id = None
+        self.max_ids = {}
+
+
+        self.num_agents = num_agents
+        self.max_episode_length = max_episode_length
+        self.actions_available = [
+            'turnleft',
+            'walkforward',
+            'turnright',
+            'walktowards',
+            'open',
+            'close',
+            'put',
+            'grab',
+            'no_action'
+        ]
+
+        self.recording_options = recording_options
+        self.base_port = base_port
+        self.port_id = port_id
+        self.executable_args = executable_args
+
+        # Observation parameters
+        self.num_camera_per_agent = 6
+        self.CAMERA_NUM = 1  # 0 TOP, 1 FRONT, 2 LEFT..
+        self.default_image_width = 300
+        self.default_image_height = 300
+        # if set, an ImageObservations giving the 'image' observations of all the agents in one request, the
+        # 'image' observation of an agent is then (frame index, view of its image in the frame)
+        self.image_observations = None
+        self._image_frame = None  # (frame index, images) rendered since the last step or reset
+
+        if observation_types is not None:
+            self.observation_types = observation_types
+        else:
+            self.observation_types = ['partial' for _ in range(num_agents)]
+
+        
+        self.agent_info = {
+            0: 'Chars/Female1',
+            1: 'Chars/Male1'
+        }
+        
+
+        self.changed_graph = True
+        self.rooms = None
+        self.id2node = None
+        # containment indexes of the current graph, shared by the partial observations of the agents
+        self.visibility_index = None
+        self.num_static_cameras = None
+
+        # If set, the graph after a step is predicted by executing its script on the evolving graph, and
+        # fetched from the simulator only every graph_resync_steps steps or when the prediction fails.
+        # The predicted graphs keep the bounding boxes and transforms of the last fetched graph. The graphs
+        # taken from the prepared scenes of the resets are counted as 'prepared'
+        self.graph_resync_steps = graph_resync_steps
+        self.graph_sync_counters = {'predicted': 0, 'fetched': 0, 'prepared': 0, 'checked': 0, 'mismatches': 0}
+        self.name_equivalence = None
+        self._graph_state = None  # EnvironmentState of self.graph, built when predicting
+        self._predicted_state = None
+        self._predicted_graph = None
+        self._steps_since_sync = 0
+
+        # If > 0, the graph and camera count after the reset of up to max_prepared_scenes (environment id, initial
+        # graph, rooms of the agents) are kept, and a reset with them does not fetch them again. The scene is then
+        # reloaded with fast_reset when it is the one of the last reset
+        self.max_prepared_scenes = max_prepared_scenes
+        # map: (environment id, graph hash, rooms) -> (num_static_cameras, graph, EnvironmentState, state snapshot)
+        self.prepared_scenes = OrderedDict()
+        self._prepared_scene_key = None
+        self._prepared_scene = None
+        self._reset_commands = []
+        self._loaded_env_id = None
+        self._scene_loaded = False
+
+
+        # 'unity' runs the scripts in the simulator, 'graph' on the evolving graph, with executable_args
+        # the arguments of GraphCommunication. In graph mode the first reset gives the scene
+        self.backend = backend
+        # With a SimulatorPool, the simulator is leased from the pool instead of launched, and relaunch
+        # fails over to another simulator of the pool
+        self.simulator_pool = simulator_pool
+        self.simulator_lease = None
+        if backend == 'graph':
+            visual_types = sorted(set(self.observation_types) - {'partial', 'full'})
+            if len(visual_types) > 0:
+                raise ValueError("The graph backend has only the 'partial' and 'full' observations, not {}".format(
+                    ', '.join(visual_types)))
+            self.port_number = None
+            self.comm = GraphCommunication(**self.executable_args)
+        elif simulator_pool is not None:
+            self.simulator_lease = simulator_pool.acquire()
+            self.port_number = self.simulator_lease.port
+            self.comm = comm_unity.UnityCommunication(port=str(self.port_number),
+                                                      **dict(self.executable_args, file_name=None))
+        elif use_editor:
+            # Use Unity Editor
+            self.port_number = 8080
+            self.comm = comm_unity.UnityCommunication()
+        else:
+            # Launch the executable
+            self.port_number = self.base_port + port_id
+            # ipdb.set_trace()
+            self.comm = comm_unity.UnityCommunication(port=str(self.port_number), **self.executable_args)
+
+        atexit.register(self.close)
+        if backend != 'graph':
+            self.reset()
+
+
+
+
+    def close(self):
+        self.comm.close()
+        if self.simulator_lease is not None:
+            self.simulator_lease.release()
+            self.simulator_lease = None
+
+    def relaunch(self):
+        self.comm.close()
+        self._scene_loaded = False
+        if self.backend == 'graph':
+            self.comm = GraphCommunication(**self.executable_args)
+        elif self.simulator_pool is not None:
+            self.simulator_lease = self.simulator_pool.failover(self.simulator_lease)
+            self.port_number = self.simulator_lease.port
+            self.comm = comm_unity.UnityCommunication(port=str(self.port_number),
+                                                      **dict(self.executable_args, file_name=None))
+        else:
+            self.comm = comm_unity.UnityCommunication(port=str(self.port_number), **self.executable_args)
+
+    def reward(self):
+        # Define here your reward
+        reward = 0
+        done = False
+        info = {}
+        return reward, done, info
+
+    def step(self, action_dict):
+        batch = self.comm.batch()
+        self.queue_step(batch, action_dict)
+        return self.finish_step(batch.send())
+
+    def queue_step(self, batch, action_dict):
+        """
+        Queues the commands of a step in batch, `finish_step` completes the step with their results
+        """
+        script_list = utils_environment.convert_action(action_dict)
+        self._predicted_graph = None
+        if len(script_list[0]) > 0:
+            # the script and the graph after it are sent in one batch
+            if self.recording_options['recording']:
+                batch.render_script(script_list,
+                                    recording=True,
+                                    skip_animation=False,
+                                    camera_mode=self.recording_options['cameras'],
+                                    file_name_prefix='task_{}'.format(self.task_id),
+                                    image_synthesis=self.recording_optios['modality'])
+            else:
+                batch.render_script(script_list,
+                                    recording=False,
+                                    skip_animation=True)
+            if self.graph_resync_steps is not None:
+                self._predict_graph(script_list[0])
+            if self._predicted_graph is None or self._steps_since_sync + 1 >= self.graph_resync_steps:
+                batch.environment_graph()
+
+    def finish_step(self, results):
+        self._image_frame = None
+        if len(results) > 0:
+            success, message = results[0]
+            if not success:
+                print(message)
+            if len(results) > 1:
+                if self._predicted_graph is not None:
+                    self.graph_sync_counters['checked'] += 1
+                    if _graph_relations(self._predicted_graph) != _graph_relations(results[1][1]):
+                        self.graph_sync_counters['mismatches'] += 1
+                self.set_graph(*results[1])
+            elif success:
+                self.graph = self._predicted_graph
+                self.visibility_index = None
+                self._graph_state = self._predicted_state
+                self._steps_since_sync += 1
+                self.graph_sync_counters['predicted'] += 1
+            else:
+                # the simulator did not execute the script, unlike the prediction
+                self.graph_sync_counters['mismatches'] += 1
+                self.changed_graph = True
+
+        # Obtain reward
+        reward, done, info = self.reward()
+
+        graph = self.get_graph()
+        self.steps += 1
+        
+        obs = self.get_observations()
+        
+
+        info['finished'] = done
+        info['graph'] = graph
+        if self.steps == self.max_episode_length:
+            done = True
+        return obs, reward, done, info
+
+    def reset(self, environment_graph=None, environment_id=None, init_rooms=None):
+        """
+        :param environment_graph: the initial graph we should reset the environment with
+        :param environment_id: which id to start
+        :param init_rooms: where to intialize the agents
+        """
+        batch = self.comm.batch()
+        self.queue_reset(batch, environment_graph, environment_id, init_rooms)
+        return self.finish_reset(batch.send())
+
+    def queue_reset(self, batch, environment_graph=None, environment_id=None, init_rooms=None):
+        """
+        Queues the commands of a reset in batch, `finish_reset` completes the reset with their results
+        """
+        self.env_id = environment_id
+        print("Resetting env", self.env_id)
+
+        if init_rooms is None or init_rooms[0] not in ['kitchen', 'bedroom', 'livingroom', 'bathroom']:
+            rooms = self.rnd.sample(['kitchen', 'bedroom', 'livingroom', 'bathroom'], 2)
+        else:
+            rooms = list(init_rooms)
+
+        self._prepared_scene_key = self._prepared_scene = None
+        if self.max_prepared_scenes > 0:
+            self._prepared_scene_key = (self.env_id, utils_environment.graph_hash(environment_graph), tuple(rooms))
+            self._prepared_scene = self.prepared_scenes.get(self._prepared_scene_key)
+
+        # all the commands of the reset are sent in one batch, _reset_commands names their results
+        commands = self._reset_commands = []
+        if self.max_prepared_scenes > 0 and self._scene_loaded and self._loaded_env_id == self.env_id:
+            batch.fast_reset(self.env_id)
+        elif self.env_id is not None:
+            batch.reset(self.env_id)
+        else:
+            batch.reset()
+        commands.append('reset')
+
+        if self.env_id not in self.max_ids:
+            batch.environment_graph()
+            commands.append('scene_graph')
+        if environment_graph is not None:
+            # TODO: this should be modified to extend well
+            # updated_graph = utils.separate_new_ids_graph(environment_graph, max_id)
+            updated_graph = environment_graph
+            batch.expand_scene(updated_graph)
+            commands.append('expand_scene')
+        if self._prepared_scene is None:
+            batch.camera_count()
+            commands.append('camera_count')
+
+        for i in range(self.num_agents):
+            if i in self.agent_info:
+                batch.add_character(self.agent_info[i], initial_room=rooms[i])
+            else:
+                batch.add_character()
+            commands.append('add_character')
+
+        if self._prepared_scene is None:
+            batch.environment_graph()
+            commands.append('graph')
+
+    def finish_reset(self, results):
+        self._image_frame = None
+        results = dict(zip(self._reset_commands, results))
+        if 'scene_graph' in results:
+            s, g = results['scene_graph']
+            self.max_ids[self.env_id] = max([node['id'] for node in g['nodes']], default=0)
+
+        max_id = self.max_ids[self.env_id]
+        #print(max_id)
+        if 'expand_scene' in results:
+            success, m = results['expand_scene']
+        else:
+            success = True
+
+        if not success:
+            print("Error expanding scene")
+            pdb.set_trace()
+            return None
+        self._loaded_env_id = self.env_id
+        self._scene_loaded = True
+
+        if self._prepared_scene is None:
+            self.num_static_cameras = results['camera_count'][1]
+            self.set_graph(*results['graph'])
+            if self._prepared_scene_key is not None:
+                state = snapshot = None
+                if self.graph_resync_steps is not None:
+                    try:
+                        self._predict_graph_state()
+                        state, snapshot = self._graph_state, self._graph_state.snapshot()
+                    except _PREDICTION_ERRORS:
+                        # graph elements that the evolving graph does not have
+                        pass
+                # the prepared graph is a copy, self.graph is given to the callers that may change it
+                self.prepared_scenes[self._prepared_scene_key] = (self.num_static_cameras, copy.deepcopy(self.graph),
+                                                                  state, snapshot)
+                if len(self.prepared_scenes) > self.max_prepared_scenes:
+                    self.prepared_scenes.popitem(last=False)
+        else:
+            self.prepared_scenes.move_to_end(self._prepared_scene_key)
+            self.num_static_cameras, graph, state, snapshot = self._prepared_scene
+            self.set_graph(True, copy.deepcopy(graph), counter='prepared')
+            if state is not None:
+                # the steps predict the graph from the state of the prepared scene, restored without rebuilding it
+                state.restore(snapshot)
+                self._graph_state = state
+        self.init_unity_graph = self.graph
+
+        graph = self.get_graph()
+        self.rooms = [(node['class_name'], node['id']) for node in graph['nodes'] if node['category'] == 'Rooms']
+        self.id2node = {node['id']: node for node in graph['nodes']}
+
+        obs = self.get_observations()
+        self.steps = 0
+        self.prev_reward = 0.
+        return obs
+
+    def get_graph(self):
+        if self.changed_graph:
+            self.set_graph(*self.comm.environment_graph())
+        return self.graph
+
+    def set_graph(self, success, graph, counter='fetched'):
+        """
+        Sets the current graph, as returned by `environment_graph`
+
+        :param str counter: the graph_sync_counters entry counting the graph
+        """
+        if not success:
+            pdb.set_trace()
+        self.graph = graph
+        self.visibility_index = None
+        self.changed_graph = False
+        self._graph_state = None
+        self._steps_since_sync = 0
+        self.graph_sync_counters[counter] += 1
+
+    def _predict_graph(self, script):
+        """
+        Executes a step script, of the form `<char{id}> [{Action}] <{object_name}> ({object_id})|...`, on the
+        current graph. Sets _predicted_graph, to None if the script can not be executed
+        """
+        self._predicted_state = self._predicted_graph = None
+        if self.changed_graph:
+            return
+        try:
+            self._predict_graph_state()
+            state = self._graph_state
+            for agent_script in script.split('|'):
+                char_string, line = agent_script.split(' ', 1)
+                script_line = parse_script_line(line, 0)
+                if len(missing_objects(state, script_line)) > 0:
+                    # the simulator does not execute the lines of objects it does not have, its graph is fetched
+                    return
+                executor = ScriptExecutor(None, self.name_equivalence, int(char_string[len('<char'):-1]))
+                success, state = executor.execute_one_step(Script([script_line]), state)
+                if not success:
+                    return
+        except _PREDICTION_ERRORS:
+            # actions or graph elements that the evolving graph does not have, the graph is fetched
+            return
+        self._predicted_state = state
+        self._predicted_graph = graph_dict(state, {node['id']: node for node in self.graph['nodes']})
+
+    def _predict_graph_state(self):
+        # builds the EnvironmentState of the graph, from which the graphs are predicted
+        if self.name_equivalence is None:
+            self.name_equivalence = utils.load_name_equivalence()
+        if self._graph_state is None:
+            self._graph_state = EnvironmentState(EnvironmentGraph(self.graph), self.name_equivalence,
+                                                 instance_selection=True)
+
+    def get_observations(self):
+        dict_observations = {}
+        image_frame = None
+        if self.image_observations is not None and 'image' in self.observation_types:
+            # the frame is rendered once per step, for the first observations asked
+            if self._image_frame is None:
+                self._image_frame = self.image_observations.next_frame()
+            image_frame = self._image_frame
+        for agent_id in range(self.num_agents):
+            obs_type = self.observation_types[agent_id]
+            if obs_type == 'image' and image_frame is not None:
+                frame_index, images = image_frame
+                dict_observations[agent_id] = (frame_index, images[agent_id])
+            else:
+                dict_observations[agent_id] = self.get_observation(agent_id, obs_type)
+        return dict_observations
+
+    def get_action_space(self):
+        dict_action_space = {}
+        for agent_id in range(self.num_agents):
+            if self.observation_types[agent_id] not in ['partial', 'full']:
+                raise NotImplementedError
+            else:
+                # Even if you can see all the graph, you can only interact with visible objects
+                obs_type = 'partial'
+            visible_graph = self.get_observation(agent_id, obs_type)
+            dict_action_space[agent_id] = [node['id'] for node in visible_graph['nodes']]
+        return dict_action_space
+
+    def get_observation(self, agent_id, obs_type, info={}):
+        if obs_type == 'partial':
+            # agent 0 has id (0 + 1)
+            curr_graph = self.get_graph()
+            if self.visibility_index is None:
+                self.visibility_index = utils.VisibilityIndex(curr_graph)
+            return utils.get_visible_nodes(curr_graph, agent_id=(agent_id+1), index=self.visibility_index)
+
+        elif obs_type == 'full':
+            return self.get_graph()
+
+        elif obs_type == 'visible':
+            # Only objects in the field of view of the agent
+            raise NotImplementedError
+
+        elif obs_type == 'image':
+            camera_ids = [self.num_static_cameras + agent_id * self.num_camera_per_agent + self.CAMERA_NUM]
+            if 'image_width' in info:
+                image_width = info['image_width']
+                image_height = info['image_height']
+            else:
+                image_width, image_height = self.default_image_width, self.default_image_height
+            if 'mode' in info:
+                current_mode = info['mode']
+            else:
+                current_mode = 'normal'
+            s, images = self.comm.camera_image(camera_ids, mode=current_mode, image_width=image_width, image_height=image_height)
+            if not s:
+                pdb.set_trace()
+            return images[0]
+        else:
+            raise NotImplementedError
+
+
+def _graph_relations(graph):
+    """
+    :return: the node states and the edges of graph, without the relations that depend on the distances
+    """
+    states = {(node['id'], state) for node in graph['nodes'] for state in node['states']}
+    edges = {(edge['from_id'], edge['relation_type'], edge['to_id']) for edge in graph['edges']
+             if edge['relation_type'] not in ('CLOSE', 'FACING')}
+    return states, edges
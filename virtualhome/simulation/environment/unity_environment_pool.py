@@ -0,0 +1,92 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from .unity_environment import UnityEnvironment
+from unity_simulator.async_comm_unity import AsyncUnityCommunication
+
+
+class UnityEnvironmentPool(object):
+    """
+    Runs num_envs UnityEnvironment, environment i with its simulator at base_port + i. The steps and resets
+    of all the environments are sent concurrently from one asyncio loop, and their observations gathered.
+    The environments of backend='graph' have no simulator, they are stepped through their GraphCommunication.
+
+    :param int num_envs: number of environments
+    :param int base_port: port of the first simulator
+    :param env_args: arguments of every UnityEnvironment
+    """
+
+    def __init__(self, num_envs, base_port=8080, **env_args):
+        # the executables are launched in parallel, the environments reset themselves when created
+        with ThreadPoolExecutor(max_workers=num_envs) as executor:
+            self.envs = list(executor.map(lambda port_id: UnityEnvironment(base_port=base_port, port_id=port_id,
+                                                                           **env_args),
+                                          range(num_envs)))
+        self._loop = asyncio.new_event_loop()
+        self._comms = [self._async_comm(env) for env in self.envs]
+
+    def __len__(self):
+        return len(self.envs)
+
+    def _async_comm(self, env):
+        # the environments of the graph backend have no simulator, their batches are executed when queued
+        if env.backend == 'graph':
+            return None
+        return AsyncUnityCommunication(port=str(env.port_number), timeout_wait=env.comm.timeout_wait,
+                                       batch_requests=env.comm.batch_requests)
+
+    def close(self):
+        for comm in self._comms:
+            if comm is not None:
+                self._loop.run_until_complete(comm.close())
+        self._loop.close()
+        for env in self.envs:
+            env.close()
+
+    def relaunch(self, env_index):
+        env = self.envs[env_index]
+        if self._comms[env_index] is not None:
+            self._loop.run_until_complete(self._comms[env_index].close())
+        env.relaunch()
+        self._comms[env_index] = self._async_comm(env)
+
+    def step(self, action_dicts):
+        """
+        :param list action_dicts: the action_dict of every environment
+        :return: list with the (obs, reward, done, info) of every environment
+        """
+        batches = []
+        for env, action_dict in zip(self.envs, action_dicts):
+            batch = env.comm.batch()
+            env.queue_step(batch, action_dict)
+            batches.append(batch)
+        results = self._send(batches)
+        return [env.finish_step(env_results) for env, env_results in zip(self.envs, results)]
+
+    def reset(self, environment_graphs=None, environment_ids=None, init_rooms=None):
+        """
+        :param list environment_graphs: the initial graph of every environment, None to keep the scenes
+        :param list environment_ids: the apartment of every environment
+        :param list init_rooms: the rooms where the agents start in every environment
+        :return: list with the observations of every environment
+        """
+        batches = []
+        for i, env in enumerate(self.envs):
+            batch = env.comm.batch()
+            env.queue_reset(batch,
+                            None if environment_graphs is None else environment_graphs[i],
+                            None if environment_ids is None else environment_ids[i],
+                            None if init_rooms is None else init_rooms[i])
+            batches.append(batch)
+        results = self._send(batches)
+        return [env.finish_reset(env_results) for env, env_results in zip(self.envs, results)]
+
+    def get_observations(self):
+        return [env.get_observations() for env in self.envs]
+
+    def _send(self, batches):
+        async def send_all():
+            return await asyncio.gather(*[comm.send(batch) for comm, batch in zip(self._comms, batches)
+                                          if comm is not None])
+        results = iter(self._loop.run_until_complete(send_all()))
+        return [batch.send() if comm is None else next(results) for comm, batch in zip(self._comms, batches)]
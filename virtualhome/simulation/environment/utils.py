@@ -1,133 +1,185 @@
-
-import pdb
-import copy
-import random
-
-def convert_action(action_dict):
-    agent_do = [item for item, action in action_dict.items() if action is not None]
-    # Make sure only one agent interact with the same object
-    if len(action_dict.keys()) > 1:
-        if None not in list(action_dict.values()) and sum(['walk' in x for x in action_dict.values()]) < 2:
-            # continue
-            objects_interaction = [x.split('(')[1].split(')')[0] for x in action_dict.values()]
-            if len(set(objects_interaction)) == 1:
-                agent_do = [random.choice([0,1])]
-
-    script_list = ['']
-
-    for agent_id in agent_do:
-        script = action_dict[agent_id]
-        if script is None:
-            continue
-        current_script = ['<char{}> {}'.format(agent_id, script)]
-
-        script_list = [x + '|' + y if len(x) > 0 else y for x, y in zip(script_list, current_script)]
-
-    # script_list = [x.replace('[walk]', '[walktowards]') for x in script_list]
-    return script_list
-
-
-def args_per_action(action):
-
-    action_dict = {'turnleft': 0,
-    'walkforward': 0,
-    'turnright': 0,
-    'walktowards': 1,
-    'open': 1,
-    'close': 1,
-    'putback':1,
-    'putin': 1,
-    'put': 1,
-    'grab': 1,
-    'no_action': 0,
-    'walk': 1}
-    return action_dict[action]
-
-
-def can_perform_action(action, o1_id, agent_id, graph, 
-                       object_restrictions=None, teleport=True):
-    """
-    Check whether the current action can be done
-    Returns None if Action cannot be performed and a fromatted action as a string if yes
-    """
-
-    if action == 'no_action':
-        return None
-
-    obj2_str = ''
-    obj1_str = ''
-    id2node = {node['id']: node for node in graph['nodes']}
-    o1 = id2node[o1_id]['class_name']
-    num_args = 0 if o1 is None else 1
-    if num_args != args_per_action(action):
-        return None
-    
-    grabbed_objects = [edge['to_id'] for edge in graph['edges'] if edge['from_id'] == agent_id and edge['relation_type'] in ['HOLDS_RH', 'HOLD_LH']]
-    close_edge = len([edge['to_id'] for edge in graph['edges'] if edge['from_id'] == agent_id and edge['to_id'] == o1_id and edge['relation_type'] == 'CLOSE']) > 0
-    
-    if action == 'grab':
-        if len(grabbed_objects) > 0:
-            return None
-
-    if action.startswith('walk'):
-        if o1_id in grabbed_objects:
-            return None
-    
-    if o1_id == agent_id:
-        return None
-
-    if o1_id == agent_id:
-        return None
-
-    if (action in ['grab', 'open', 'close']) and not close_edge:
-        return None
-
-    if action == 'open':
-        if object_restrictions is not None:
-            if id2node[o1_id]['class_name'] not in object_restrictions['objects_inside']:
-                return None
-        if 'OPEN' in id2node[o1_id]['states'] or 'CLOSED' not in id2node[o1_id]['states']:
-            return None
-
-    if action == 'close':
-        if object_restrictions is not None:
-            if id2node[o1_id]['class_name'] not in object_restrictions['objects_inside']:
-                return None
-        if 'CLOSED' in id2node[o1_id]['states'] or 'OPEN' not in id2node[o1_id]['states']:
-            return None
-
-    if 'put' in action:
-        if len(grabbed_objects) == 0:
-            return None
-        else:
-            o2_id = grabbed_objects[0]
-            if o2_id == o1_id:
-                return None
-            o2 = id2node[o2_id]['class_name']
-            obj2_str = f'<{o2}> ({o2_id})'
-
-    if o1 is not None:
-        obj1_str = f'<{o1}> ({o1_id})'
-    
-    if o1_id in id2node.keys():
-        if id2node[o1_id]['class_name'] == 'character':
-            return None
-
-    if action.startswith('put'):
-        if object_restrictions is not None:
-            if id2node[o1_id]['class_name'] in object_restrictions['objects_inside']:
-                action = 'putin'
-            if id2node[o1_id]['class_name'] in object_restrictions['objects_surface']:
-                action = 'putback'
-        else:
-            if 'CONTAINERS' in id2node[o1_id]['properties']:
-                action = 'putin'
-            elif 'SURFACES' in id2node[o1_id]['properties']:
-                action = 'putback'
-
-    if action.startswith('walk') and teleport:
-        action = 'walkto'
-
-    action_str = f'[{action}] {obj2_str} {obj1_str}'.strip()
-    # print(action_str)
-    return action_str
+
+import pdb
+import copy
+import hashlib
+import json
+import random
+import numpy as np
+
+def convert_action(action_dict):
+    agent_do = [item for item, action in action_dict.items() if action is not None]
+    # Make sure only one agent interact with the same object
+    if len(action_dict.keys()) > 1:
+        if None not in list(action_dict.values()) and sum(['walk' in x for x in action_dict.values()]) < 2:
+            # continue
+            objects_interaction = [x.split('(')[1].split(')')[0] for x in action_dict.values()]
+            if len(set(objects_interaction)) == 1:
+                agent_do = [random.choice([0,1])]
+
+    script_list = ['']
+
+    for agent_id in agent_do:
+        script = action_dict[agent_id]
+        if script is None:
+            continue
+        current_script = ['<char{}> {}'.format(agent_id, script)]
+
+        script_list = [x + '|' + y if len(x) > 0 else y for x, y in zip(script_list, current_script)]
+
+    # script_list = [x.replace('[walk]', '[walktowards]') for x in script_list]
+    return script_list
+
+
+def graph_hash(graph):
+    """
+    :return: hash of the content of a graph dictionary, None for None
+    """
+    if graph is None:
+        return None
+    return hashlib.sha1(json.dumps(graph, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def args_per_action(action):
+
+    action_dict = {'turnleft': 0,
+    'walkforward': 0,
+    'turnright': 0,
+    'walktowards': 1,
+    'open': 1,
+    'close': 1,
+    'putback':1,
+    'putin': 1,
+    'put': 1,
+    'grab': 1,
+    'no_action': 0,
+    'walk': 1}
+    return action_dict[action]
+
+
+def can_perform_action(action, o1_id, agent_id, graph, 
+                       object_restrictions=None, teleport=True):
+    """
+    Check whether the current action can be done
+    Returns None if Action cannot be performed and a fromatted action as a string if yes
+    """
+
+    if action == 'no_action':
+        return None
+    return _can_perform_action(action, o1_id, agent_id, _ActionIndex(graph, agent_id), object_restrictions, teleport)
+
+
+def action_mask(actions, object_ids, agent_id, graph, object_restrictions=None, teleport=True):
+    """
+    Checks every (action, object) pair as can_perform_action, the graph is indexed once for all the pairs
+    and each action is checked on arrays of the properties of the objects
+    Returns a boolean array of shape (len(actions), len(object_ids)) and a dict mapping the
+    (action index, object index) of the pairs that can be performed to their fromatted action
+    """
+    index = _ActionIndex(graph, agent_id)
+    objects = _ObjectProperties(object_ids, agent_id, index, object_restrictions)
+    mask = np.array([_valid_objects(action, objects) for action in actions], dtype=bool).reshape(
+        len(actions), len(object_ids))
+
+    # the formatted actions are only built for the pairs that can be performed
+    action_strs = {(i, j): _format_action(actions[i], object_ids[j], index, object_restrictions, teleport)
+                   for i, j in zip(*(indices.tolist() for indices in np.nonzero(mask)))}
+    return mask, action_strs
+
+
+class _ActionIndex(object):
+
+    def __init__(self, graph, agent_id):
+        self.id2node = {node['id']: node for node in graph['nodes']}
+        self.grabbed_objects = [edge['to_id'] for edge in graph['edges'] if edge['from_id'] == agent_id and edge['relation_type'] in ['HOLDS_RH', 'HOLD_LH']]
+        self.close_ids = {edge['to_id'] for edge in graph['edges'] if edge['from_id'] == agent_id and edge['relation_type'] == 'CLOSE'}
+
+
+class _ObjectProperties(object):
+    """
+    The properties of the objects checked by the actions, as boolean arrays
+    """
+
+    def __init__(self, object_ids, agent_id, index, object_restrictions):
+        nodes = [index.id2node[o1_id] for o1_id in object_ids]
+        class_names = [node['class_name'] for node in nodes]
+        self.ids = np.array(object_ids, dtype=np.int64)
+        self.has_class = np.array([class_name is not None for class_name in class_names], dtype=bool)
+        # the character and the agent are never the object of an action
+        self.valid = (self.ids != agent_id) & np.array([class_name != 'character' for class_name in class_names],
+                                                       dtype=bool)
+        self.close = np.array([o1_id in index.close_ids for o1_id in object_ids], dtype=bool)
+        self.grabbed = np.array([o1_id in index.grabbed_objects for o1_id in object_ids], dtype=bool)
+        self.open = np.array(['OPEN' in node['states'] for node in nodes], dtype=bool)
+        self.closed = np.array(['CLOSED' in node['states'] for node in nodes], dtype=bool)
+        if object_restrictions is not None:
+            self.openable = np.array([class_name in object_restrictions['objects_inside']
+                                      for class_name in class_names], dtype=bool)
+        else:
+            self.openable = np.ones(len(object_ids), dtype=bool)
+        self.holds = len(index.grabbed_objects) > 0
+        self.held_id = index.grabbed_objects[0] if self.holds else -1
+
+
+def _valid_objects(action, objects):
+    """
+    The rules of the actions
+
+    :param str action: the action
+    :param _ObjectProperties objects: the objects the action is checked on
+    :return: boolean array, whether the action can be performed on each object
+    """
+    if action == 'no_action':
+        return np.zeros(len(objects.ids), dtype=bool)
+    valid = (objects.has_class if args_per_action(action) == 1 else ~objects.has_class) & objects.valid
+    if action == 'grab':
+        valid &= objects.close & (not objects.holds)
+    if action.startswith('walk'):
+        valid &= ~objects.grabbed
+    if action == 'open':
+        valid &= objects.close & objects.openable & objects.closed & ~objects.open
+    if action == 'close':
+        valid &= objects.close & objects.openable & objects.open & ~objects.closed
+    if 'put' in action:
+        valid &= objects.holds & (objects.ids != objects.held_id)
+    return valid
+
+
+def _can_perform_action(action, o1_id, agent_id, index, object_restrictions, teleport):
+    if not _valid_objects(action, _ObjectProperties([o1_id], agent_id, index, object_restrictions))[0]:
+        return None
+    return _format_action(action, o1_id, index, object_restrictions, teleport)
+
+
+def _format_action(action, o1_id, index, object_restrictions, teleport):
+
+    obj2_str = ''
+    obj1_str = ''
+    id2node = index.id2node
+    o1 = id2node[o1_id]['class_name']
+
+    if 'put' in action:
+        o2_id = index.grabbed_objects[0]
+        o2 = id2node[o2_id]['class_name']
+        obj2_str = f'<{o2}> ({o2_id})'
+
+    if o1 is not None:
+        obj1_str = f'<{o1}> ({o1_id})'
+
+    if action.startswith('put'):
+        if object_restrictions is not None:
+            if id2node[o1_id]['class_name'] in object_restrictions['objects_inside']:
+                action = 'putin'
+            if id2node[o1_id]['class_name'] in object_restrictions['objects_surface']:
+                action = 'putback'
+        else:
+            if 'CONTAINERS' in id2node[o1_id]['properties']:
+                action = 'putin'
+            elif 'SURFACES' in id2node[o1_id]['properties']:
+                action = 'putback'
+
+    if action.startswith('walk') and teleport:
+        action = 'walkto'
+
+    action_str = f'[{action}] {obj2_str} {obj1_str}'.strip()
+    # print(action_str)
+    return action_str
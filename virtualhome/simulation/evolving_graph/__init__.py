@@ -1 +1 @@
-from . import utils
+from . import utils
@@ -1,49 +1,93 @@
-import time
-import uuid
-
-
-class Error(Exception):
-    def __init__(self, message, *args):
-        self.message = message.format(*args)
-
-    def __str__(self):
-        return self.message
-
-
-class TimeMeasurement(object):
-
-    _total_time = {}
-    _measurement_time = {}
-
-    @classmethod
-    def reset_all(cls):
-        cls._measurement_time.clear()
-        cls._total_time.clear()
-
-    @classmethod
-    def start(cls, name):
-        key = uuid.uuid4()
-        cls._measurement_time[key] = (name, time.time())
-        return key
-
-    @classmethod
-    def stop(cls, key):
-        name, t = cls._measurement_time.get(key, (None, 0))
-        if name is not None:
-            tt, tn = cls._total_time.get(name, (0, 0))
-            cls._total_time[name] = (tt + time.time() - t, tn + 1)
-
-    @classmethod
-    def measure_function(cls, name, f):
-        tm = cls.start(name)
-        result = f()
-        TimeMeasurement.stop(tm)
-        return result
-
-    @classmethod
-    def result_string(cls):
-        result = ''
-        for key, tn in sorted(cls._total_time.items()):
-            result += '{0}: {1}s ({2})\n'.format(key, tn[0], tn[1])
-        return result
-
+import os
+import time
+import uuid
+import pickle
+import hashlib
+
+
+# Directory of the binary cache of parsed files (see load_cached and enable_cache), the cache is not used if None
+cache_dir = None
+
+
+class Error(Exception):
+    def __init__(self, message, *args):
+        self.message = message.format(*args)
+
+    def __str__(self):
+        return self.message
+
+
+class TimeMeasurement(object):
+
+    _total_time = {}
+    _measurement_time = {}
+
+    @classmethod
+    def reset_all(cls):
+        cls._measurement_time.clear()
+        cls._total_time.clear()
+
+    @classmethod
+    def start(cls, name):
+        key = uuid.uuid4()
+        cls._measurement_time[key] = (name, time.time())
+        return key
+
+    @classmethod
+    def stop(cls, key):
+        name, t = cls._measurement_time.get(key, (None, 0))
+        if name is not None:
+            tt, tn = cls._total_time.get(name, (0, 0))
+            cls._total_time[name] = (tt + time.time() - t, tn + 1)
+
+    @classmethod
+    def measure_function(cls, name, f):
+        tm = cls.start(name)
+        result = f()
+        TimeMeasurement.stop(tm)
+        return result
+
+    @classmethod
+    def result_string(cls):
+        result = ''
+        for key, tn in sorted(cls._total_time.items()):
+            result += '{0}: {1}s ({2})\n'.format(key, tn[0], tn[1])
+        return result
+
+
+def enable_cache(directory):
+    """
+    Sets the directory of the binary cache of load_cached, None disables the cache
+    """
+    global cache_dir
+    cache_dir = directory
+
+
+def load_cached(file_name, parse):
+    """
+    Parses a file through the binary cache. The parsed content is pickled in cache_dir with the modification
+    time and size of the file, and parsed again when the file changes
+    :param parse: function parsing the file, called with file_name. The cache is keyed by its qualified name,
+        which does not depend on the name under which its module was imported
+    """
+    if cache_dir is None:
+        return parse(file_name)
+    stat = os.stat(file_name)
+    signature = (stat.st_mtime_ns, stat.st_size)
+    key = '{}:{}'.format(os.path.abspath(file_name), parse.__qualname__)
+    cache_file = os.path.join(cache_dir, hashlib.sha1(key.encode()).hexdigest() + '.pkl')
+    try:
+        with open(cache_file, 'rb') as f:
+            if pickle.load(f) == signature:
+                return pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        pass
+    content = parse(file_name)
+    os.makedirs(cache_dir, exist_ok=True)
+    # written under a temporary name, concurrent readers never see a partial file
+    tmp_file = '{}.{}'.format(cache_file, os.getpid())
+    with open(tmp_file, 'wb') as f:
+        pickle.dump(signature, f, pickle.HIGHEST_PROTOCOL)
+        pickle.dump(content, f, pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+    return content
@@ -1,816 +1,1243 @@
-from enum import Enum
-from abc import abstractmethod
-from typing import List
-import sys
-import os
-import copy
-from .common import TimeMeasurement
-from .scripts import ScriptObject
-
-# {'bounding_box': {'center': [-3.629491, 0.9062717, -9.543596],
-#   'size': [0.220000267, 0.00999999, 0.149999619]},
-#  'category': 'Props',
-#  'class_name': 'notes',
-#  'id': 334,
-#  'prefab_name': 'Notes_1',
-#  'states': []}
-
-# Enums
-###############################################################################
-
-
-class State(Enum):
-    CLOSED = 1
-    OPEN = 2
-    ON = 3
-    OFF = 4
-    SITTING = 5
-    DIRTY = 6
-    CLEAN = 7
-    LYING = 8
-    PLUGGED_IN = 9
-    PLUGGED_OUT = 10
-
-
-class Relation(Enum):
-    ON = 1
-    INSIDE = 2
-    BETWEEN = 3
-    CLOSE = 4
-    FACING = 5
-    HOLDS_RH = 6
-    HOLDS_LH = 7
-    SITTING = 8
-
-    @classmethod
-    def all(cls):
-        return list(Relation)
-
-
-class Property(Enum):
-    SURFACES = 1
-    GRABBABLE = 2
-    SITTABLE = 3
-    LIEABLE = 4
-    HANGABLE = 5
-    DRINKABLE = 6
-    EATABLE = 7
-    RECIPIENT = 8
-    CUTTABLE = 9
-    POURABLE = 10
-    CAN_OPEN = 11
-    HAS_SWITCH = 12
-    READABLE = 13
-    LOOKABLE = 14
-    CONTAINERS = 15
-    CLOTHES = 16
-    PERSON = 17
-    BODY_PART = 18
-    COVER_OBJECT = 19
-    HAS_PLUG = 20
-    HAS_PAPER = 21
-    MOVABLE = 22
-    CREAM = 23
-
-
-class Room(Enum):
-    HOME_OFFICE = 1
-    KITCHEN = 2
-    LIVING_ROOM = 3
-    BATHROOM = 4
-    DINING_ROOM = 5
-    BEDROOM = 6
-    KIDS_BEDROOM = 7
-    ENTRANCE_HALL = 8
-
-    @classmethod
-    def has_value(cls, value):
-        return value.lower().replace(' ', '_') in [item.name.lower() for item in cls]
-
-# EnvironmentGraph, nodes, edges and related structures
-###############################################################################
-
-
-class Bounds(object):
-    def __init__(self, center, size):
-        self.center = center
-        self.size = size
-
-    def to_dict(self):
-        return {'center': self.center, 'size': self.size}
-
-
-class Node(object):
-    def __init__(self, id):
-        self.id = id
-
-
-class GraphNode(Node):
-
-    def __init__(self, id, class_name, properties, states, category, prefab_name, bounding_box):
-        super().__init__(id)
-        self.class_name = class_name
-        self.category = category
-        self.properties = properties
-        self.states = states
-        self.prefab_name = prefab_name
-        self.bounding_box = bounding_box
-
-    def copy(self):
-        return GraphNode(self.id, self.class_name, self.properties.copy(), self.states.copy(),
-                         self.category, self.prefab_name, self.bounding_box)
-
-    def __str__(self):
-        return '<{}> ({})'.format(self.class_name, self.id)
-
-    def to_dict(self):
-        return {'id': self.id,
-                'class_name': self.class_name,
-                'category': self.category,
-                'properties': [p.name for p in self.properties],
-                'states': [s.name for s in self.states],
-                'prefab_name': self.prefab_name,
-                'bounding_box': None if self.bounding_box is None else self.bounding_box.to_dict()
-                }
-
-    @staticmethod
-    def from_dict(d):
-        kwargs = {
-            "category": None, 
-            "prefab_name": None, 
-            "bounding_box": None
-        }
-        for k in kwargs.keys():
-            if k in d:
-                if k == 'bounding_box':
-                    kwargs[k] = Bounds(**d[k]) if d[k] is not None else d[k]
-                else:
-                    kwargs[k] = d[k]
-
-        return GraphNode(d['id'], d['class_name'], 
-                         {s if isinstance(s, Property) else Property[s.upper()] for s in d['properties']},
-                         {State[s.upper()] for s in d['states']},
-                         **kwargs)
-
-
-class GraphEdge(object):
-    def __init__(self, from_node: GraphNode, relation: Relation, to_node: GraphNode):
-        self.from_node = from_node
-        self.relation = relation
-        self.to_node = to_node
-
-
-class NodeQueryType(Enum):
-    ANY_NODE = 1
-    NODE_WITH_ID = 2
-    NODE_WITH_ATTR = 3
-
-
-def _ensure_unique_nodes_unique_edges(graph_dict):
-    
-    nodes = graph_dict["nodes"]
-    edges = graph_dict["edges"]
-    
-    new_nodes = {node["id"]: node for node in nodes}
-    new_nodes = list(new_nodes.values())
-
-    new_edges = {"{}.{}.{}".format(edge["from_id"], edge["relation_type"], edge["to_id"]): edge for edge in edges}
-    new_edges = list(new_edges.values())
-    
-    return {"nodes": new_nodes, "edges": new_edges}
-
-        
-class EnvironmentGraph(object):
-
-    def __init__(self, dictionary=None):
-        self._max_node_id = 0
-        self._edge_map = {}
-        self._node_map = {}
-        self._class_name_map = {}
-        if dictionary is not None:
-            dictionary = _ensure_unique_nodes_unique_edges(dictionary)
-            self._from_dictionary(dictionary)
-        else:
-            self._dictionary = dictionary
-
-    def _from_dictionary(self, d):
-        nodes = [GraphNode.from_dict(n) for n in d['nodes']]
-        for n in nodes:
-            self._node_map[n.id] = n
-            self._class_name_map.setdefault(n.class_name, []).append(n)
-            if n.id > self._max_node_id:
-                self._max_node_id = n.id
-        edges = [(ed['from_id'], Relation[ed['relation_type'].upper()], ed['to_id'])
-                 for ed in d['edges']]
-        for from_id, relation, to_id in edges:
-            es = self._edge_map.setdefault((from_id, relation), {})
-            es[to_id] = self._node_map[to_id]
-
-    def get_nodes(self):
-        return self._node_map.values()
-
-    def get_node_ids(self):
-        return  self._node_map.keys()
-
-    def get_node_map(self):
-        return self._node_map
-
-    def get_nodes_by_attr(self, attr: str, value):
-        if attr == 'class_name':
-            for node in self._class_name_map.get(value, []):
-                yield node
-        else:
-            for node in self._node_map.values():
-                if getattr(node, attr) == value:
-                    yield node
-
-    def get_char_node(self, char_index: int):
-        chars = self._class_name_map.get('character', [])
-        chars.sort(key=lambda node : node.id)
-        assert char_index < len(chars), 'Character Index Out of bound! #chars is {}, char index is {}'.format(len(chars), char_index)
-        yield chars[char_index]
-        
-
-    def get_node(self, node_id: int):
-        return self._node_map.get(node_id, None)
-
-    def get_nodes_from(self, from_node: Node, relation: Relation):
-        return self._get_node_maps_from(from_node.id, relation).values()
-
-    def get_node_ids_from(self, from_id: int, relation: Relation):
-        return self._get_node_maps_from(from_id, relation).keys()
-
-    def _get_node_maps_from(self, from_id: int, relation: Relation):
-        return self._edge_map.get((from_id, relation), {})
-
-    def get_from_pairs(self):
-        return self._edge_map.keys()
-
-    def get_max_node_id(self):
-        return self._max_node_id
-
-    def has_edge(self, from_node: Node, relation: Relation, to_node: Node):
-        return to_node.id in self._get_node_maps_from(from_node.id, relation)
-
-    def add_node(self, node: GraphNode):
-        assert node.id not in self._node_map
-        self._node_map[node.id] = node
-        self._class_name_map.setdefault(node.class_name, []).append(node)
-        if node.id > self._max_node_id:
-            self._max_node_id = node.id
-
-    def add_edge(self, from_node: Node, r: Relation, to_node: Node):
-        assert from_node.id in self._node_map and to_node.id in self._node_map
-        es = self._edge_map.setdefault((from_node.id, r), {})
-        es[to_node.id] = to_node
-
-
-# EnvironmentState
-###############################################################################
-
-
-class EnvironmentState(object):
-
-    def __init__(self, graph: EnvironmentGraph, name_equivalence, instance_selection: bool=False):
-        self.instance_selection = instance_selection
-        self.executor_data = {}
-        self._graph = graph
-        self._name_equivalence = name_equivalence
-        self._script_objects = {}  # (name, instance) -> node id
-        self._new_nodes = {}  # map: node id -> GraphNode
-        self._max_node_id = graph.get_max_node_id()
-        self._removed_edges_from = {}  # map: (from_node id, relation) -> to_node id set
-        self._new_edges_from = {}  # map: (from_node id, relation) -> to_node id set
-
-    def evaluate(self, lvalue: 'LogicalValue'):
-        return lvalue.evaluate(self)
-
-    def select_nodes(self, obj: ScriptObject):
-        if self.instance_selection:
-            return [self.get_node(obj.instance)]
-        else:
-            """Enumerate nodes satisfying script object condition. If object was already
-            discovered, return node
-            """
-            node_id = self._script_objects.get((obj.name, obj.instance), None)
-            if node_id is not None:
-                return [self.get_node(node_id)]
-            else:
-                nodes = []
-                for name in [obj.name] + self._name_equivalence.get(obj.name, []):
-                    nodes.extend(self.get_nodes_by_attr('class_name', name))
-                return nodes
-
-    def get_script_node(self, name: str, instance: int):
-        return self._script_objects.get((name, instance), None)
-
-    def get_state_node(self, obj: ScriptObject):
-        if self.instance_selection:
-            return self.get_node(obj.instance)
-        else:
-            node_id = self._script_objects.get((obj.name, obj.instance), -1)
-        return None if node_id < 0 else self.get_node(node_id)
-
-    def has_edge(self, from_node: Node, relation: Relation, to_node: Node):
-        if to_node.id in self._removed_edges_from.get((from_node.id, relation), set()):
-            return False
-        elif to_node.id in self._new_edges_from.get((from_node.id, relation), set()):
-            return True
-        else:
-            return self._graph.has_edge(from_node, relation, to_node)
-
-    def get_node(self, node_id: int):
-        if node_id in self._new_nodes:
-            return self._new_nodes[node_id]
-        else:
-            return self._graph.get_node(node_id)
-
-    def get_nodes_from(self, from_node: Node, relation: Relation):
-        id_set = self._new_edges_from.get((from_node.id, relation), set())
-        id_set.update(self._graph.get_node_ids_from(from_node.id, relation))
-        removed_ids = self._removed_edges_from.get((from_node.id, relation), set())
-        id_set.difference_update(removed_ids)
-        result = []
-        for node_id in id_set:
-            if node_id in self._new_nodes:
-                result.append(self._new_nodes[node_id])
-            else:
-                result.append(self._graph.get_node(node_id))
-        return result
-
-    def get_node_ids_from(self, from_id: int, relation: Relation):
-        id_set = self._new_edges_from.get((from_id, relation), set())
-        id_set.update(self._graph.get_node_ids_from(from_id, relation))
-        removed_ids = self._removed_edges_from.get((from_id, relation), set())
-        id_set.difference_update(removed_ids)
-        return id_set
-
-    def get_nodes(self):
-        result = list(self._new_nodes.values())
-        for node in self._graph.get_nodes():
-            if node.id not in self._new_nodes:
-                result.append(node)
-        return result
-
-    def get_max_node_id(self):
-        return self._max_node_id
-
-    def get_nodes_by_attr(self, attr: str, value):
-        result = []
-        added_new = set()
-        for node in self._graph.get_nodes_by_attr(attr, value):
-            if node.id not in self._new_nodes:
-                result.append(node)
-            else:
-                new_node = self._new_nodes[node.id]
-                if getattr(new_node, attr) == value:
-                    result.append(new_node)
-                    added_new.add(new_node.id)
-        for new_node_id, new_node in self._new_nodes.items():
-            if new_node_id not in added_new and getattr(new_node, attr) == value:
-                result.append(new_node)
-        return result
-
-    def get_char_node(self, char_index: int):
-        return self._graph.get_char_node(char_index)
-
-    def add_edge(self, from_node: Node, relation: Relation, to_node: Node):
-        if (from_node.id, relation) in self._removed_edges_from:
-            to_node_ids = self._removed_edges_from[(from_node.id, relation)]
-            if to_node.id in to_node_ids:
-                to_node_ids.remove(to_node.id)
-                return
-        if not self._graph.has_edge(from_node, relation, to_node):
-            self._new_edges_from.setdefault((from_node.id, relation), set()).add(to_node.id)
-
-    def delete_edge(self, from_node: Node, relation: Relation, to_node: Node):
-        if self._graph.has_edge(from_node, relation, to_node):
-            self._removed_edges_from.setdefault((from_node.id, relation), set()).add(to_node.id)
-        elif (from_node.id, relation) in self._new_edges_from:
-            to_node_ids = self._new_edges_from[(from_node.id, relation)]
-            to_node_ids.discard(to_node.id)
-
-    def change_node(self, node: Node):
-        assert node.id in self._new_nodes or self._graph.get_node(node.id) is not None
-        self._new_nodes[node.id] = node
-
-    def add_node(self, node: Node):
-        self._max_node_id += 1
-        node.id = self._max_node_id
-        self._new_nodes[node.id] = node
-
-    def change_state(self, changers: List['StateChanger'], node: Node = None, obj: ScriptObject = None, in_place = False):
-
-        new_state = EnvironmentState(self._graph, self._name_equivalence, self.instance_selection)
-        if in_place:
-            new_state._new_nodes = self._new_nodes
-            new_state._removed_edges_from = self._removed_edges_from
-            new_state._new_edges_from = self._new_edges_from
-            new_state._script_objects = self._script_objects
-            new_state.executor_data = self.executor_data
-        else:
-            new_state._new_nodes = copy.deepcopy(self._new_nodes)
-            new_state._removed_edges_from = copy.deepcopy(self._removed_edges_from)
-            new_state._new_edges_from = copy.deepcopy(self._new_edges_from)
-            new_state._script_objects = copy.deepcopy(self._script_objects)
-            new_state.executor_data = copy.deepcopy(self.executor_data)
-
-        if obj is not None and node is not None:
-            new_state._script_objects[(obj.name, obj.instance)] = node.id
-        new_state.apply_changes(changers)
-
-        return new_state
-
-    def apply_changes(self, changers: List['StateChanger']):
-        for changer in changers:
-            changer.apply_changes(self)
-
-    def to_dict(self):
-        edges = []
-        from_pairs = self._new_edges_from.keys() | self._graph.get_from_pairs()
-        for from_n, r in from_pairs:
-            for to_n in self.get_node_ids_from(from_n, r):
-                edges.append({'from_id': from_n, 'relation_type': r.name, 'to_id': to_n})
-        return {'nodes': [n.to_dict() for n in self.get_nodes()], 'edges': edges}
-
-
-# NodeEnumerator-s
-###############################################################################
-
-
-class NodeEnumerator(object):
-
-    @abstractmethod
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        pass
-
-
-class AnyNode(NodeEnumerator):
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        return state.get_nodes()
-
-
-class NodeInstance(NodeEnumerator):
-
-    def __init__(self, node: Node):
-        self.node = node
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        yield state.get_node(self.node.id)
-
-
-class NodeParam(NodeEnumerator):
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        if 'node' not in kwargs:
-            raise Exception('"node" param not set')
-        yield kwargs['node']
-
-
-class RelationFrom(NodeEnumerator):
-
-    def __init__(self, from_node: Node, relation: Relation):
-        self.from_node = from_node
-        self.relation = relation
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        return state.get_nodes_from(self.from_node, self.relation)
-
-
-class CharacterNode(NodeEnumerator):
-
-    def __init__(self, char_index: int):
-        self.char_index = char_index
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        return state.get_char_node(self.char_index)
-
-
-class ClassNameNode(NodeEnumerator):
-
-    def __init__(self, class_name: str):
-        self.class_name = class_name
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        return state.get_nodes_by_attr('class_name', self.class_name)
-
-class ObjectInsideNode(NodeEnumerator):
-
-    def __init__(self, node: Node):
-        self.container_node = node
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in state.get_nodes():
-            if state.evaluate(ExistsRelation(NodeInstance(n), Relation.INSIDE, NodeInstanceFilter(self.container_node))):
-                 yield n
-
-class ObjectOnNode(NodeEnumerator):
-
-    def __init__(self, node: Node):
-        self.surface_node = node
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in state.get_nodes():
-            if state.evaluate(ExistsRelation(NodeInstance(n), Relation.ON, NodeInstanceFilter(self.surface_node))):
-                 yield n
-
-
-class BodyNode(NodeEnumerator):
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in state.get_nodes():
-            if Property.BODY_PART in n.properties:
-                yield n
-
-
-class SurfaceObjectNode(NodeEnumerator):
-    """Find the objects that support `node`
-    """
-    def __init__(self, node: Node):
-        self.node = node
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in state.get_nodes_from(self.node, Relation.ON):
-            yield n
-
-class BoxObjectNode(NodeEnumerator):
-    """Find the objects that contain `node`
-    """
-    def __init__(self, node: Node):
-        self.node = node
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in state.get_nodes_from(self.node, Relation.INSIDE):
-            if n.category != 'Rooms':
-                yield n
-
-
-class FilteredNodes(NodeEnumerator):
-
-    def __init__(self, enumerator: NodeEnumerator, condition: 'LogicalValue'):
-        self.enumerator = enumerator
-        self.condition = condition
-
-    def enumerate(self, state: EnvironmentState, **kwargs):
-        for n in self.enumerator.enumerate(state):
-            if self.condition.evaluate(n):
-                yield n
-
-
-# NodeFilter-s
-###############################################################################
-
-
-class NodeFilter(object):
-
-    @abstractmethod
-    def filter(self, node: Node):
-        pass
-
-
-class NodeInstanceFilter(NodeFilter):
-
-    def __init__(self, node: Node):
-        self.node = node
-
-    def filter(self, node: Node):
-        return node.id == self.node.id
-
-
-class NodeConditionFilter(NodeFilter):
-
-    def __init__(self, value: 'LogicalValue'):
-        self.value = value
-
-    def filter(self, node: Node):
-        return self.value.evaluate(node)
-
-
-class AnyNodeFilter(NodeFilter):
-
-    def filter(self, node: Node):
-        return True
-
-
-# LogicalValue-s
-###############################################################################
-
-
-class LogicalValue(object):
-
-    @abstractmethod
-    def evaluate(self, param, **kwargs):
-        pass
-
-
-class Not(LogicalValue):
-
-    def __init__(self, value1: LogicalValue):
-        self.value1 = value1
-
-    def evaluate(self, param, **kwargs):
-        return not self.value1.evaluate(param, **kwargs)
-
-
-class And(LogicalValue):
-
-    def __init__(self, *args: LogicalValue):
-        self.values = args
-
-    def evaluate(self, param, **kwargs):
-        for value in self.values:
-            if not value.evaluate(param, **kwargs):
-                return False
-        return True
-
-
-class Constant(LogicalValue):
-
-    def __init__(self, value: bool):
-        self.value = value
-
-    def evaluate(self, param, **kwargs):
-        return self.value
-
-
-class ExistsRelation(LogicalValue):
-
-    def __init__(self, from_nodes: NodeEnumerator, relation: Relation, to_nodes: NodeFilter):
-        self.from_nodes = from_nodes
-        self.relation = relation
-        self.to_nodes = to_nodes
-
-    def evaluate(self, state: EnvironmentState, **kwargs):
-        for fn in self.from_nodes.enumerate(state, **kwargs):
-            for tn in state.get_nodes_from(fn, self.relation):
-                if self.to_nodes.filter(tn):
-                    return True
-        return False
-
-
-class CountRelations(LogicalValue):
-    def __init__(self, from_nodes: NodeEnumerator, relation: Relation, to_nodes: NodeFilter, min_value: int):
-        """
-        Evaluates to true if there are at least min_value edges satisfying the conditions
-        """
-        self.from_nodes = from_nodes
-        self.relation = relation
-        self.to_nodes = to_nodes
-        self.min_value = min_value
-
-    def evaluate(self, state: EnvironmentState, **kwargs):
-        count = 0
-        for fn in self.from_nodes.enumerate(state, **kwargs):
-            for tn in state.get_nodes_from(fn, self.relation):
-                if self.to_nodes.filter(tn):
-                    count += 1
-                    if count >= self.min_value:
-                        return True
-        return False
-
-
-class ExistRelations(LogicalValue):
-
-    def __init__(self, from_nodes: NodeEnumerator, rf_pairs):
-        self.from_nodes = from_nodes
-        self.rf_pairs = rf_pairs
-
-    def evaluate(self, state: EnvironmentState, **kwargs):
-        for fn in self.from_nodes.enumerate(state, **kwargs):
-            node_ok = True
-            for (relation, node_filter) in self.rf_pairs:
-                filter_ok = False
-                for tn in state.get_nodes_from(fn, relation):
-                    if node_filter.filter(tn):
-                        filter_ok = True
-                        break
-                if not filter_ok:
-                    node_ok = False
-                    break
-            if node_ok:
-                return True
-        return False
-
-
-class IsRoomNode(LogicalValue):
-
-    def __init__(self, room_name: str=None):
-        self.room_name = room_name
-
-    def evaluate(self, node: GraphNode, **kwargs):
-        return node.category == 'Rooms' and (self.room_name is None or node.class_name == self.room_name)
-
-
-class NodeAttrEq(LogicalValue):
-
-    def __init__(self, attr: str, value):
-        self.attr = attr
-        self.value = value
-
-    def evaluate(self, node: GraphNode, **kwargs):
-        return self.value == getattr(node, self.attr)
-
-
-class NodeAttrIn(LogicalValue):
-
-    def __init__(self, value, attr: str):
-        self.value = value
-        self.attr = attr
-
-    def evaluate(self, node: GraphNode, **kwargs):
-        return self.value in getattr(node, self.attr)
-
-
-class NodeClassNameEq(LogicalValue):
-
-    def __init__(self, class_name: str):
-        self.class_name = class_name
-
-    def evaluate(self, node: GraphNode, **kwargs):
-        return self.class_name == node.class_name
-
-
-# StateChanger-s
-###############################################################################
-
-
-class StateChanger(object):
-
-    @abstractmethod
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        pass
-
-
-class AddEdges(StateChanger):
-
-    def __init__(self, from_node: NodeEnumerator, relation: Relation, to_node: NodeEnumerator, add_reverse=False):
-        self.from_node = from_node
-        self.relation = relation
-        self.to_node = to_node
-        self.add_reverse = add_reverse
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        tm = TimeMeasurement.start('AddEdges')
-        for n1 in self.from_node.enumerate(state):
-            for n2 in self.to_node.enumerate(state):
-                state.add_edge(n1, self.relation, n2)
-                if self.add_reverse:
-                    state.add_edge(n2, self.relation, n1)
-        TimeMeasurement.stop(tm)
-
-
-class DeleteEdges(StateChanger):
-
-    def __init__(self, from_node: NodeEnumerator, relations, to_node: NodeEnumerator, delete_reverse=False):
-        self.from_node = from_node
-        self.relations = relations
-        self.to_node = to_node
-        self.delete_reverse = delete_reverse
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        tm = TimeMeasurement.start('DeleteEdges')
-        for n1 in self.from_node.enumerate(state):
-            for e in self.relations:
-                for n2 in self.to_node.enumerate(state):
-                    state.delete_edge(n1, e, n2)
-                    if self.delete_reverse:
-                        state.delete_edge(n2, e, n1)
-        TimeMeasurement.stop(tm)
-
-
-class ChangeNode(StateChanger):
-
-    def __init__(self, node: GraphNode):
-        self.node = node
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        state.change_node(self.node)
-
-
-class AddNode(StateChanger):
-
-    def __init__(self, node: GraphNode):
-        self.node = node
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        state.add_node(self.node)
-
-
-class ClearExecDataKey(StateChanger):
-
-    def __init__(self, key):
-        self.key = key
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        state.executor_data.pop(self.key, None)
-
-
-class AddExecDataValue(StateChanger):
-
-    def __init__(self, key, value):
-        self.key = key
-        self.value = value
-
-    def apply_changes(self, state: EnvironmentState, **kwargs):
-        state.executor_data[self.key] = self.value
+from enum import Enum
+from abc import abstractmethod
+from typing import List
+import sys
+import os
+import copy
+import hashlib
+from functools import lru_cache
+from .common import TimeMeasurement
+from .scripts import ScriptObject
+
+# Evaluate conditions (LogicalValue-s) and node enumerations through their compiled functions;
+# False: interpret the trees
+compile_conditions = True
+
+# {'bounding_box': {'center': [-3.629491, 0.9062717, -9.543596],
+#   'size': [0.220000267, 0.00999999, 0.149999619]},
+#  'category': 'Props',
+#  'class_name': 'notes',
+#  'id': 334,
+#  'prefab_name': 'Notes_1',
+#  'states': []}
+
+# Enums
+###############################################################################
+
+
+class State(Enum):
+    CLOSED = 1
+    OPEN = 2
+    ON = 3
+    OFF = 4
+    SITTING = 5
+    DIRTY = 6
+    CLEAN = 7
+    LYING = 8
+    PLUGGED_IN = 9
+    PLUGGED_OUT = 10
+
+
+class Relation(Enum):
+    ON = 1
+    INSIDE = 2
+    BETWEEN = 3
+    CLOSE = 4
+    FACING = 5
+    HOLDS_RH = 6
+    HOLDS_LH = 7
+    SITTING = 8
+
+    @classmethod
+    def all(cls):
+        return list(Relation)
+
+
+class Property(Enum):
+    SURFACES = 1
+    GRABBABLE = 2
+    SITTABLE = 3
+    LIEABLE = 4
+    HANGABLE = 5
+    DRINKABLE = 6
+    EATABLE = 7
+    RECIPIENT = 8
+    CUTTABLE = 9
+    POURABLE = 10
+    CAN_OPEN = 11
+    HAS_SWITCH = 12
+    READABLE = 13
+    LOOKABLE = 14
+    CONTAINERS = 15
+    CLOTHES = 16
+    PERSON = 17
+    BODY_PART = 18
+    COVER_OBJECT = 19
+    HAS_PLUG = 20
+    HAS_PAPER = 21
+    MOVABLE = 22
+    CREAM = 23
+
+
+class Room(Enum):
+    HOME_OFFICE = 1
+    KITCHEN = 2
+    LIVING_ROOM = 3
+    BATHROOM = 4
+    DINING_ROOM = 5
+    BEDROOM = 6
+    KIDS_BEDROOM = 7
+    ENTRANCE_HALL = 8
+
+    @classmethod
+    def has_value(cls, value):
+        return value.lower().replace(' ', '_') in [item.name.lower() for item in cls]
+
+# EnvironmentGraph, nodes, edges and related structures
+###############################################################################
+
+
+class Bounds(object):
+    def __init__(self, center, size):
+        self.center = center
+        self.size = size
+
+    def to_dict(self):
+        return {'center': self.center, 'size': self.size}
+
+
+class Node(object):
+    def __init__(self, id):
+        self.id = id
+
+
+class GraphNode(Node):
+
+    def __init__(self, id, class_name, properties, states, category, prefab_name, bounding_box):
+        super().__init__(id)
+        self.class_name = class_name
+        self.category = category
+        self.properties = properties
+        self.states = states
+        self.prefab_name = prefab_name
+        self.bounding_box = bounding_box
+
+    def copy(self):
+        return GraphNode(self.id, self.class_name, self.properties.copy(), self.states.copy(),
+                         self.category, self.prefab_name, self.bounding_box)
+
+    def __str__(self):
+        return '<{}> ({})'.format(self.class_name, self.id)
+
+    def to_dict(self):
+        return {'id': self.id,
+                'class_name': self.class_name,
+                'category': self.category,
+                'properties': [p.name for p in self.properties],
+                'states': [s.name for s in self.states],
+                'prefab_name': self.prefab_name,
+                'bounding_box': None if self.bounding_box is None else self.bounding_box.to_dict()
+                }
+
+    @staticmethod
+    def from_dict(d):
+        kwargs = {
+            "category": None, 
+            "prefab_name": None, 
+            "bounding_box": None
+        }
+        for k in kwargs.keys():
+            if k in d:
+                if k == 'bounding_box':
+                    kwargs[k] = Bounds(**d[k]) if d[k] is not None else d[k]
+                else:
+                    kwargs[k] = d[k]
+
+        return GraphNode(d['id'], d['class_name'], 
+                         {s if isinstance(s, Property) else Property[s.upper()] for s in d['properties']},
+                         {State[s.upper()] for s in d['states']},
+                         **kwargs)
+
+
+class GraphEdge(object):
+    def __init__(self, from_node: GraphNode, relation: Relation, to_node: GraphNode):
+        self.from_node = from_node
+        self.relation = relation
+        self.to_node = to_node
+
+
+# Rooms are connected to each other through nodes of these classes (BETWEEN relation)
+DOOR_CLASS_NAMES = ('door', 'doorjamb')
+
+
+# Zobrist hashing
+###############################################################################
+# The hash of a graph (or of a state) is the xor of the keys of its nodes, edges and script object
+# bindings, so it can be updated incrementally when a node or an edge changes. Keys are derived from
+# the features instead of a random table, they are the same in every process.
+
+
+@lru_cache(maxsize=1 << 18)
+def _zobrist_key(feature):
+    return int.from_bytes(hashlib.blake2b(repr(feature).encode(), digest_size=8).digest(), 'little')
+
+
+def _node_key(node: 'GraphNode'):
+    return _zobrist_key(('node', node.id, node.class_name, tuple(sorted(s.name for s in node.states)),
+                         tuple(sorted(p.name for p in node.properties))))
+
+
+def _edge_key(from_id: int, relation: 'Relation', to_id: int):
+    return _zobrist_key(('edge', from_id, relation.name, to_id))
+
+
+def _script_object_key(name: str, instance: int, node_id: int):
+    return _zobrist_key(('object', name, instance, node_id))
+
+
+def _executor_data_key(key, value):
+    def _feature(v):
+        if isinstance(v, tuple):
+            return tuple(_feature(x) for x in v)
+        elif isinstance(v, Node):
+            return v.id
+        elif isinstance(v, Enum):
+            return v.name
+        return v
+    return _zobrist_key(('data', _feature(key), _feature(value)))
+
+
+class NodeQueryType(Enum):
+    ANY_NODE = 1
+    NODE_WITH_ID = 2
+    NODE_WITH_ATTR = 3
+
+
+def _ensure_unique_nodes_unique_edges(graph_dict):
+    
+    nodes = graph_dict["nodes"]
+    edges = graph_dict["edges"]
+    
+    new_nodes = {node["id"]: node for node in nodes}
+    new_nodes = list(new_nodes.values())
+
+    new_edges = {"{}.{}.{}".format(edge["from_id"], edge["relation_type"], edge["to_id"]): edge for edge in edges}
+    new_edges = list(new_edges.values())
+    
+    return {"nodes": new_nodes, "edges": new_edges}
+
+        
+class EnvironmentGraph(object):
+
+    def __init__(self, dictionary=None):
+        self._max_node_id = 0
+        self._edge_map = {}
+        self._reverse_edge_map = {}  # map: (to_node id, relation) -> set of from_node ids
+        self._node_map = {}
+        self._class_name_map = {}
+        self._hash = None  # computed on first use
+        if dictionary is not None:
+            dictionary = _ensure_unique_nodes_unique_edges(dictionary)
+            self._from_dictionary(dictionary)
+        else:
+            self._dictionary = dictionary
+
+    def _from_dictionary(self, d):
+        nodes = [GraphNode.from_dict(n) for n in d['nodes']]
+        for n in nodes:
+            self._node_map[n.id] = n
+            self._class_name_map.setdefault(n.class_name, []).append(n)
+            if n.id > self._max_node_id:
+                self._max_node_id = n.id
+        edges = [(ed['from_id'], Relation[ed['relation_type'].upper()], ed['to_id'])
+                 for ed in d['edges']]
+        for from_id, relation, to_id in edges:
+            es = self._edge_map.setdefault((from_id, relation), {})
+            es[to_id] = self._node_map[to_id]
+            self._reverse_edge_map.setdefault((to_id, relation), set()).add(from_id)
+
+    def get_nodes(self):
+        return self._node_map.values()
+
+    def get_node_ids(self):
+        return  self._node_map.keys()
+
+    def get_node_map(self):
+        return self._node_map
+
+    def get_nodes_by_attr(self, attr: str, value):
+        if attr == 'class_name':
+            for node in self._class_name_map.get(value, []):
+                yield node
+        else:
+            for node in self._node_map.values():
+                if getattr(node, attr) == value:
+                    yield node
+
+    def get_char_node(self, char_index: int):
+        chars = self._class_name_map.get('character', [])
+        chars.sort(key=lambda node : node.id)
+        assert char_index < len(chars), 'Character Index Out of bound! #chars is {}, char index is {}'.format(len(chars), char_index)
+        yield chars[char_index]
+        
+
+    def get_node(self, node_id: int):
+        return self._node_map.get(node_id, None)
+
+    def get_nodes_from(self, from_node: Node, relation: Relation):
+        return self._get_node_maps_from(from_node.id, relation).values()
+
+    def get_node_ids_from(self, from_id: int, relation: Relation):
+        return self._get_node_maps_from(from_id, relation).keys()
+
+    def _get_node_maps_from(self, from_id: int, relation: Relation):
+        return self._edge_map.get((from_id, relation), {})
+
+    def get_node_ids_to(self, to_id: int, relation: Relation):
+        return self._reverse_edge_map.get((to_id, relation), set())
+
+    def get_from_pairs(self):
+        return self._edge_map.keys()
+
+    def get_max_node_id(self):
+        return self._max_node_id
+
+    def has_edge(self, from_node: Node, relation: Relation, to_node: Node):
+        return to_node.id in self._get_node_maps_from(from_node.id, relation)
+
+    def fingerprint(self):
+        """64-bit Zobrist hash of the nodes and edges"""
+        if self._hash is None:
+            h = 0
+            for node in self._node_map.values():
+                h ^= _node_key(node)
+            for (from_id, relation), es in self._edge_map.items():
+                for to_id in es:
+                    h ^= _edge_key(from_id, relation, to_id)
+            self._hash = h
+        return self._hash
+
+    def add_node(self, node: GraphNode):
+        assert node.id not in self._node_map
+        self._node_map[node.id] = node
+        self._class_name_map.setdefault(node.class_name, []).append(node)
+        if node.id > self._max_node_id:
+            self._max_node_id = node.id
+        if self._hash is not None:
+            self._hash ^= _node_key(node)
+
+    def add_edge(self, from_node: Node, r: Relation, to_node: Node):
+        assert from_node.id in self._node_map and to_node.id in self._node_map
+        es = self._edge_map.setdefault((from_node.id, r), {})
+        if self._hash is not None and to_node.id not in es:
+            self._hash ^= _edge_key(from_node.id, r, to_node.id)
+        es[to_node.id] = to_node
+        self._reverse_edge_map.setdefault((to_node.id, r), set()).add(from_node.id)
+
+
+# EnvironmentState
+###############################################################################
+
+
+class EnvironmentState(object):
+
+    def __init__(self, graph: EnvironmentGraph, name_equivalence, instance_selection: bool=False,
+                 check_closed_doors: bool=False):
+        self.instance_selection = instance_selection
+        self.check_closed_doors = check_closed_doors
+        self.executor_data = {}
+        self._graph = graph
+        self._name_equivalence = name_equivalence
+        self._script_objects = {}  # (name, instance) -> node id
+        self._new_nodes = {}  # map: node id -> GraphNode
+        self._max_node_id = graph.get_max_node_id()
+        self._removed_edges_from = {}  # map: (from_node id, relation) -> to_node id set
+        self._new_edges_from = {}  # map: (from_node id, relation) -> to_node id set
+        self._room_connectivity = None  # room adjacency through doors, built lazily by the executor
+        self._hash = graph.fingerprint()  # Zobrist hash of the graph with the changes and of the script objects
+        self._node_keys = {}  # map: node id -> key of the node in _new_nodes
+        self._shared_changes = False  # whether the changes are shared with a snapshot, and copied on write
+
+    def evaluate(self, lvalue: 'LogicalValue', **kwargs):
+        if compile_conditions:
+            return lvalue.compiled()(self, **kwargs)
+        return lvalue.evaluate(self, **kwargs)
+
+    def select_nodes(self, obj: ScriptObject):
+        if self.instance_selection:
+            return [self.get_node(obj.instance)]
+        else:
+            """Enumerate nodes satisfying script object condition. If object was already
+            discovered, return node
+            """
+            node_id = self._script_objects.get((obj.name, obj.instance), None)
+            if node_id is not None:
+                return [self.get_node(node_id)]
+            else:
+                nodes = []
+                for name in [obj.name] + self._name_equivalence.get(obj.name, []):
+                    nodes.extend(self.get_nodes_by_attr('class_name', name))
+                return nodes
+
+    def get_script_node(self, name: str, instance: int):
+        return self._script_objects.get((name, instance), None)
+
+    def get_state_node(self, obj: ScriptObject):
+        if self.instance_selection:
+            return self.get_node(obj.instance)
+        else:
+            node_id = self._script_objects.get((obj.name, obj.instance), -1)
+        return None if node_id < 0 else self.get_node(node_id)
+
+    def has_edge(self, from_node: Node, relation: Relation, to_node: Node):
+        if to_node.id in self._removed_edges_from.get((from_node.id, relation), set()):
+            return False
+        elif to_node.id in self._new_edges_from.get((from_node.id, relation), set()):
+            return True
+        else:
+            return self._graph.has_edge(from_node, relation, to_node)
+
+    def get_node(self, node_id: int):
+        if node_id in self._new_nodes:
+            return self._new_nodes[node_id]
+        else:
+            return self._graph.get_node(node_id)
+
+    def get_nodes_from(self, from_node: Node, relation: Relation):
+        id_set = self._new_edges_from.get((from_node.id, relation), set())
+        id_set.update(self._graph.get_node_ids_from(from_node.id, relation))
+        removed_ids = self._removed_edges_from.get((from_node.id, relation), set())
+        id_set.difference_update(removed_ids)
+        result = []
+        for node_id in id_set:
+            if node_id in self._new_nodes:
+                result.append(self._new_nodes[node_id])
+            else:
+                result.append(self._graph.get_node(node_id))
+        return result
+
+    def get_node_ids_from(self, from_id: int, relation: Relation):
+        id_set = self._new_edges_from.get((from_id, relation), set())
+        id_set.update(self._graph.get_node_ids_from(from_id, relation))
+        removed_ids = self._removed_edges_from.get((from_id, relation), set())
+        id_set.difference_update(removed_ids)
+        return id_set
+
+    def get_node_ids_to(self, to_id: int, relation: Relation):
+        id_set = set(self._graph.get_node_ids_to(to_id, relation))
+        for (from_id, r), to_ids in self._new_edges_from.items():
+            if r == relation and to_id in to_ids:
+                id_set.add(from_id)
+        return {from_id for from_id in id_set if to_id not in self._removed_edges_from.get((from_id, relation), ())}
+
+    def get_nodes(self):
+        result = list(self._new_nodes.values())
+        for node in self._graph.get_nodes():
+            if node.id not in self._new_nodes:
+                result.append(node)
+        return result
+
+    def get_max_node_id(self):
+        return self._max_node_id
+
+    def get_nodes_by_attr(self, attr: str, value):
+        result = []
+        added_new = set()
+        for node in self._graph.get_nodes_by_attr(attr, value):
+            if node.id not in self._new_nodes:
+                result.append(node)
+            else:
+                new_node = self._new_nodes[node.id]
+                if getattr(new_node, attr) == value:
+                    result.append(new_node)
+                    added_new.add(new_node.id)
+        for new_node_id, new_node in self._new_nodes.items():
+            if new_node_id not in added_new and getattr(new_node, attr) == value:
+                result.append(new_node)
+        return result
+
+    def get_char_node(self, char_index: int):
+        return self._graph.get_char_node(char_index)
+
+    def get_room_connectivity(self):
+        return self._room_connectivity
+
+    def set_room_connectivity(self, room_connectivity):
+        self._room_connectivity = room_connectivity
+
+    def add_edge(self, from_node: Node, relation: Relation, to_node: Node):
+        self._own_changes()
+        if relation == Relation.BETWEEN:
+            self._room_connectivity = None
+        if (from_node.id, relation) in self._removed_edges_from:
+            to_node_ids = self._removed_edges_from[(from_node.id, relation)]
+            if to_node.id in to_node_ids:
+                to_node_ids.remove(to_node.id)
+                self._hash ^= _edge_key(from_node.id, relation, to_node.id)
+                return
+        if not self._graph.has_edge(from_node, relation, to_node):
+            to_node_ids = self._new_edges_from.setdefault((from_node.id, relation), set())
+            if to_node.id not in to_node_ids:
+                to_node_ids.add(to_node.id)
+                self._hash ^= _edge_key(from_node.id, relation, to_node.id)
+
+    def delete_edge(self, from_node: Node, relation: Relation, to_node: Node):
+        self._own_changes()
+        if relation == Relation.BETWEEN:
+            self._room_connectivity = None
+        if self._graph.has_edge(from_node, relation, to_node):
+            to_node_ids = self._removed_edges_from.setdefault((from_node.id, relation), set())
+            if to_node.id not in to_node_ids:
+                to_node_ids.add(to_node.id)
+                self._hash ^= _edge_key(from_node.id, relation, to_node.id)
+        elif (from_node.id, relation) in self._new_edges_from:
+            to_node_ids = self._new_edges_from[(from_node.id, relation)]
+            if to_node.id in to_node_ids:
+                to_node_ids.discard(to_node.id)
+                self._hash ^= _edge_key(from_node.id, relation, to_node.id)
+
+    def change_node(self, node: Node):
+        assert node.id in self._new_nodes or self._graph.get_node(node.id) is not None
+        self._own_changes()
+        if node.class_name in DOOR_CLASS_NAMES:
+            self._room_connectivity = None
+        if node.id in self._node_keys:
+            self._hash ^= self._node_keys[node.id]
+        else:
+            self._hash ^= _node_key(self._graph.get_node(node.id))
+        self._node_keys[node.id] = _node_key(node)
+        self._hash ^= self._node_keys[node.id]
+        self._new_nodes[node.id] = node
+
+    def add_node(self, node: Node):
+        self._own_changes()
+        if node.class_name in DOOR_CLASS_NAMES:
+            self._room_connectivity = None
+        self._max_node_id += 1
+        node.id = self._max_node_id
+        self._node_keys[node.id] = _node_key(node)
+        self._hash ^= self._node_keys[node.id]
+        self._new_nodes[node.id] = node
+
+    def change_state(self, changers: List['StateChanger'], node: Node = None, obj: ScriptObject = None, in_place = False):
+
+        new_state = EnvironmentState(self._graph, self._name_equivalence, self.instance_selection,
+                                     self.check_closed_doors)
+        # Shared until a door changes in new_state, which then drops only its own reference
+        new_state._room_connectivity = self._room_connectivity
+        new_state._hash = self._hash
+        if in_place:
+            self._own_changes()
+            new_state._node_keys = self._node_keys
+            new_state._new_nodes = self._new_nodes
+            new_state._removed_edges_from = self._removed_edges_from
+            new_state._new_edges_from = self._new_edges_from
+            new_state._script_objects = self._script_objects
+            new_state.executor_data = self.executor_data
+        else:
+            new_state._node_keys = self._node_keys.copy()
+            new_state._new_nodes = copy.deepcopy(self._new_nodes)
+            new_state._removed_edges_from = copy.deepcopy(self._removed_edges_from)
+            new_state._new_edges_from = copy.deepcopy(self._new_edges_from)
+            new_state._script_objects = copy.deepcopy(self._script_objects)
+            new_state.executor_data = copy.deepcopy(self.executor_data)
+
+        if obj is not None and node is not None:
+            new_state._bind_script_object(obj, node.id)
+        new_state.apply_changes(changers)
+
+        return new_state
+
+    def apply_changes(self, changers: List['StateChanger']):
+        # the changers may also change executor_data
+        self._own_changes()
+        for changer in changers:
+            changer.apply_changes(self)
+
+    def snapshot(self):
+        """Snapshot of the changes of the state, in O(1): the changes are shared with the snapshot until
+        the state changes, which then copies them. Restored with `restore`.
+        """
+        self._shared_changes = True
+        return StateSnapshot(self._graph, self._new_nodes, self._removed_edges_from, self._new_edges_from,
+                             self._script_objects, self.executor_data, self._node_keys, self._max_node_id,
+                             self._hash, self._room_connectivity)
+
+    def restore(self, snapshot: 'StateSnapshot'):
+        """Sets the changes of the state to the ones of a snapshot of a state of the same graph, in O(1)"""
+        assert snapshot.graph is self._graph, 'Snapshot of a state of another graph'
+        self._new_nodes = snapshot.new_nodes
+        self._removed_edges_from = snapshot.removed_edges_from
+        self._new_edges_from = snapshot.new_edges_from
+        self._script_objects = snapshot.script_objects
+        self.executor_data = snapshot.executor_data
+        self._node_keys = snapshot.node_keys
+        self._max_node_id = snapshot.max_node_id
+        self._hash = snapshot.hash
+        self._room_connectivity = snapshot.room_connectivity
+        self._shared_changes = True
+
+    def _own_changes(self):
+        if self._shared_changes:
+            self._node_keys = self._node_keys.copy()
+            self._new_nodes = copy.deepcopy(self._new_nodes)
+            self._removed_edges_from = copy.deepcopy(self._removed_edges_from)
+            self._new_edges_from = copy.deepcopy(self._new_edges_from)
+            self._script_objects = copy.deepcopy(self._script_objects)
+            self.executor_data = copy.deepcopy(self.executor_data)
+            self._shared_changes = False
+
+    def _bind_script_object(self, obj: ScriptObject, node_id: int):
+        self._own_changes()
+        prev_node_id = self._script_objects.get((obj.name, obj.instance), None)
+        if prev_node_id is not None:
+            self._hash ^= _script_object_key(obj.name, obj.instance, prev_node_id)
+        self._script_objects[(obj.name, obj.instance)] = node_id
+        self._hash ^= _script_object_key(obj.name, obj.instance, node_id)
+
+    def _compute_hash(self):
+        h = self._graph.fingerprint()
+        self._node_keys = {}
+        for node_id, node in self._new_nodes.items():
+            graph_node = self._graph.get_node(node_id)
+            if graph_node is not None:
+                h ^= _node_key(graph_node)
+            self._node_keys[node_id] = _node_key(node)
+            h ^= self._node_keys[node_id]
+        for (from_id, relation), to_ids in self._new_edges_from.items():
+            graph_ids = self._graph.get_node_ids_from(from_id, relation)
+            for to_id in to_ids:
+                if to_id not in graph_ids:
+                    h ^= _edge_key(from_id, relation, to_id)
+        for (from_id, relation), to_ids in self._removed_edges_from.items():
+            graph_ids = self._graph.get_node_ids_from(from_id, relation)
+            for to_id in to_ids:
+                if to_id in graph_ids:
+                    h ^= _edge_key(from_id, relation, to_id)
+        for (name, instance), node_id in self._script_objects.items():
+            h ^= _script_object_key(name, instance, node_id)
+        self._hash = h
+
+    def fingerprint(self):
+        """64-bit Zobrist hash of the graph with the changes of this state, of the script object bindings
+        and of the executor data. States with the same content have the same fingerprint, also when
+        they are built on different (but equal) graphs.
+        """
+        h = self._hash
+        for key, value in self.executor_data.items():
+            h ^= _executor_data_key(key, value)
+        return h
+
+    def get_delta(self):
+        """Changes with respect to the graph, without references to the graph (can be pickled)"""
+        return {'new_nodes': copy.deepcopy(self._new_nodes),
+                'removed_edges_from': copy.deepcopy(self._removed_edges_from),
+                'new_edges_from': copy.deepcopy(self._new_edges_from),
+                'script_objects': copy.deepcopy(self._script_objects),
+                'executor_data': copy.deepcopy(self.executor_data),
+                'max_node_id': self._max_node_id}
+
+    @staticmethod
+    def from_delta(graph: EnvironmentGraph, name_equivalence, delta, instance_selection: bool=False,
+                   check_closed_doors: bool=False):
+        state = EnvironmentState(graph, name_equivalence, instance_selection, check_closed_doors)
+        state._new_nodes = delta['new_nodes']
+        state._removed_edges_from = delta['removed_edges_from']
+        state._new_edges_from = delta['new_edges_from']
+        state._script_objects = delta['script_objects']
+        state.executor_data = delta['executor_data']
+        state._max_node_id = delta['max_node_id']
+        state._compute_hash()
+        return state
+
+    def to_dict(self):
+        edges = []
+        from_pairs = self._new_edges_from.keys() | self._graph.get_from_pairs()
+        for from_n, r in from_pairs:
+            for to_n in self.get_node_ids_from(from_n, r):
+                edges.append({'from_id': from_n, 'relation_type': r.name, 'to_id': to_n})
+        return {'nodes': [n.to_dict() for n in self.get_nodes()], 'edges': edges}
+
+
+class StateSnapshot(object):
+    """Changes of an EnvironmentState, taken by EnvironmentState.snapshot; must not be changed"""
+
+    def __init__(self, graph: EnvironmentGraph, new_nodes, removed_edges_from, new_edges_from, script_objects,
+                 executor_data, node_keys, max_node_id, hash, room_connectivity):
+        self.graph = graph
+        self.new_nodes = new_nodes
+        self.removed_edges_from = removed_edges_from
+        self.new_edges_from = new_edges_from
+        self.script_objects = script_objects
+        self.executor_data = executor_data
+        self.node_keys = node_keys
+        self.max_node_id = max_node_id
+        self.hash = hash
+        self.room_connectivity = room_connectivity
+
+
+# NodeEnumerator-s
+###############################################################################
+
+
+class NodeEnumerator(object):
+
+    @abstractmethod
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        pass
+
+    def compile(self):
+        """
+        :return: function (state, **kwargs) -> iterable of nodes, equivalent to enumerate
+        """
+        return self.enumerate
+
+
+class AnyNode(NodeEnumerator):
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        return state.get_nodes()
+
+
+class NodeInstance(NodeEnumerator):
+
+    def __init__(self, node: Node):
+        self.node = node
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        yield state.get_node(self.node.id)
+
+    def compile(self):
+        node_id = self.node.id
+        return lambda state, **kwargs: (state.get_node(node_id),)
+
+
+class NodeParam(NodeEnumerator):
+
+    def __init__(self, name: str='node'):
+        self.name = name
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        if self.name not in kwargs:
+            raise Exception('"{}" param not set'.format(self.name))
+        yield kwargs[self.name]
+
+    def compile(self):
+        name = self.name
+        return lambda state, **kwargs: (kwargs[name],)
+
+
+class RelationFrom(NodeEnumerator):
+
+    def __init__(self, from_node: Node, relation: Relation):
+        self.from_node = from_node
+        self.relation = relation
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        return state.get_nodes_from(self.from_node, self.relation)
+
+
+class CharacterNode(NodeEnumerator):
+
+    def __init__(self, char_index: int):
+        self.char_index = char_index
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        return state.get_char_node(self.char_index)
+
+
+class ClassNameNode(NodeEnumerator):
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        return state.get_nodes_by_attr('class_name', self.class_name)
+
+class ObjectInsideNode(NodeEnumerator):
+
+    def __init__(self, node: Node):
+        self.container_node = node
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in state.get_nodes():
+            if state.evaluate(_IS_INSIDE_PARAM, node=n, to_node=self.container_node):
+                 yield n
+
+    def compile(self):
+        container_id = self.container_node.id
+        return lambda state, **kwargs: [state.get_node(node_id)
+                                        for node_id in state.get_node_ids_to(container_id, Relation.INSIDE)]
+
+class ObjectOnNode(NodeEnumerator):
+
+    def __init__(self, node: Node):
+        self.surface_node = node
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in state.get_nodes():
+            if state.evaluate(_IS_ON_PARAM, node=n, to_node=self.surface_node):
+                 yield n
+
+    def compile(self):
+        surface_id = self.surface_node.id
+        return lambda state, **kwargs: [state.get_node(node_id)
+                                        for node_id in state.get_node_ids_to(surface_id, Relation.ON)]
+
+
+class BodyNode(NodeEnumerator):
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in state.get_nodes():
+            if Property.BODY_PART in n.properties:
+                yield n
+
+
+class SurfaceObjectNode(NodeEnumerator):
+    """Find the objects that support `node`
+    """
+    def __init__(self, node: Node):
+        self.node = node
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in state.get_nodes_from(self.node, Relation.ON):
+            yield n
+
+class BoxObjectNode(NodeEnumerator):
+    """Find the objects that contain `node`
+    """
+    def __init__(self, node: Node):
+        self.node = node
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in state.get_nodes_from(self.node, Relation.INSIDE):
+            if n.category != 'Rooms':
+                yield n
+
+
+class FilteredNodes(NodeEnumerator):
+
+    def __init__(self, enumerator: NodeEnumerator, condition: 'LogicalValue'):
+        self.enumerator = enumerator
+        self.condition = condition
+
+    def enumerate(self, state: EnvironmentState, **kwargs):
+        for n in self.enumerator.enumerate(state):
+            if self.condition.evaluate(n):
+                yield n
+
+
+# NodeFilter-s
+###############################################################################
+
+
+class NodeFilter(object):
+
+    @abstractmethod
+    def filter(self, node: Node, params: dict=None):
+        """
+        :param params: parameters of the evaluation (keyword arguments of LogicalValue.evaluate)
+        """
+        pass
+
+    def compile(self):
+        """
+        :return: function (node, params) -> bool, equivalent to filter
+        """
+        return self.filter
+
+
+class NodeInstanceFilter(NodeFilter):
+
+    def __init__(self, node: Node):
+        self.node = node
+
+    def filter(self, node: Node, params: dict=None):
+        return node.id == self.node.id
+
+    def compile(self):
+        node_id = self.node.id
+        return lambda node, params=None: node.id == node_id
+
+
+class NodeParamFilter(NodeFilter):
+    """Accepts the node given by the parameter name of the evaluation"""
+
+    def __init__(self, name: str='node'):
+        self.name = name
+
+    def filter(self, node: Node, params: dict=None):
+        return node.id == params[self.name].id
+
+
+class NodeConditionFilter(NodeFilter):
+
+    def __init__(self, value: 'LogicalValue'):
+        self.value = value
+
+    def filter(self, node: Node, params: dict=None):
+        return self.value.evaluate(node)
+
+    def compile(self):
+        value = self.value.compiled()
+        return lambda node, params=None: value(node)
+
+
+class AnyNodeFilter(NodeFilter):
+
+    def filter(self, node: Node, params: dict=None):
+        return True
+
+
+def _compile_edge_count(relation: Relation, to_nodes: NodeFilter):
+    """
+    :return: function (state, from_node, params) -> number of edges (from_node, relation, n) where n is
+        accepted by to_nodes. Filters of a single node test the edge instead of enumerating the edges.
+    """
+    if isinstance(to_nodes, NodeInstanceFilter):
+        to_node = to_nodes.node
+        return lambda state, from_node, params: 1 if state.has_edge(from_node, relation, to_node) else 0
+    elif isinstance(to_nodes, NodeParamFilter):
+        name = to_nodes.name
+        return lambda state, from_node, params: 1 if state.has_edge(from_node, relation, params[name]) else 0
+    elif isinstance(to_nodes, AnyNodeFilter):
+        return lambda state, from_node, params: len(state.get_node_ids_from(from_node.id, relation))
+    else:
+        to_filter = to_nodes.compile()
+
+        def _count(state, from_node, params):
+            return sum(1 for tn in state.get_nodes_from(from_node, relation) if to_filter(tn, params))
+        return _count
+
+
+# LogicalValue-s
+###############################################################################
+
+
+class LogicalValue(object):
+
+    _compiled = None
+
+    @abstractmethod
+    def evaluate(self, param, **kwargs):
+        pass
+
+    def compile(self):
+        """
+        :return: function (param, **kwargs) -> bool, equivalent to evaluate
+        """
+        return self.evaluate
+
+    def compiled(self):
+        """Compiled function of this value, built on first use"""
+        if self._compiled is None:
+            self._compiled = self.compile()
+        return self._compiled
+
+
+class Not(LogicalValue):
+
+    def __init__(self, value1: LogicalValue):
+        self.value1 = value1
+
+    def evaluate(self, param, **kwargs):
+        return not self.value1.evaluate(param, **kwargs)
+
+    def compile(self):
+        value1 = self.value1.compiled()
+        return lambda param, **kwargs: not value1(param, **kwargs)
+
+
+class And(LogicalValue):
+
+    def __init__(self, *args: LogicalValue):
+        self.values = args
+
+    def evaluate(self, param, **kwargs):
+        for value in self.values:
+            if not value.evaluate(param, **kwargs):
+                return False
+        return True
+
+    def compile(self):
+        values = tuple(value.compiled() for value in self.values)
+        if len(values) == 2:
+            value1, value2 = values
+            return lambda param, **kwargs: value1(param, **kwargs) and value2(param, **kwargs)
+        return lambda param, **kwargs: all(value(param, **kwargs) for value in values)
+
+
+class Constant(LogicalValue):
+
+    def __init__(self, value: bool):
+        self.value = value
+
+    def evaluate(self, param, **kwargs):
+        return self.value
+
+    def compile(self):
+        value = self.value
+        return lambda param, **kwargs: value
+
+
+class ExistsRelation(LogicalValue):
+
+    def __init__(self, from_nodes: NodeEnumerator, relation: Relation, to_nodes: NodeFilter):
+        self.from_nodes = from_nodes
+        self.relation = relation
+        self.to_nodes = to_nodes
+
+    def evaluate(self, state: EnvironmentState, **kwargs):
+        for fn in self.from_nodes.enumerate(state, **kwargs):
+            for tn in state.get_nodes_from(fn, self.relation):
+                if self.to_nodes.filter(tn, kwargs):
+                    return True
+        return False
+
+    def compile(self):
+        from_nodes = self.from_nodes.compile()
+        edge_count = _compile_edge_count(self.relation, self.to_nodes)
+
+        def _exists(state, **kwargs):
+            for fn in from_nodes(state, **kwargs):
+                if edge_count(state, fn, kwargs) > 0:
+                    return True
+            return False
+        return _exists
+
+
+class CountRelations(LogicalValue):
+    def __init__(self, from_nodes: NodeEnumerator, relation: Relation, to_nodes: NodeFilter, min_value: int):
+        """
+        Evaluates to true if there are at least min_value edges satisfying the conditions
+        """
+        self.from_nodes = from_nodes
+        self.relation = relation
+        self.to_nodes = to_nodes
+        self.min_value = min_value
+
+    def evaluate(self, state: EnvironmentState, **kwargs):
+        count = 0
+        for fn in self.from_nodes.enumerate(state, **kwargs):
+            for tn in state.get_nodes_from(fn, self.relation):
+                if self.to_nodes.filter(tn, kwargs):
+                    count += 1
+                    if count >= self.min_value:
+                        return True
+        return False
+
+    def compile(self):
+        from_nodes = self.from_nodes.compile()
+        edge_count = _compile_edge_count(self.relation, self.to_nodes)
+        min_value = self.min_value
+
+        def _count_at_least(state, **kwargs):
+            count = 0
+            for fn in from_nodes(state, **kwargs):
+                count += edge_count(state, fn, kwargs)
+                if count >= min_value:
+                    return True
+            return False
+        return _count_at_least
+
+
+class ExistRelations(LogicalValue):
+
+    def __init__(self, from_nodes: NodeEnumerator, rf_pairs):
+        self.from_nodes = from_nodes
+        self.rf_pairs = rf_pairs
+
+    def evaluate(self, state: EnvironmentState, **kwargs):
+        for fn in self.from_nodes.enumerate(state, **kwargs):
+            node_ok = True
+            for (relation, node_filter) in self.rf_pairs:
+                filter_ok = False
+                for tn in state.get_nodes_from(fn, relation):
+                    if node_filter.filter(tn, kwargs):
+                        filter_ok = True
+                        break
+                if not filter_ok:
+                    node_ok = False
+                    break
+            if node_ok:
+                return True
+        return False
+
+    def compile(self):
+        from_nodes = self.from_nodes.compile()
+        edge_counts = tuple(_compile_edge_count(relation, node_filter) for relation, node_filter in self.rf_pairs)
+
+        def _exist_all(state, **kwargs):
+            for fn in from_nodes(state, **kwargs):
+                if all(edge_count(state, fn, kwargs) > 0 for edge_count in edge_counts):
+                    return True
+            return False
+        return _exist_all
+
+
+class IsRoomNode(LogicalValue):
+
+    def __init__(self, room_name: str=None):
+        self.room_name = room_name
+
+    def evaluate(self, node: GraphNode, **kwargs):
+        return node.category == 'Rooms' and (self.room_name is None or node.class_name == self.room_name)
+
+    def compile(self):
+        room_name = self.room_name
+        if room_name is None:
+            return lambda node, **kwargs: node.category == 'Rooms'
+        return lambda node, **kwargs: node.category == 'Rooms' and node.class_name == room_name
+
+
+class NodeAttrEq(LogicalValue):
+
+    def __init__(self, attr: str, value):
+        self.attr = attr
+        self.value = value
+
+    def evaluate(self, node: GraphNode, **kwargs):
+        return self.value == getattr(node, self.attr)
+
+    def compile(self):
+        attr, value = self.attr, self.value
+        return lambda node, **kwargs: value == getattr(node, attr)
+
+
+class NodeAttrIn(LogicalValue):
+
+    def __init__(self, value, attr: str):
+        self.value = value
+        self.attr = attr
+
+    def evaluate(self, node: GraphNode, **kwargs):
+        return self.value in getattr(node, self.attr)
+
+    def compile(self):
+        attr, value = self.attr, self.value
+        if attr == 'states':
+            return lambda node, **kwargs: value in node.states
+        elif attr == 'properties':
+            return lambda node, **kwargs: value in node.properties
+        return lambda node, **kwargs: value in getattr(node, attr)
+
+
+class NodeClassNameEq(LogicalValue):
+
+    def __init__(self, class_name: str):
+        self.class_name = class_name
+
+    def evaluate(self, node: GraphNode, **kwargs):
+        return self.class_name == node.class_name
+
+    def compile(self):
+        class_name = self.class_name
+        return lambda node, **kwargs: class_name == node.class_name
+
+
+# Conditions with node parameters (node, to_node), compiled once and shared
+_IS_ON_PARAM = ExistsRelation(NodeParam(), Relation.ON, NodeParamFilter('to_node'))
+_IS_INSIDE_PARAM = ExistsRelation(NodeParam(), Relation.INSIDE, NodeParamFilter('to_node'))
+
+
+# StateChanger-s
+###############################################################################
+
+
+class StateChanger(object):
+
+    @abstractmethod
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        pass
+
+
+def _enumerators(*enumerators: NodeEnumerator):
+    if compile_conditions:
+        return [enumerator.compile() for enumerator in enumerators]
+    return [enumerator.enumerate for enumerator in enumerators]
+
+
+class AddEdges(StateChanger):
+
+    def __init__(self, from_node: NodeEnumerator, relation: Relation, to_node: NodeEnumerator, add_reverse=False):
+        self.from_node = from_node
+        self.relation = relation
+        self.to_node = to_node
+        self.add_reverse = add_reverse
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        tm = TimeMeasurement.start('AddEdges')
+        from_nodes, to_nodes = _enumerators(self.from_node, self.to_node)
+        for n1 in from_nodes(state):
+            for n2 in to_nodes(state):
+                state.add_edge(n1, self.relation, n2)
+                if self.add_reverse:
+                    state.add_edge(n2, self.relation, n1)
+        TimeMeasurement.stop(tm)
+
+
+class DeleteEdges(StateChanger):
+
+    def __init__(self, from_node: NodeEnumerator, relations, to_node: NodeEnumerator, delete_reverse=False):
+        self.from_node = from_node
+        self.relations = relations
+        self.to_node = to_node
+        self.delete_reverse = delete_reverse
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        tm = TimeMeasurement.start('DeleteEdges')
+        if compile_conditions and isinstance(self.to_node, AnyNode):
+            # deleting a missing edge does nothing, only the existing edges of n1 are enumerated
+            for n1 in self.from_node.compile()(state):
+                for e in self.relations:
+                    for n2_id in list(state.get_node_ids_from(n1.id, e)):
+                        state.delete_edge(n1, e, state.get_node(n2_id))
+                    if self.delete_reverse:
+                        for n2_id in state.get_node_ids_to(n1.id, e):
+                            state.delete_edge(state.get_node(n2_id), e, n1)
+        else:
+            from_nodes, to_nodes = _enumerators(self.from_node, self.to_node)
+            for n1 in from_nodes(state):
+                for e in self.relations:
+                    for n2 in to_nodes(state):
+                        state.delete_edge(n1, e, n2)
+                        if self.delete_reverse:
+                            state.delete_edge(n2, e, n1)
+        TimeMeasurement.stop(tm)
+
+
+class ChangeNode(StateChanger):
+
+    def __init__(self, node: GraphNode):
+        self.node = node
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        state.change_node(self.node)
+
+
+class AddNode(StateChanger):
+
+    def __init__(self, node: GraphNode):
+        self.node = node
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        state.add_node(self.node)
+
+
+class ClearExecDataKey(StateChanger):
+
+    def __init__(self, key):
+        self.key = key
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        state.executor_data.pop(self.key, None)
+
+
+class AddExecDataValue(StateChanger):
+
+    def __init__(self, key, value):
+        self.key = key
+        self.value = value
+
+    def apply_changes(self, state: EnvironmentState, **kwargs):
+        state.executor_data[self.key] = self.value
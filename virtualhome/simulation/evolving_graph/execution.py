@@ -1,1543 +1,1927 @@
-import time
-import queue
-from typing import Optional
-from . import common
-from .environment import *
-from .scripts import Action, ScriptLine, Script
-
-
-# ExecutionInfo
-###############################################################################
-
-class ExecutionInfo(object):
-
-    def __init__(self):
-        self.messages = []
-        self.current_line = None
-
-    def error(self, msg: str, *args):
-        self.messages.append(msg.format(*args) + ' when executing "' + self.current_line_info() + '"')
-
-    def set_current_line(self, sl: ScriptLine):
-        self.current_line = sl
-
-    def script_object_found_error(self, so: ScriptObject):
-        self.error(str(so) + " cannot be found")
-
-    def object_found_error(self):
-        if self.current_line is not None:
-            self.script_object_found_error(self.current_line.object())
-
-    def current_line_info(self):
-        return '' if self.current_line is None else str(self.current_line)
-
-    def get_error_string(self):
-        return ','.join(self.messages)
-
-
-# ActionExecutor-s
-###############################################################################
-
-class ActionExecutor(object):
-
-    @abstractmethod
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index):
-        """
-        :param script: future script, scripts.Script object containing script lines
-            yet to be executed, has at least one item
-        :param state: current state, environment.EnvironmentState object
-        :param info: information (typically an error) about execution
-        :prarm char_index: index of the character for this action 
-        :return: enumerates possible states after execution of script_line
-        """
-        pass
-
-
-class UnknownExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index):
-        raise ExecutionException("Execution of {0} is not supported", script[0].action)
-
-
-class JoinedExecutor(ActionExecutor):
-
-    def __init__(self, *args):
-        self.executors = args
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index):
-        for e in self.executors:
-            for s in e.execute(script, state, info, char_index):
-                yield s
-
-
-class WalkExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        current_obj = current_line.object()
-
-        #print("in walk execution, char_index = {}".format(char_index))
-
-        # select objects based on current_obj
-        for node in state.select_nodes(current_obj):
-            node_room = _get_room_node(state, node)
-            #print(state, node)
-            if self.check_walk(state, node, info, char_index) and node_room is not None:
-
-                changes = [DeleteEdges(CharacterNode(char_index),
-                                       [Relation.INSIDE, Relation.CLOSE, Relation.FACING],
-                                       AnyNode(), delete_reverse=True),
-                           AddEdges(CharacterNode(char_index), Relation.INSIDE, NodeInstance(node_room)),
-                     ]
-
-                if node_room != node:
-                    changes += [
-                           AddEdges(CharacterNode(char_index), Relation.CLOSE, BoxObjectNode(node), add_reverse=True),
-                           AddEdges(CharacterNode(char_index), Relation.CLOSE, BodyNode(), add_reverse=True),
-                           AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True)
-                     ]
-
-                # close to object in hands
-                char_node = _get_character_node(state, char_index)
-                char_room = _get_room_node(state, char_node)
-                nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
-                for node_in_hands in nodes_in_hands:
-                    changes.append(DeleteEdges(NodeInstance(node_in_hands), [Relation.INSIDE, Relation.CLOSE, Relation.FACING], AnyNode(), delete_reverse=True))
-
-                for node_in_hands in nodes_in_hands:
-                    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node_in_hands), add_reverse=True))
-                    changes.append(AddEdges(NodeInstance(node_in_hands), Relation.INSIDE, NodeInstance(char_room)))
-
-                # close to all objects on node
-                # if Property.SURFACES in node.properties:
-                #    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, ObjectOnNode(node), add_reverse=True))
-
-                # close to all objects inside
-                if Property.CAN_OPEN in node.properties:
-                    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, ObjectInsideNode(node), add_reverse=True))
-
-                # close to all objects that node is on
-                changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, SurfaceObjectNode(node), add_reverse=True))
-
-
-                if not modify:
-                    yield state
-                else:
-                    yield state.change_state(changes, node, current_obj, in_place=in_place)
-    
-
-    def check_walk(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-
-        #print("in check_walk, char_index = {}".format(char_index))
-
-        char_node = _get_character_node(state, char_index)
-        if State.SITTING in char_node.states or State.LYING in char_node.states:
-            info.error('{} is sitting', char_node)
-            return False
-        
-        char_room = _get_room_node(state, char_node)
-        if char_room is None:
-
-            assert False, "Char_room is none!"
-
-        node_room = _get_room_node(state, node)
-
-        doors = state.get_nodes_by_attr('class_name', 'door')
-        doorjambs = state.get_nodes_by_attr('class_name', 'doorjamb')
-
-        if node in (doors + doorjambs):
-            # door that connect the char_room
-            if state.evaluate(ExistsRelation(NodeInstance(node), Relation.BETWEEN, NodeInstanceFilter(char_room))) or \
-                state.evaluate(ExistsRelation(NodeInstance(char_room), Relation.BETWEEN, NodeInstanceFilter(node))):
-                return True
-
-        # the return list is in reverse orders, living room --> door.1 --> dining room --> door.181 --> bathroom --> door.16 --> living room
-        # suppose all the doors are closed, the return list would be like [door.16, door.181, door.1]
-        closed_doors = _check_closed_doors(state, char_room, node_room)
-
-        if closed_doors is None:
-            info.error('No path between between {} and {}', char_room, node_room)
-            return False
-        if len(closed_doors) > 0:
-            # walk to the nearest closed door is fine
-            if node.id != closed_doors[-1].id:
-                info.error("Door(s) {} between {} and {} is (are) closed", ', '.join([str(d) for d in closed_doors]),
-                            char_room, node_room)
-                return False
-
-        return True
-
-
-class _FindExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        current_obj = current_line.object()
-
-        # select objects based on current_obj
-        for node in state.select_nodes(current_obj):
-            if self.check_find(state, node, info, char_index):
-                if modify:
-                    yield state.change_state(
-                        [DeleteEdges(CharacterNode(char_index), [Relation.FACING], AnyNode()), 
-                         AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True)],
-                        node,
-                        current_obj,
-                    in_place=in_place)
-                else:
-                    yield state
-
-    def check_find(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        if not _is_character_close_to(state, node, char_index):
-            char_node = _get_character_node(state, char_index)
-            info.error('{} is not close to {}', char_node, node)
-            return False
-        
-        return True
-
-
-
-_walk_find_executor = JoinedExecutor(WalkExecutor(), _FindExecutor())
-_only_find_executor = _FindExecutor()
-
-
-class FindExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        current_obj = current_line.object()
-        for node in state.select_nodes(current_obj):
-            char_node = _get_character_node(state, char_index)
-
-            if state.evaluate(ExistsRelation(NodeInstance(node), Relation.ON, NodeInstanceFilter(char_node))):
-                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
-            elif Property.BODY_PART in node.properties:
-                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
-            elif _is_character_close_to(state, node, char_index):
-                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
-            elif State.SITTING in char_node.states or State.LYING in char_node.states:
-                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
-            else:
-                return _walk_find_executor.execute(script, state, info, char_index, modify, in_place)
-        info.error('Could not find object {}'.format(current_obj.name))
-
-
-class GreetExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        else:
-            if self.check_if_person(state, node, info):
-                if modify:
-                    yield state.change_state([], in_place=in_place)
-                else:
-                    yield state
-
-    def check_if_person(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo):
-        if Property.PERSON not in node.properties:
-            info.error('{} is not person', node)
-            return False
-        return True
-
-
-class SitExecutor(ActionExecutor):
-
-    _MAX_OCCUPANCIES = {
-        'couch': 4,
-        'bed': 4,
-        'chair': 1,
-        'loveseat': 2,
-        'sofa': 4,
-        'toilet': 1,
-        'pianobench': 2,
-        'bench': 2
-    }
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_sittable(state, node, info, char_index):
-            char_node = _get_character_node(state, char_index)
-            new_char_node = char_node.copy()
-            new_char_node.states.discard(State.LYING)
-            new_char_node.states.add(State.SITTING)
-            if modify:
-                yield state.change_state(
-                    [AddEdges(CharacterNode(char_index), Relation.ON, NodeInstance(node)),
-                     AddEdges(CharacterNode(char_index), Relation.FACING, RelationFrom(node, Relation.FACING)),
-                     ChangeNode(new_char_node)],
-                    in_place=in_place
-                )
-            else:
-                yield state
-
-    def check_sittable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', char_node, node)
-            return False
-        if State.SITTING in char_node.states:
-            info.error('{} is sitting', char_node)
-            return False
-        if Property.SITTABLE not in node.properties:
-            info.error('{} is not sittable', node)
-            return False
-        max_occupancy = self._MAX_OCCUPANCIES.get(node.class_name, 1)
-        if state.evaluate(CountRelations(AnyNode(), Relation.ON, NodeInstanceFilter(node),
-                                         min_value=max_occupancy)):
-            info.error('Too many things on {}', node)
-            return False
-
-        return True
-
-
-
-class StandUpExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        info.set_current_line(script[0])
-        char_node = _get_character_node(state, char_index)
-        if State.SITTING in char_node.states or State.LYING in char_node.states:
-            new_char_node = char_node.copy()
-            new_char_node.states.discard(State.SITTING)
-            new_char_node.states.discard(State.LYING)
-            if modify:
-                yield state.change_state([ChangeNode(new_char_node)], in_place=in_place)
-            else:
-                yield state
-        else:
-            info.error('{} is not sitting', char_node)
-            
-
-class GrabExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        else:
-            new_relation = self.check_grabbable(state, node, info, char_index)
-            if new_relation is not None:
-                char_node = _get_character_node(state, char_index)
-                char_room = _get_room_node(state, char_node)
-                changes = [DeleteEdges(NodeInstance(node), [Relation.ON, Relation.INSIDE, Relation.CLOSE, Relation.HOLDS_LH, Relation.HOLDS_RH], AnyNode(), delete_reverse=True),
-                           AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True), 
-                           AddEdges(CharacterNode(char_index), new_relation, NodeInstance(node)), 
-                           AddEdges(NodeInstance(node), Relation.INSIDE, NodeInstance(char_room))]
-                new_close, relation = _find_first_node_from(state, node, [Relation.ON, Relation.INSIDE, Relation.CLOSE])
-                if new_close is not None:
-                    changes += [AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(new_close), add_reverse=True),
-                                AddExecDataValue((Action.GRAB, node.id), (new_close, relation))]
-                if modify:
-                    yield state.change_state(changes, in_place=in_place)
-                else:
-                    yield state
-
-    def check_grabbable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index) -> Optional[Relation]:
-        if Property.GRABBABLE not in node.properties and node.class_name not in ['water', 'child']:
-            info.error('{} is not grabbable', node)
-            return None
-
-        (dest_node, relation) = state.executor_data.get((Action.GRAB, node.id), (None, None))
-        if dest_node is not None:
-            info.error('{} already grabbed', node)
-            return None
-        if not _is_character_close_to(state, node, char_index):
-            char_node = _get_character_node(state, char_index)
-            info.error('{} is not close to {}', char_node, node)
-            return None
-        if _is_inside(state, node):
-            info.error('{} is inside other closed thing', node)
-            return None
-        new_relation = _find_free_hand(state, char_index)
-        if new_relation is None:
-            char_node = _get_character_node(state, char_index)
-            info.error('{} does not have a free hand', char_node)
-            return None
-        return new_relation
-
-
-
-class OpenExecutor(ActionExecutor):
-
-    def __init__(self, close: bool):
-        """
-        :param close: False: OpenExecutor, True: CloseExecutor
-
-        """
-        self.close = close
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_openable(state, node, info, char_index):
-            new_node = node.copy()
-            new_node.states.discard(State.OPEN if self.close else State.CLOSED)
-            new_node.states.add(State.CLOSED if self.close else State.OPEN)
-            if modify:
-                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
-            else:
-                yield state
-
-    def check_openable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        
-        if Property.CAN_OPEN not in node.properties and node.class_name not in ["desk", "window"]:
-            info.error('{} can not be opened', node)
-            return False
-
-        if not _is_character_close_to(state, node, char_index):
-            char_node = _get_character_node(state, char_index)
-            info.error('{} is not close to {}', char_node, node)
-            return False
-        
-        if not self.close and _find_free_hand(state, char_index) is None:
-            char_node = _get_character_node(state, char_index)
-            info.error('{} does not have a free hand', char_node)
-            return False
-
-        s = State.OPEN if self.close else State.CLOSED
-        if s not in node.states:
-            info.error('{} is not {}', node, s.name.lower())
-            return False
-
-        if not self.close and State.ON in node.states:
-            info.error('{} is still on'.format(node))
-            return False
-        return True
-
-
-
-class PutExecutor(ActionExecutor):
-
-    def __init__(self, relation: Relation):
-        """
-        :param relation: Relation.ON: PutExecutor, Relation.INSIDE: PutInExecutor:
-
-        """
-        self.relation = relation
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        src_node = state.get_state_node(current_line.object())
-        dest_node = state.get_state_node(current_line.subject())
-        if src_node is None or dest_node is None:
-            info.script_object_found_error(current_line.object() if src_node is None else current_line.subject())
-        elif _check_puttable(state, src_node, dest_node, self.relation, info, char_index):
-            if modify:
-                yield state.change_state(
-                    [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node)),
-                     AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
-                     AddEdges(NodeInstance(src_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
-                     AddEdges(NodeInstance(src_node), self.relation, NodeInstance(dest_node)),
-                     ClearExecDataKey((Action.GRAB, src_node.id))], in_place=in_place
-                )
-            else:
-                yield state
-
-
-class PutBackExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        src_node = state.get_state_node(current_line.object())
-        if src_node is None:
-            info.object_found_error()
-        else:
-            (dest_node, relation) = state.executor_data.get((Action.GRAB, src_node.id), (None, None))
-            if dest_node is None:
-                info.error('{} not grabbed', src_node)
-            else:
-                dest_node = state.get_node(dest_node.id)
-                if _check_puttable(state, src_node, dest_node, relation, info, char_index):
-                    if modify:
-                        yield state.change_state(
-                            [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node)),
-                             AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
-                             AddEdges(NodeInstance(src_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
-                             AddEdges(NodeInstance(src_node), relation, NodeInstance(dest_node)),
-                             ClearExecDataKey((Action.GRAB, src_node.id))], in_place=in_place
-                        )
-                else:
-                    yield state
-
-
-def _check_puttable(state: EnvironmentState, src_node: GraphNode, dest_node: GraphNode, relation: Relation,
-                    info: ExecutionInfo, char_index):
-    hand_rel = _find_holding_hand(state, src_node, char_index)
-    if hand_rel is None:
-        char_node = _get_character_node(state, char_index)
-        info.error('{} is not holding {}', char_node, src_node)
-        return False
-    if not _is_character_close_to(state, dest_node, char_index):
-        char_node = _get_character_node(state, char_index)
-        info.error('{} is not close to {}', char_node, dest_node)
-        return False
-    if relation == Relation.INSIDE:
-        if Property.CAN_OPEN not in dest_node.properties or State.OPEN in dest_node.states:
-            return True
-        else:
-            info.error('{} is not open or is not openable', dest_node)
-            return False
-    return True
-
-
-class SwitchExecutor(ActionExecutor):
-
-    def __init__(self, switch_on: bool):
-        """
-            SwitchOnExecutor: True
-            SwitchOffExecutor: False
-        """
-        self.switch_on = switch_on
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_switchable(state, node, info, char_index):
-            new_node = node.copy()
-            new_node.states.discard(State.OFF if self.switch_on else State.ON)
-            new_node.states.add(State.ON if self.switch_on else State.OFF)
-            if modify:
-                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
-            else:
-                yield state
-
-    def check_switchable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        s = State.OFF if self.switch_on else State.ON
-
-        if Property.HAS_SWITCH not in node.properties:
-            info.error('{} does not have a switch', node)
-            return False
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-        #if _find_free_hand(state, char_index) is None:
-        #    info.error('{} does not have a free hand', _get_character_node(state, char_index))
-        #    return False
-        if s not in node.states:
-            info.error('{} is not {}', node, s.name.lower())
-            return False
-        if self.switch_on and State.PLUGGED_OUT in node.states:
-            info.error('{} is unplugged', node)
-            return False
-        return True
-
-
-class DrinkExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_drinkable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else: 
-                yield state
-
-    def check_drinkable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        if Property.DRINKABLE not in node.properties and Property.RECIPIENT not in node.properties:
-            info.error('{} is not drinkable or not recipient', node)
-            return False
-        hand_rel = _find_holding_hand(state, node, char_index)
-        if hand_rel is None:
-            info.error('{} is not holding {}', _get_character_node(state, char_index), node)
-            return False
-        return True
-
-
-class TurnToExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_turn_to(state, node, info):
-            if modify:
-                yield state.change_state(
-                    [DeleteEdges(CharacterNode(char_index), [Relation.FACING], AnyNode()), 
-                     AddEdges(CharacterNode(char_index), Relation.FACING, NodeInstance(node))], in_place=in_place
-                )
-            else:
-                yield state
-
-    def check_turn_to(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo):
-        return True
-
-
-class LookAtExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_lookat(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_lookat(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-        if not _is_character_face_to(state, node, char_index):
-            info.error('{} does not face {}', char_node, node)
-            return False
-
-        return True
-
-
-class WipeExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_wipe(state, node, info, char_index):
-            new_node = node.copy()
-            new_node.states.discard(State.DIRTY)
-            new_node.states.add(State.CLEAN)
-            if modify:
-                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
-            else:
-                yield state
-
-    def check_wipe(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', char_node, node)
-            return False
-
-        #if Property.SURFACES not in node.properties:
-        #    info.error('{} is not a surface', node)
-        #    return False
-
-        nodes_in_hands = _find_nodes_from(state, char_node, [Relation.HOLDS_RH, Relation.HOLDS_LH])
-        if len(nodes_in_hands) == 0:
-            info.error('{} does not hold anything in hands', char_node)
-            return 
-
-        return True
-
-
-class PutOnExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_puton(state, node, info, char_index):
-            if modify:
-                yield state.change_state([
-                    AddEdges(NodeInstance(node), Relation.ON, CharacterNode(char_index)),
-                    DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(node)),
-                ], in_place=in_place)
-            else:
-                yield state
-
-    def check_puton(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-        nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
-        
-        if not any([n.id == node.id for n in nodes_in_hands]):
-            info.error('{} is not holding {}', char_node, node)
-            return False
-        if Property.CLOTHES not in node.properties:
-            info.error('{} is not clothes', node)
-            return False
-
-        return True
-
-
-class PutOffExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_putoff(state, node, info):
-            if modify:
-                yield state.change_state([
-                    DeleteEdges(NodeInstance(node), [Relation.ON], CharacterNode(char_index))
-                ], in_place=in_place)
-            else:
-                yield state
-
-    def check_putoff(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index, char_index)
-        if not state.evaluate(ExistsRelation(NodeInstance(node), Relation.ON, NodeInstanceFilter(char_node))):
-            info.error('{} is not on {}', node, char_node)
-            return False
-        if Property.CLOTHES not in node.properties:
-            info.error('{} is not clothes', node)
-            return False
-        return True
-
-
-class DropExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_drop(state, node, info, char_index):
-            char_node = _get_character_node(state, char_index)
-            char_room = _get_room_node(state, char_node)
-            if modify:
-                yield state.change_state(
-                    [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(node)),
-                     AddEdges(NodeInstance(node), Relation.INSIDE, NodeInstance(char_room)),
-                     ClearExecDataKey((Action.GRAB, node.id))], in_place=in_place
-                )
-            else:
-                yield state
-
-    def check_drop(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-        nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
-        if not any([n.id == node.id for n in nodes_in_hands]):
-            info.error('{} is not holding {}', char_node, node)
-            return False
-
-        return True
-
-
-class ReadExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_readable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_readable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        if Property.READABLE not in node.properties:
-            info.error('{} is not readable', node)
-            return False
-        hand_rel = _find_holding_hand(state, node, char_index)
-        if hand_rel is None:
-            info.error('{} is not holding {}', _get_character_node(state, char_index), node)
-            return False
-        return True
-
-
-class TouchExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_reachable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_reachable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-        if _is_inside(state, node):
-            info.error('{} is inside other closed thing', node)
-            return False
-        return True
-
-
-class LieExecutor(ActionExecutor):
-
-    _MAX_OCCUPANCIES = {
-        'couch': 2,
-        'bathtub': 2,
-        'bed': 3,
-        'loveseat': 2,
-        'sofa': 2,
-        'bench': 1
-    }
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_lieable(state, node, info, char_index):
-            char_node = _get_character_node(state, char_index)
-            new_char_node = char_node.copy()
-            new_char_node.states.discard(State.SITTING)
-            new_char_node.states.add(State.LYING)
-            if modify:
-                yield state.change_state(
-                    [AddEdges(CharacterNode(char_index), Relation.ON, NodeInstance(node)),
-                     ChangeNode(new_char_node)], in_place=in_place
-                )
-            else:
-                yield state
-
-    def check_lieable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', char_node, node)
-            return False
-        if State.LYING in char_node.states:
-            info.error('{} is lying', char_node)
-            return False
-        if Property.LIEABLE not in node.properties:
-            info.error('{} is not lieable', node)
-            return False
-        max_occupancy = self._MAX_OCCUPANCIES.get(node.class_name, 1)
-        if state.evaluate(CountRelations(AnyNode(), Relation.ON, NodeInstanceFilter(node),
-                                         min_value=max_occupancy)):
-            info.error('Too many things on {}', node)
-            return False
-        return True
-
-
-class PourExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        src_node = state.get_state_node(current_line.object())
-        dest_node = state.get_state_node(current_line.subject())
-
-        if src_node is None or dest_node is None:
-            info.script_object_found_error(current_line.object() if src_node is None else current_line.subject())
-        elif self._check_pourable(state, src_node, dest_node, info, char_index):
-            changes = [AddEdges(NodeInstance(src_node), Relation.INSIDE, NodeInstance(dest_node))]
-            if src_node.class_name == 'water':
-                changes += [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node))]
-            if modify:
-                yield state.change_state(changes, in_place=in_place)
-            else:
-                yield state
-
-    def _check_pourable(self, state: EnvironmentState, src_node: GraphNode, dest_node: GraphNode, info: ExecutionInfo, char_index):
-
-        if Property.POURABLE not in src_node.properties and Property.DRINKABLE not in src_node.properties:
-            info.error('{} is not pourable or drinkable', src_node)
-            return False
-
-        if Property.RECIPIENT not in dest_node.properties and dest_node.class_name not in ["hands_both", "sponge", "face"]:
-            info.error('{} is not recipient', dest_node)
-            return False
-
-        hand_rel = _find_holding_hand(state, src_node, char_index)
-        if hand_rel is None:
-            info.error('{} is not holding {}', _get_character_node(state, char_index), src_node)
-            return False
-
-        char_node = _get_character_node(state, char_index)
-        if not _is_character_close_to(state, dest_node, char_index):
-            info.error('{} is not close to {}', char_node, dest_node)
-            return False
-        
-        return True
-
-
-class TypeExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_typeable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-        
-    def check_typeable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', char_node, node)
-            return False
-        
-        if node.class_name == 'keyboard':
-            return True
-
-        if Property.HAS_SWITCH not in node.properties:
-            info.error('{} does not have switch', node)
-            return False
-        
-        return True
-
-
-class WatchExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_watchable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_watchable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        char_node = _get_character_node(state, char_index)
-        char_room = _get_room_node(state, char_node)
-        node_room = _get_room_node(state, node)
-        
-        if Property.LOOKABLE not in node.properties:
-            info.error('{} not lookable', node)
-            return False
-        if node_room.id != char_room.id:
-            info.error('char room {} is not node room {}', char_room, node_room)
-            return False
-        if not _is_character_face_to(state, node, char_index):
-            info.error('{} does not face {}', char_node, node)
-            return False
-        if node.class_name != 'computer' and (State.SITTING in char_node.states or State.LYING in char_node.states) and not state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.FACING, NodeInstanceFilter(node))):
-            info.error('{} is not facing {} while sitting', char_node, node)
-            return False
-        if _is_inside(state, node):
-            info.error('{} is inside other closed thing', node)
-        return True
-
-
-class MoveExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        action_name = current_line.action.name.lower()
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        else:
-            new_relation = self.check_movable(state, node, info, action_name, char_index)
-            if new_relation is not None:
-                if modify:
-                    yield state.change_state([], in_place=in_place)
-                else:
-                    yield state
-
-    def check_movable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, action_name: str, char_index) -> Optional[Relation]:
-
-        if Property.MOVABLE not in node.properties and (action_name != 'push' and node.class_name != 'button') and node.class_name not in ['chair', 'curtain']:
-            info.error('{} is not movable', node)
-            return None
-        if not _is_character_close_to(state, node, char_index):
-            char_node = _get_character_node(state, char_index)
-            info.error('{} is not close to {}', char_node, node)
-            return None
-        if _is_inside(state, node):
-            info.error('{} is inside other closed thing', node)
-            return None
-        new_relation = _find_free_hand(state, char_index)
-        if new_relation is None:
-            char_node = _get_character_node(state, char_index)
-            info.error('{} does not have a free hand', char_node)
-            return None
-        return new_relation
-
-
-class WashExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_washable(state, node, info, char_index):
-            new_node = node.copy()
-            new_node.states.discard(State.DIRTY)
-            new_node.states.add(State.CLEAN)
-            if modify:
-                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
-            else:
-                yield state
-
-    def check_washable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-
-        return True
-
-
-class SqueezeExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_squeezable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_squeezable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        
-        if _find_free_hand(state, char_index) is None:
-            info.error('{} does not have a free hand', _get_character_node(state, char_index))
-            return False
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-
-        squeezable_objects = ['cleaning_solution', 'tooth_paste', 'shampoo', 
-                'food_peanut_butter', 'dish_soap', 'soap', 'towel', 'rag', 'paper', 'sponge', 
-                'food_lemon', 'check']
-        if Property.CLOTHES not in node.properties and node.class_name not in squeezable_objects:
-            info.error('{} is not clothes', node)
-            return False
-
-        return True
-
-
-class PlugExecutor(ActionExecutor):
-
-    def __init__(self, plug_in):
-        """
-            PlugInExecutor: True
-            PlugOutExecutor: False
-        """
-        self.plug_in = plug_in
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_plugable(state, node, info, char_index):
-            new_node = node.copy()
-            new_node.states.discard(State.PLUGGED_OUT if self.plug_in else State.PLUGGED_IN)
-            new_node.states.add(State.PLUGGED_IN if self.plug_in else State.PLUGGED_OUT)
-            if modify:
-                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
-            else:
-                yield state
-
-    def check_plugable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-        s = State.PLUGGED_OUT if self.plug_in else State.PLUGGED_IN
-        if Property.HAS_PLUG not in node.properties:
-            info.error('{} does not have a plug', node)
-            return False
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-        if _find_free_hand(state, char_index) is None:
-            info.error('{} does not have a free hand', _get_character_node(state, char_index))
-            return False
-        if s not in node.states:
-            info.error('{} is not {}', node, s.name.lower())
-            return False
-        if not self.plug_in and State.ON in node.states:
-            info.error('{} is still on', node)
-        return True
-    
-
-class CutExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_cuttable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_cuttable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-
-        if _find_free_hand(state, char_index) is None:
-            info.error('{} does not have a free hand', _get_character_node(state, char_index))
-            return False
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-        if Property.EATABLE not in node.properties:
-            info.error('{} is not eatable', node)
-            return False
-        if Property.CUTTABLE not in node.properties:
-            info.error('{} is not cuttable', node)
-            return False
-
-        char_node = _get_character_node(state, char_index)
-        holding_nodes = _find_nodes_from(state, char_node, [Relation.HOLDS_LH, Relation.HOLDS_RH])
-        if not any(['knife' in node.class_name for node in holding_nodes]):
-            info.error('{} is not holding a knife', _get_character_node(state, char_index))
-            return False
-
-        return True
-
-
-class EatExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        current_line = script[0]
-        info.set_current_line(current_line)
-        node = state.get_state_node(current_line.object())
-        if node is None:
-            info.object_found_error()
-        elif self.check_eatable(state, node, info, char_index):
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-    def check_eatable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
-
-        if not _is_character_close_to(state, node, char_index):
-            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
-            return False
-            
-        if Property.EATABLE in node.properties:
-            return True
-        else:
-            nodes_in_objs = _find_nodes_to(state, node, relations=[Relation.ON])
-            if len(nodes_in_objs) == 0:
-                info.error('{} is not eatable', node)
-                return False
-            elif any([Property.EATABLE in node.properties for node in nodes_in_objs]):
-                return True
-            else:
-                info.error('none of object on {} is eatable', node)
-                return False
-
-
-class SleepExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-
-        info.set_current_line(script[0])
-        char_node = _get_character_node(state, char_index)
-        if State.LYING not in char_node.states and State.SITTING not in char_node.states:
-            info.error('{} is not lying or sitting', char_node)
-        else:
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-
-class WakeUpExecutor(ActionExecutor):
-
-    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-
-        info.set_current_line(script[0])
-        char_node = _get_character_node(state, char_index)
-        if State.LYING not in char_node.states and State.SITTING not in char_node.states:
-            info.error('{} is not lying or sitting', char_node)
-        else:
-            if modify:
-                yield state.change_state([], in_place=in_place)
-            else:
-                yield state
-
-
-PointAtExecutor = LookAtExecutor
-
-
-# General checks and helpers
-
-
-def _is_character_close_to(state: EnvironmentState, node: Node, char_index: int):
-    if state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.CLOSE, NodeInstanceFilter(node))):
-        return True
-    # loose rule
-    for close_node in state.get_nodes_from(_get_character_node(state, char_index), Relation.CLOSE):
-        if state.evaluate(ExistsRelation(NodeInstance(close_node), Relation.CLOSE, NodeInstanceFilter(node))):
-            return True
-        if state.evaluate(ExistsRelation(NodeInstance(node), Relation.ON, NodeInstanceFilter(close_node))):
-            return True
-    return False
-
-
-def _is_character_face_to(state: EnvironmentState, node: Node, char_index: int):
-    if state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.FACING, NodeInstanceFilter(node))):
-        return True
-    for face_node in state.get_nodes_from(_get_character_node(state, char_index), Relation.FACING):
-        if state.evaluate(ExistsRelation(NodeInstance(face_node), Relation.FACING, NodeInstanceFilter(node))):
-            return True
-    return False
-
-
-def _get_character_node(state: EnvironmentState, char_index: int):
-    return next(state.get_char_node(char_index), None)
-
-
-def _get_room_node(state: EnvironmentState, node: Node):
-    if node.category == 'Rooms':
-        return node
-    inside_nodes = state.get_nodes_from(node, Relation.INSIDE) 
-    # print(node)
-    if len(inside_nodes) > 1:
-        for n in state.get_nodes_from(node, Relation.INSIDE):
-            if n.category == 'Rooms':
-                return n
-    else:
-        while len(inside_nodes) > 0:
-            n = inside_nodes[0]
-            if n.category == 'Rooms':
-                return n
-            else:
-                inside_nodes = state.get_nodes_from(n, Relation.INSIDE)
-
-    return None
-
-
-def _find_nodes_to(state: EnvironmentState, node: Node, relations: List[Relation]):
-    nodes = []
-    for src_node in AnyNode().enumerate(state):
-        for r in relations:
-            nl = state.get_nodes_from(src_node, r)
-            if node in nl:
-                nodes.append(src_node)
-    return nodes
-
-def _find_nodes_from(state: EnvironmentState, node: Node, relations: List[Relation]):
-    nodes = []
-    for r in relations:
-        nl = state.get_nodes_from(node, r)
-        nodes += nl
-    return nodes
-
-
-def _find_first_node_from(state: EnvironmentState, node: Node, relations: List[Relation]):
-    for r in relations:
-        for n in state.get_nodes_from(node, r):
-            if n.category != 'Rooms':
-                return n, r
-    return None, None
-
-
-def _find_free_hand(state: EnvironmentState, char_index: int):
-    if not state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.HOLDS_RH, AnyNodeFilter())):
-        return Relation.HOLDS_RH
-    if not state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.HOLDS_LH, AnyNodeFilter())):
-        return Relation.HOLDS_LH
-    return None
-
-
-def _find_holding_hand(state: EnvironmentState, node: Node, char_index: int):
-    if state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.HOLDS_RH, NodeInstanceFilter(node))):
-        return Relation.HOLDS_RH
-    if state.evaluate(ExistsRelation(CharacterNode(char_index), Relation.HOLDS_LH, NodeInstanceFilter(node))):
-        return Relation.HOLDS_LH
-    return None
-
-
-def _is_inside(state: EnvironmentState, node: Node):
-    return state.evaluate(ExistsRelation(NodeInstance(node), Relation.INSIDE,
-                                         NodeConditionFilter(And(NodeAttrIn(State.CLOSED, 'states'),
-                                                                 Not(IsRoomNode())))))
-
-
-def _create_walkable_graph(state: EnvironmentState):
-    doors = state.get_nodes_by_attr('class_name', 'door')
-    doorjambs = state.get_nodes_by_attr('class_name', 'doorjamb')
-    adj_lists = {}
-    for door_node in doors:
-        door_rooms = state.get_nodes_from(door_node, Relation.BETWEEN)
-        if len(door_rooms) > 1:
-            adj_lists.setdefault(door_rooms[0].id, []).append((door_rooms[1].id, door_node.id))
-            adj_lists.setdefault(door_rooms[1].id, []).append((door_rooms[0].id, door_node.id))
-    for dj_node in doorjambs:
-        dj_rooms = state.get_nodes_from(dj_node, Relation.BETWEEN)
-        if len(dj_rooms) > 1:
-            adj_lists.setdefault(dj_rooms[0].id, []).append((dj_rooms[1].id, dj_node.id))
-            adj_lists.setdefault(dj_rooms[1].id, []).append((dj_rooms[0].id, dj_node.id))
-    return adj_lists
-
-
-def _check_closed_doors(state: EnvironmentState, room1: GraphNode, room2: GraphNode):
-    return []
-    graph_adj_lists = _create_walkable_graph(state)
-    bfs_prev = BFS_check_closed(state, graph_adj_lists, room1.id)
-    if room2.id in bfs_prev:
-        return []
-    bfs_prev = BFS(graph_adj_lists, room1.id)
-    if room2.id not in bfs_prev:
-        return None  # No path!
-    closed_between = []
-    current_id = room2.id
-    while current_id != room1.id:
-        next_id, door_id = bfs_prev[current_id]
-        if next_id is None:
-            break
-        door_node = state.get_node(door_id)
-        if State.CLOSED in door_node.states:
-            closed_between.append(door_node)
-        current_id = next_id
-    return closed_between
-
-
-def BFS_check_closed(state: EnvironmentState, adj_lists: dict, s):
-    prev = {}
-    prev[s] = None
-    q = queue.Queue()
-    q.put(s)
-    while not q.empty():
-        v = q.get()
-        for u, d in adj_lists[v]:
-            door_node = state.get_node(d)
-            if State.CLOSED not in door_node.states and u not in prev:
-                prev[u] = v
-                q.put(u)
-    return prev
-
-
-def BFS(adj_lists: dict, s):
-    prev = {}
-    prev[s] = (None, None)
-    q = queue.Queue()
-    q.put(s)
-    while not q.empty():
-        v = q.get()
-        for u, d in adj_lists[v]:
-            if u not in prev:
-                prev[u] = (v, d)
-                q.put(u)
-    return prev
-
-
-# ScriptExecutor
-###############################################################################
-
-
-class ScriptExecutor(object):
-
-    _action_executors = {
-        Action.WALK: WalkExecutor(),
-        Action.FIND: FindExecutor(),
-        Action.SIT: SitExecutor(),
-        Action.STANDUP: StandUpExecutor(),
-        Action.GRAB: GrabExecutor(),
-        Action.OPEN: OpenExecutor(False),
-        Action.CLOSE: OpenExecutor(True),
-        Action.PUTBACK: PutExecutor(Relation.ON),
-        Action.PUTIN: PutExecutor(Relation.INSIDE),
-        Action.SWITCHON: SwitchExecutor(True),
-        Action.SWITCHOFF: SwitchExecutor(False),
-        Action.DRINK: DrinkExecutor(), 
-        Action.LOOKAT: LookAtExecutor(), 
-        Action.TURNTO: TurnToExecutor(), 
-        Action.WIPE: WipeExecutor(), 
-        Action.RUN: WalkExecutor(),
-        Action.PUTON: PutOnExecutor(), 
-        Action.PUTOFF: PutOffExecutor(), 
-        Action.GREET: GreetExecutor(), 
-        Action.DROP: DropExecutor(), 
-        Action.READ: ReadExecutor(), 
-        Action.POINTAT: PointAtExecutor(), 
-        Action.TOUCH: TouchExecutor(), 
-        Action.LIE: LieExecutor(),
-        Action.PUTOBJBACK: PutBackExecutor(), 
-        Action.POUR: PourExecutor(), 
-        Action.TYPE: TypeExecutor(), 
-        Action.WATCH: WatchExecutor(), 
-        Action.PUSH: MoveExecutor(), 
-        Action.PULL: MoveExecutor(), 
-        Action.MOVE: MoveExecutor(), 
-        Action.RINSE: WashExecutor(),
-        Action.WASH: WashExecutor(), 
-        Action.SCRUB: WashExecutor(), 
-        Action.SQUEEZE: SqueezeExecutor(), 
-        Action.PLUGIN: PlugExecutor(True), 
-        Action.PLUGOUT: PlugExecutor(False), 
-        Action.CUT: CutExecutor(), 
-        Action.EAT: EatExecutor(), 
-        Action.SLEEP: SleepExecutor(), 
-        Action.WAKEUP: WakeUpExecutor(), 
-        Action.RELEASE: DropExecutor()
-    }
-
-    def __init__(self, graph: EnvironmentGraph, name_equivalence, char_index: int=0):
-        self.graph = graph
-        self.name_equivalence = name_equivalence
-        self.processing_time_limit = 10  # 10 seconds
-        self.processing_limit = 0
-        self.info = ExecutionInfo()
-        self.char_index = char_index
-
-    def find_solutions(self, script: Script, init_changers: List[StateChanger]=None):
-        self.processing_limit = time.time() + self.processing_time_limit
-        init_state = EnvironmentState(self.graph, self.name_equivalence)
-        _apply_initial_changers(init_state, script, init_changers)
-        return self.find_solutions_rec(script, 0, init_state)
-
-    def find_solutions_rec(self, script: Script, script_index: int, state: EnvironmentState):
-        if script_index >= len(script):
-            yield state
-        future_script = script.from_index(script_index)
-        next_states = self.call_action_method(future_script, state, self.info, self.char_index)
-        if next_states is not None:
-            for next_state in next_states:
-                for rec_state_list in self.find_solutions_rec(script, script_index + 1, next_state):
-                    yield rec_state_list
-                if time.time() > self.processing_limit:
-                    break
-
-    def execute(self, script: Script, init_changers: List[StateChanger]=None, w_graph_list: bool=True):
-
-        info = self.info
-        state = EnvironmentState(self.graph, self.name_equivalence, instance_selection=True)
-        _apply_initial_changers(state, script, init_changers)
-        graph_state_list = []
-        for i in range(len(script)):
-            prev_state = state
-            if w_graph_list:
-                graph_state_list.append(state.to_dict())
-            
-            future_script = script.from_index(i)
-            state = next(self.call_action_method(future_script, state, info, self.char_index), None)
-            if state is None:
-                return False, prev_state, graph_state_list
-                
-        if w_graph_list:
-            graph_state_list.append(state.to_dict())
-
-        return True, state, graph_state_list
-
-    @classmethod
-    def call_action_method(cls, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
-        executor = cls._action_executors.get(script[0].action, UnknownExecutor())
-        return executor.execute(script, state, info, char_index, modify, in_place)
-
-    def check_one_step(self, script: Script, state: EnvironmentState):
-        prev_state = state
-        state = next(self.call_action_method(script, state, self.info, self.char_index, False), None)
-        if state is None:
-            return False
-
-        return True
-
-    def execute_one_step(self, script: Script, state: EnvironmentState, in_place=False):
-        prev_state = state
-        #print("in execute_one_step, char_index = {}".format(self.char_index))
-        state = next(self.call_action_method(script, state, self.info, self.char_index, in_place=in_place), None)
-        if state is None:
-            return False, prev_state
-
-        return True, state
-
-def _apply_initial_changers(state: EnvironmentState, script: Script, changers: List[StateChanger]=None):
-    if changers is not None:
-        for changer in changers:
-            changer.apply_changes(state, script=script)
-
-
-# state preparation
-
-_DEFAULT_PROPERTY_STATES = {Property.HAS_SWITCH: State.OFF,
-                            Property.CAN_OPEN: State.CLOSED}
-
-
-def _prepare_state(state: EnvironmentState, script: Script, name_equivalence, object_placing, properties_data):
-    state_classes = {n.class_name for n in state.get_nodes()}
-    script_classes = {so.name for sl in script for so in sl.parameters}
-    missing_classes = set()
-    for sc in script_classes:
-        if sc not in state_classes and len(set(name_equivalence.get(sc, [])) & state_classes) == 0:
-            missing_classes.add(sc)
-    if len(missing_classes) > 0:
-        for mc in missing_classes:
-            if mc not in object_placing:
-                raise ExecutionException('No placing information for "{0}"', mc)
-            if mc not in properties_data:
-                raise ExecutionException('No properties data for "{0}"', mc)
-            new_node_id = state.get_max_node_id() + 1
-            for pi in object_placing[mc]:
-                dest = pi['destination']
-                room_name = pi['room']
-                properties = properties_data.get(mc, [])
-                placed = False
-                for dest_node in state.get_nodes_by_attr('class_name', dest):
-                    if room_name is None:
-                        new_node = _create_node(new_node_id, mc, properties)
-                        _change_state(state, new_node, dest_node, [])
-                        new_node_id += 1
-                        placed = True
-                        break
-                    else:
-                        room_node = _get_room_node(state, dest_node)
-                        if room_node is not None and room_node.class_name == room_name:
-                            new_node = _create_node(new_node_id, mc, properties)
-                            _change_state(state, new_node, dest_node,
-                                          [AddEdges(NodeInstance(new_node), Relation.INSIDE, NodeInstance(room_node))])
-                            new_node_id += 1
-                            placed = True
-                            break
-                if placed:
-                    break
-
-
-def _create_node(node_id: int, class_name: str, properties):
-    states = [_DEFAULT_PROPERTY_STATES[p] for p in properties if p in _DEFAULT_PROPERTY_STATES]
-    return GraphNode(node_id, class_name, None, properties, states, None, None)
-
-
-def _change_state(state: EnvironmentState, new_node: GraphNode, dest_node: Node, add_changers: List[StateChanger]):
-    changers = [AddNode(new_node),
-                AddEdges(NodeInstance(new_node), Relation.ON, NodeInstance(dest_node)),
-                AddEdges(NodeInstance(new_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True)]
-    changers.extend(add_changers)
-    state.apply_changes(changers)
-
-
-# Exception
-###############################################################################
-
-class ExecutionException(common.Error):
-    pass
+import time
+from collections import deque, OrderedDict
+from multiprocessing import Pool
+from typing import Optional
+from . import common
+from .environment import *
+from .scripts import Action, ScriptLine, Script
+
+
+# ExecutionInfo
+###############################################################################
+
+class ExecutionInfo(object):
+
+    def __init__(self):
+        self.messages = []
+        self.current_line = None
+
+    def error(self, msg: str, *args):
+        self.messages.append(msg.format(*args) + ' when executing "' + self.current_line_info() + '"')
+
+    def set_current_line(self, sl: ScriptLine):
+        self.current_line = sl
+
+    def script_object_found_error(self, so: ScriptObject):
+        self.error(str(so) + " cannot be found")
+
+    def object_found_error(self):
+        if self.current_line is not None:
+            self.script_object_found_error(self.current_line.object())
+
+    def current_line_info(self):
+        return '' if self.current_line is None else str(self.current_line)
+
+    def get_error_string(self):
+        return ','.join(self.messages)
+
+
+# ActionExecutor-s
+###############################################################################
+
+class ActionExecutor(object):
+
+    @abstractmethod
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index):
+        """
+        :param script: future script, scripts.Script object containing script lines
+            yet to be executed, has at least one item
+        :param state: current state, environment.EnvironmentState object
+        :param info: information (typically an error) about execution
+        :prarm char_index: index of the character for this action 
+        :return: enumerates possible states after execution of script_line
+        """
+        pass
+
+
+class UnknownExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index):
+        raise ExecutionException("Execution of {0} is not supported", script[0].action)
+
+
+class JoinedExecutor(ActionExecutor):
+
+    def __init__(self, *args):
+        self.executors = args
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        for e in self.executors:
+            for s in e.execute(script, state, info, char_index, modify, in_place):
+                yield s
+
+
+class WalkExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        current_obj = current_line.object()
+
+        #print("in walk execution, char_index = {}".format(char_index))
+
+        # select objects based on current_obj
+        for node in state.select_nodes(current_obj):
+            node_room = _get_room_node(state, node)
+            #print(state, node)
+            if self.check_walk(state, node, info, char_index) and node_room is not None:
+
+                changes = [DeleteEdges(CharacterNode(char_index),
+                                       [Relation.INSIDE, Relation.CLOSE, Relation.FACING],
+                                       AnyNode(), delete_reverse=True),
+                           AddEdges(CharacterNode(char_index), Relation.INSIDE, NodeInstance(node_room)),
+                     ]
+
+                if node_room != node:
+                    changes += [
+                           AddEdges(CharacterNode(char_index), Relation.CLOSE, BoxObjectNode(node), add_reverse=True),
+                           AddEdges(CharacterNode(char_index), Relation.CLOSE, BodyNode(), add_reverse=True),
+                           AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True)
+                     ]
+
+                # close to object in hands
+                char_node = _get_character_node(state, char_index)
+                char_room = _get_room_node(state, char_node)
+                nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
+                for node_in_hands in nodes_in_hands:
+                    changes.append(DeleteEdges(NodeInstance(node_in_hands), [Relation.INSIDE, Relation.CLOSE, Relation.FACING], AnyNode(), delete_reverse=True))
+
+                for node_in_hands in nodes_in_hands:
+                    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node_in_hands), add_reverse=True))
+                    changes.append(AddEdges(NodeInstance(node_in_hands), Relation.INSIDE, NodeInstance(char_room)))
+
+                # close to all objects on node
+                # if Property.SURFACES in node.properties:
+                #    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, ObjectOnNode(node), add_reverse=True))
+
+                # close to all objects inside
+                if Property.CAN_OPEN in node.properties:
+                    changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, ObjectInsideNode(node), add_reverse=True))
+
+                # close to all objects that node is on
+                changes.append(AddEdges(CharacterNode(char_index), Relation.CLOSE, SurfaceObjectNode(node), add_reverse=True))
+
+
+                if not modify:
+                    yield state
+                else:
+                    yield state.change_state(changes, node, current_obj, in_place=in_place)
+    
+
+    def check_walk(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+
+        #print("in check_walk, char_index = {}".format(char_index))
+
+        char_node = _get_character_node(state, char_index)
+        if State.SITTING in char_node.states or State.LYING in char_node.states:
+            info.error('{} is sitting', char_node)
+            return False
+        
+        char_room = _get_room_node(state, char_node)
+        if char_room is None:
+            raise ExecutionException('{} is not in a room', char_node)
+
+        node_room = _get_room_node(state, node)
+
+        if node.id in _get_room_connectivity(state).door_ids:
+            # door that connect the char_room
+            if state.has_edge(node, Relation.BETWEEN, char_room) or state.has_edge(char_room, Relation.BETWEEN, node):
+                return True
+
+        # the return list is in reverse orders, living room --> door.1 --> dining room --> door.181 --> bathroom --> door.16 --> living room
+        # suppose all the doors are closed, the return list would be like [door.16, door.181, door.1]
+        closed_doors = _check_closed_doors(state, char_room, node_room)
+
+        if closed_doors is None:
+            info.error('No path between between {} and {}', char_room, node_room)
+            return False
+        if len(closed_doors) > 0:
+            # walk to the nearest closed door is fine
+            if node.id != closed_doors[-1].id:
+                info.error("Door(s) {} between {} and {} is (are) closed", ', '.join([str(d) for d in closed_doors]),
+                            char_room, node_room)
+                return False
+
+        return True
+
+
+class _FindExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        current_obj = current_line.object()
+
+        # select objects based on current_obj
+        for node in state.select_nodes(current_obj):
+            if self.check_find(state, node, info, char_index):
+                if modify:
+                    yield state.change_state(
+                        [DeleteEdges(CharacterNode(char_index), [Relation.FACING], AnyNode()), 
+                         AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True)],
+                        node,
+                        current_obj,
+                    in_place=in_place)
+                else:
+                    yield state
+
+    def check_find(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        if not _is_character_close_to(state, node, char_index):
+            char_node = _get_character_node(state, char_index)
+            info.error('{} is not close to {}', char_node, node)
+            return False
+        
+        return True
+
+
+
+_walk_find_executor = JoinedExecutor(WalkExecutor(), _FindExecutor())
+_only_find_executor = _FindExecutor()
+
+
+class FindExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        current_obj = current_line.object()
+        for node in state.select_nodes(current_obj):
+            char_node = _get_character_node(state, char_index)
+
+            if _has_relation(state, node, Relation.ON, char_node):
+                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
+            elif Property.BODY_PART in node.properties:
+                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
+            elif _is_character_close_to(state, node, char_index):
+                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
+            elif State.SITTING in char_node.states or State.LYING in char_node.states:
+                return _only_find_executor.execute(script, state, info, char_index, modify, in_place)
+            else:
+                return _walk_find_executor.execute(script, state, info, char_index, modify, in_place)
+        info.error('Could not find object {}'.format(current_obj.name))
+
+
+class GreetExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        else:
+            if self.check_if_person(state, node, info):
+                if modify:
+                    yield state.change_state([], in_place=in_place)
+                else:
+                    yield state
+
+    def check_if_person(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo):
+        if Property.PERSON not in node.properties:
+            info.error('{} is not person', node)
+            return False
+        return True
+
+
+class SitExecutor(ActionExecutor):
+
+    _MAX_OCCUPANCIES = {
+        'couch': 4,
+        'bed': 4,
+        'chair': 1,
+        'loveseat': 2,
+        'sofa': 4,
+        'toilet': 1,
+        'pianobench': 2,
+        'bench': 2
+    }
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_sittable(state, node, info, char_index):
+            char_node = _get_character_node(state, char_index)
+            new_char_node = char_node.copy()
+            new_char_node.states.discard(State.LYING)
+            new_char_node.states.add(State.SITTING)
+            if modify:
+                yield state.change_state(
+                    [AddEdges(CharacterNode(char_index), Relation.ON, NodeInstance(node)),
+                     AddEdges(CharacterNode(char_index), Relation.FACING, RelationFrom(node, Relation.FACING)),
+                     ChangeNode(new_char_node)],
+                    in_place=in_place
+                )
+            else:
+                yield state
+
+    def check_sittable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', char_node, node)
+            return False
+        if State.SITTING in char_node.states:
+            info.error('{} is sitting', char_node)
+            return False
+        if Property.SITTABLE not in node.properties:
+            info.error('{} is not sittable', node)
+            return False
+        max_occupancy = self._MAX_OCCUPANCIES.get(node.class_name, 1)
+        if _has_objects_on(state, node, max_occupancy):
+            info.error('Too many things on {}', node)
+            return False
+
+        return True
+
+
+
+class StandUpExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        info.set_current_line(script[0])
+        char_node = _get_character_node(state, char_index)
+        if State.SITTING in char_node.states or State.LYING in char_node.states:
+            new_char_node = char_node.copy()
+            new_char_node.states.discard(State.SITTING)
+            new_char_node.states.discard(State.LYING)
+            if modify:
+                yield state.change_state([ChangeNode(new_char_node)], in_place=in_place)
+            else:
+                yield state
+        else:
+            info.error('{} is not sitting', char_node)
+            
+
+class GrabExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        else:
+            new_relation = self.check_grabbable(state, node, info, char_index)
+            if new_relation is not None:
+                char_node = _get_character_node(state, char_index)
+                char_room = _get_room_node(state, char_node)
+                changes = [DeleteEdges(NodeInstance(node), [Relation.ON, Relation.INSIDE, Relation.CLOSE, Relation.HOLDS_LH, Relation.HOLDS_RH], AnyNode(), delete_reverse=True),
+                           AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(node), add_reverse=True), 
+                           AddEdges(CharacterNode(char_index), new_relation, NodeInstance(node)), 
+                           AddEdges(NodeInstance(node), Relation.INSIDE, NodeInstance(char_room))]
+                new_close, relation = _find_first_node_from(state, node, [Relation.ON, Relation.INSIDE, Relation.CLOSE])
+                if new_close is not None:
+                    changes += [AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(new_close), add_reverse=True),
+                                AddExecDataValue((Action.GRAB, node.id), (new_close, relation))]
+                if modify:
+                    yield state.change_state(changes, in_place=in_place)
+                else:
+                    yield state
+
+    def check_grabbable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index) -> Optional[Relation]:
+        if Property.GRABBABLE not in node.properties and node.class_name not in ['water', 'child']:
+            info.error('{} is not grabbable', node)
+            return None
+
+        (dest_node, relation) = state.executor_data.get((Action.GRAB, node.id), (None, None))
+        if dest_node is not None:
+            info.error('{} already grabbed', node)
+            return None
+        if not _is_character_close_to(state, node, char_index):
+            char_node = _get_character_node(state, char_index)
+            info.error('{} is not close to {}', char_node, node)
+            return None
+        if _is_inside(state, node):
+            info.error('{} is inside other closed thing', node)
+            return None
+        new_relation = _find_free_hand(state, char_index)
+        if new_relation is None:
+            char_node = _get_character_node(state, char_index)
+            info.error('{} does not have a free hand', char_node)
+            return None
+        return new_relation
+
+
+
+class OpenExecutor(ActionExecutor):
+
+    def __init__(self, close: bool):
+        """
+        :param close: False: OpenExecutor, True: CloseExecutor
+
+        """
+        self.close = close
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_openable(state, node, info, char_index):
+            new_node = node.copy()
+            new_node.states.discard(State.OPEN if self.close else State.CLOSED)
+            new_node.states.add(State.CLOSED if self.close else State.OPEN)
+            if modify:
+                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
+            else:
+                yield state
+
+    def check_openable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        
+        if Property.CAN_OPEN not in node.properties and node.class_name not in ["desk", "window"]:
+            info.error('{} can not be opened', node)
+            return False
+
+        if not _is_character_close_to(state, node, char_index):
+            char_node = _get_character_node(state, char_index)
+            info.error('{} is not close to {}', char_node, node)
+            return False
+        
+        if not self.close and _find_free_hand(state, char_index) is None:
+            char_node = _get_character_node(state, char_index)
+            info.error('{} does not have a free hand', char_node)
+            return False
+
+        s = State.OPEN if self.close else State.CLOSED
+        if s not in node.states:
+            info.error('{} is not {}', node, s.name.lower())
+            return False
+
+        if not self.close and State.ON in node.states:
+            info.error('{} is still on'.format(node))
+            return False
+        return True
+
+
+
+class PutExecutor(ActionExecutor):
+
+    def __init__(self, relation: Relation):
+        """
+        :param relation: Relation.ON: PutExecutor, Relation.INSIDE: PutInExecutor:
+
+        """
+        self.relation = relation
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        src_node = state.get_state_node(current_line.object())
+        dest_node = state.get_state_node(current_line.subject())
+        if src_node is None or dest_node is None:
+            info.script_object_found_error(current_line.object() if src_node is None else current_line.subject())
+        elif _check_puttable(state, src_node, dest_node, self.relation, info, char_index):
+            if modify:
+                yield state.change_state(
+                    [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node)),
+                     AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
+                     AddEdges(NodeInstance(src_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
+                     AddEdges(NodeInstance(src_node), self.relation, NodeInstance(dest_node)),
+                     ClearExecDataKey((Action.GRAB, src_node.id))], in_place=in_place
+                )
+            else:
+                yield state
+
+
+class PutBackExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        src_node = state.get_state_node(current_line.object())
+        if src_node is None:
+            info.object_found_error()
+        else:
+            (dest_node, relation) = state.executor_data.get((Action.GRAB, src_node.id), (None, None))
+            if dest_node is None:
+                info.error('{} not grabbed', src_node)
+            else:
+                dest_node = state.get_node(dest_node.id)
+                if _check_puttable(state, src_node, dest_node, relation, info, char_index):
+                    if modify:
+                        yield state.change_state(
+                            [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node)),
+                             AddEdges(CharacterNode(char_index), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
+                             AddEdges(NodeInstance(src_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True),
+                             AddEdges(NodeInstance(src_node), relation, NodeInstance(dest_node)),
+                             ClearExecDataKey((Action.GRAB, src_node.id))], in_place=in_place
+                        )
+                else:
+                    yield state
+
+
+def _check_puttable(state: EnvironmentState, src_node: GraphNode, dest_node: GraphNode, relation: Relation,
+                    info: ExecutionInfo, char_index):
+    hand_rel = _find_holding_hand(state, src_node, char_index)
+    if hand_rel is None:
+        char_node = _get_character_node(state, char_index)
+        info.error('{} is not holding {}', char_node, src_node)
+        return False
+    if not _is_character_close_to(state, dest_node, char_index):
+        char_node = _get_character_node(state, char_index)
+        info.error('{} is not close to {}', char_node, dest_node)
+        return False
+    if relation == Relation.INSIDE:
+        if Property.CAN_OPEN not in dest_node.properties or State.OPEN in dest_node.states:
+            return True
+        else:
+            info.error('{} is not open or is not openable', dest_node)
+            return False
+    return True
+
+
+class SwitchExecutor(ActionExecutor):
+
+    def __init__(self, switch_on: bool):
+        """
+            SwitchOnExecutor: True
+            SwitchOffExecutor: False
+        """
+        self.switch_on = switch_on
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_switchable(state, node, info, char_index):
+            new_node = node.copy()
+            new_node.states.discard(State.OFF if self.switch_on else State.ON)
+            new_node.states.add(State.ON if self.switch_on else State.OFF)
+            if modify:
+                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
+            else:
+                yield state
+
+    def check_switchable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        s = State.OFF if self.switch_on else State.ON
+
+        if Property.HAS_SWITCH not in node.properties:
+            info.error('{} does not have a switch', node)
+            return False
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+        #if _find_free_hand(state, char_index) is None:
+        #    info.error('{} does not have a free hand', _get_character_node(state, char_index))
+        #    return False
+        if s not in node.states:
+            info.error('{} is not {}', node, s.name.lower())
+            return False
+        if self.switch_on and State.PLUGGED_OUT in node.states:
+            info.error('{} is unplugged', node)
+            return False
+        return True
+
+
+class DrinkExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_drinkable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else: 
+                yield state
+
+    def check_drinkable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        if Property.DRINKABLE not in node.properties and Property.RECIPIENT not in node.properties:
+            info.error('{} is not drinkable or not recipient', node)
+            return False
+        hand_rel = _find_holding_hand(state, node, char_index)
+        if hand_rel is None:
+            info.error('{} is not holding {}', _get_character_node(state, char_index), node)
+            return False
+        return True
+
+
+class TurnToExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_turn_to(state, node, info):
+            if modify:
+                yield state.change_state(
+                    [DeleteEdges(CharacterNode(char_index), [Relation.FACING], AnyNode()), 
+                     AddEdges(CharacterNode(char_index), Relation.FACING, NodeInstance(node))], in_place=in_place
+                )
+            else:
+                yield state
+
+    def check_turn_to(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo):
+        return True
+
+
+class LookAtExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_lookat(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_lookat(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+        if not _is_character_face_to(state, node, char_index):
+            info.error('{} does not face {}', char_node, node)
+            return False
+
+        return True
+
+
+class WipeExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_wipe(state, node, info, char_index):
+            new_node = node.copy()
+            new_node.states.discard(State.DIRTY)
+            new_node.states.add(State.CLEAN)
+            if modify:
+                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
+            else:
+                yield state
+
+    def check_wipe(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', char_node, node)
+            return False
+
+        #if Property.SURFACES not in node.properties:
+        #    info.error('{} is not a surface', node)
+        #    return False
+
+        nodes_in_hands = _find_nodes_from(state, char_node, [Relation.HOLDS_RH, Relation.HOLDS_LH])
+        if len(nodes_in_hands) == 0:
+            info.error('{} does not hold anything in hands', char_node)
+            return 
+
+        return True
+
+
+class PutOnExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_puton(state, node, info, char_index):
+            if modify:
+                yield state.change_state([
+                    AddEdges(NodeInstance(node), Relation.ON, CharacterNode(char_index)),
+                    DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(node)),
+                ], in_place=in_place)
+            else:
+                yield state
+
+    def check_puton(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+        nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
+        
+        if not any([n.id == node.id for n in nodes_in_hands]):
+            info.error('{} is not holding {}', char_node, node)
+            return False
+        if Property.CLOTHES not in node.properties:
+            info.error('{} is not clothes', node)
+            return False
+
+        return True
+
+
+class PutOffExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_putoff(state, node, info):
+            if modify:
+                yield state.change_state([
+                    DeleteEdges(NodeInstance(node), [Relation.ON], CharacterNode(char_index))
+                ], in_place=in_place)
+            else:
+                yield state
+
+    def check_putoff(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index, char_index)
+        if not _has_relation(state, node, Relation.ON, char_node):
+            info.error('{} is not on {}', node, char_node)
+            return False
+        if Property.CLOTHES not in node.properties:
+            info.error('{} is not clothes', node)
+            return False
+        return True
+
+
+class DropExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_drop(state, node, info, char_index):
+            char_node = _get_character_node(state, char_index)
+            char_room = _get_room_node(state, char_node)
+            if modify:
+                yield state.change_state(
+                    [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(node)),
+                     AddEdges(NodeInstance(node), Relation.INSIDE, NodeInstance(char_room)),
+                     ClearExecDataKey((Action.GRAB, node.id))], in_place=in_place
+                )
+            else:
+                yield state
+
+    def check_drop(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+        nodes_in_hands = _find_nodes_from(state, char_node, relations=[Relation.HOLDS_LH, Relation.HOLDS_RH])
+        if not any([n.id == node.id for n in nodes_in_hands]):
+            info.error('{} is not holding {}', char_node, node)
+            return False
+
+        return True
+
+
+class ReadExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_readable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_readable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        if Property.READABLE not in node.properties:
+            info.error('{} is not readable', node)
+            return False
+        hand_rel = _find_holding_hand(state, node, char_index)
+        if hand_rel is None:
+            info.error('{} is not holding {}', _get_character_node(state, char_index), node)
+            return False
+        return True
+
+
+class TouchExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_reachable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_reachable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+        if _is_inside(state, node):
+            info.error('{} is inside other closed thing', node)
+            return False
+        return True
+
+
+class LieExecutor(ActionExecutor):
+
+    _MAX_OCCUPANCIES = {
+        'couch': 2,
+        'bathtub': 2,
+        'bed': 3,
+        'loveseat': 2,
+        'sofa': 2,
+        'bench': 1
+    }
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_lieable(state, node, info, char_index):
+            char_node = _get_character_node(state, char_index)
+            new_char_node = char_node.copy()
+            new_char_node.states.discard(State.SITTING)
+            new_char_node.states.add(State.LYING)
+            if modify:
+                yield state.change_state(
+                    [AddEdges(CharacterNode(char_index), Relation.ON, NodeInstance(node)),
+                     ChangeNode(new_char_node)], in_place=in_place
+                )
+            else:
+                yield state
+
+    def check_lieable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', char_node, node)
+            return False
+        if State.LYING in char_node.states:
+            info.error('{} is lying', char_node)
+            return False
+        if Property.LIEABLE not in node.properties:
+            info.error('{} is not lieable', node)
+            return False
+        max_occupancy = self._MAX_OCCUPANCIES.get(node.class_name, 1)
+        if _has_objects_on(state, node, max_occupancy):
+            info.error('Too many things on {}', node)
+            return False
+        return True
+
+
+class PourExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        src_node = state.get_state_node(current_line.object())
+        dest_node = state.get_state_node(current_line.subject())
+
+        if src_node is None or dest_node is None:
+            info.script_object_found_error(current_line.object() if src_node is None else current_line.subject())
+        elif self._check_pourable(state, src_node, dest_node, info, char_index):
+            changes = [AddEdges(NodeInstance(src_node), Relation.INSIDE, NodeInstance(dest_node))]
+            if src_node.class_name == 'water':
+                changes += [DeleteEdges(CharacterNode(char_index), [Relation.HOLDS_LH, Relation.HOLDS_RH], NodeInstance(src_node))]
+            if modify:
+                yield state.change_state(changes, in_place=in_place)
+            else:
+                yield state
+
+    def _check_pourable(self, state: EnvironmentState, src_node: GraphNode, dest_node: GraphNode, info: ExecutionInfo, char_index):
+
+        if Property.POURABLE not in src_node.properties and Property.DRINKABLE not in src_node.properties:
+            info.error('{} is not pourable or drinkable', src_node)
+            return False
+
+        if Property.RECIPIENT not in dest_node.properties and dest_node.class_name not in ["hands_both", "sponge", "face"]:
+            info.error('{} is not recipient', dest_node)
+            return False
+
+        hand_rel = _find_holding_hand(state, src_node, char_index)
+        if hand_rel is None:
+            info.error('{} is not holding {}', _get_character_node(state, char_index), src_node)
+            return False
+
+        char_node = _get_character_node(state, char_index)
+        if not _is_character_close_to(state, dest_node, char_index):
+            info.error('{} is not close to {}', char_node, dest_node)
+            return False
+        
+        return True
+
+
+class TypeExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_typeable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+        
+    def check_typeable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', char_node, node)
+            return False
+        
+        if node.class_name == 'keyboard':
+            return True
+
+        if Property.HAS_SWITCH not in node.properties:
+            info.error('{} does not have switch', node)
+            return False
+        
+        return True
+
+
+class WatchExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_watchable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_watchable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        char_node = _get_character_node(state, char_index)
+        char_room = _get_room_node(state, char_node)
+        node_room = _get_room_node(state, node)
+        
+        if Property.LOOKABLE not in node.properties:
+            info.error('{} not lookable', node)
+            return False
+        if node_room.id != char_room.id:
+            info.error('char room {} is not node room {}', char_room, node_room)
+            return False
+        if not _is_character_face_to(state, node, char_index):
+            info.error('{} does not face {}', char_node, node)
+            return False
+        if node.class_name != 'computer' and (State.SITTING in char_node.states or State.LYING in char_node.states) and not _has_relation(state, char_node, Relation.FACING, node):
+            info.error('{} is not facing {} while sitting', char_node, node)
+            return False
+        if _is_inside(state, node):
+            info.error('{} is inside other closed thing', node)
+        return True
+
+
+class MoveExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        action_name = current_line.action.name.lower()
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        else:
+            new_relation = self.check_movable(state, node, info, action_name, char_index)
+            if new_relation is not None:
+                if modify:
+                    yield state.change_state([], in_place=in_place)
+                else:
+                    yield state
+
+    def check_movable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, action_name: str, char_index) -> Optional[Relation]:
+
+        if Property.MOVABLE not in node.properties and (action_name != 'push' and node.class_name != 'button') and node.class_name not in ['chair', 'curtain']:
+            info.error('{} is not movable', node)
+            return None
+        if not _is_character_close_to(state, node, char_index):
+            char_node = _get_character_node(state, char_index)
+            info.error('{} is not close to {}', char_node, node)
+            return None
+        if _is_inside(state, node):
+            info.error('{} is inside other closed thing', node)
+            return None
+        new_relation = _find_free_hand(state, char_index)
+        if new_relation is None:
+            char_node = _get_character_node(state, char_index)
+            info.error('{} does not have a free hand', char_node)
+            return None
+        return new_relation
+
+
+class WashExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_washable(state, node, info, char_index):
+            new_node = node.copy()
+            new_node.states.discard(State.DIRTY)
+            new_node.states.add(State.CLEAN)
+            if modify:
+                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
+            else:
+                yield state
+
+    def check_washable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+
+        return True
+
+
+class SqueezeExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_squeezable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_squeezable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        
+        if _find_free_hand(state, char_index) is None:
+            info.error('{} does not have a free hand', _get_character_node(state, char_index))
+            return False
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+
+        squeezable_objects = ['cleaning_solution', 'tooth_paste', 'shampoo', 
+                'food_peanut_butter', 'dish_soap', 'soap', 'towel', 'rag', 'paper', 'sponge', 
+                'food_lemon', 'check']
+        if Property.CLOTHES not in node.properties and node.class_name not in squeezable_objects:
+            info.error('{} is not clothes', node)
+            return False
+
+        return True
+
+
+class PlugExecutor(ActionExecutor):
+
+    def __init__(self, plug_in):
+        """
+            PlugInExecutor: True
+            PlugOutExecutor: False
+        """
+        self.plug_in = plug_in
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_plugable(state, node, info, char_index):
+            new_node = node.copy()
+            new_node.states.discard(State.PLUGGED_OUT if self.plug_in else State.PLUGGED_IN)
+            new_node.states.add(State.PLUGGED_IN if self.plug_in else State.PLUGGED_OUT)
+            if modify:
+                yield state.change_state([ChangeNode(new_node)], in_place=in_place)
+            else:
+                yield state
+
+    def check_plugable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+        s = State.PLUGGED_OUT if self.plug_in else State.PLUGGED_IN
+        if Property.HAS_PLUG not in node.properties:
+            info.error('{} does not have a plug', node)
+            return False
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+        if _find_free_hand(state, char_index) is None:
+            info.error('{} does not have a free hand', _get_character_node(state, char_index))
+            return False
+        if s not in node.states:
+            info.error('{} is not {}', node, s.name.lower())
+            return False
+        if not self.plug_in and State.ON in node.states:
+            info.error('{} is still on', node)
+        return True
+    
+
+class CutExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_cuttable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_cuttable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+
+        if _find_free_hand(state, char_index) is None:
+            info.error('{} does not have a free hand', _get_character_node(state, char_index))
+            return False
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+        if Property.EATABLE not in node.properties:
+            info.error('{} is not eatable', node)
+            return False
+        if Property.CUTTABLE not in node.properties:
+            info.error('{} is not cuttable', node)
+            return False
+
+        char_node = _get_character_node(state, char_index)
+        holding_nodes = _find_nodes_from(state, char_node, [Relation.HOLDS_LH, Relation.HOLDS_RH])
+        if not any(['knife' in node.class_name for node in holding_nodes]):
+            info.error('{} is not holding a knife', _get_character_node(state, char_index))
+            return False
+
+        return True
+
+
+class EatExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        current_line = script[0]
+        info.set_current_line(current_line)
+        node = state.get_state_node(current_line.object())
+        if node is None:
+            info.object_found_error()
+        elif self.check_eatable(state, node, info, char_index):
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+    def check_eatable(self, state: EnvironmentState, node: GraphNode, info: ExecutionInfo, char_index):
+
+        if not _is_character_close_to(state, node, char_index):
+            info.error('{} is not close to {}', _get_character_node(state, char_index), node)
+            return False
+            
+        if Property.EATABLE in node.properties:
+            return True
+        else:
+            nodes_in_objs = _find_nodes_to(state, node, relations=[Relation.ON])
+            if len(nodes_in_objs) == 0:
+                info.error('{} is not eatable', node)
+                return False
+            elif any([Property.EATABLE in node.properties for node in nodes_in_objs]):
+                return True
+            else:
+                info.error('none of object on {} is eatable', node)
+                return False
+
+
+class SleepExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+
+        info.set_current_line(script[0])
+        char_node = _get_character_node(state, char_index)
+        if State.LYING not in char_node.states and State.SITTING not in char_node.states:
+            info.error('{} is not lying or sitting', char_node)
+        else:
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+
+class WakeUpExecutor(ActionExecutor):
+
+    def execute(self, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+
+        info.set_current_line(script[0])
+        char_node = _get_character_node(state, char_index)
+        if State.LYING not in char_node.states and State.SITTING not in char_node.states:
+            info.error('{} is not lying or sitting', char_node)
+        else:
+            if modify:
+                yield state.change_state([], in_place=in_place)
+            else:
+                yield state
+
+
+PointAtExecutor = LookAtExecutor
+
+
+# General checks and helpers
+
+
+# Conditions of the checks, built and compiled once; the nodes are parameters of state.evaluate
+_RELATION_TO = {r: ExistsRelation(NodeParam(), r, NodeParamFilter('to_node')) for r in Relation}
+_RELATION_TO_ANY = {r: ExistsRelation(NodeParam(), r, AnyNodeFilter()) for r in Relation}
+_INSIDE_CLOSED = ExistsRelation(NodeParam(), Relation.INSIDE,
+                                NodeConditionFilter(And(NodeAttrIn(State.CLOSED, 'states'), Not(IsRoomNode()))))
+_OBJECTS_ON = {}  # map: min count -> condition
+
+
+def _has_relation(state: EnvironmentState, from_node: Node, relation: Relation, to_node: Node):
+    return state.evaluate(_RELATION_TO[relation], node=from_node, to_node=to_node)
+
+
+def _has_objects_on(state: EnvironmentState, node: Node, min_value: int):
+    if min_value not in _OBJECTS_ON:
+        _OBJECTS_ON[min_value] = CountRelations(AnyNode(), Relation.ON, NodeParamFilter(), min_value=min_value)
+    return state.evaluate(_OBJECTS_ON[min_value], node=node)
+
+
+def _is_character_close_to(state: EnvironmentState, node: Node, char_index: int):
+    char_node = _get_character_node(state, char_index)
+    if _has_relation(state, char_node, Relation.CLOSE, node):
+        return True
+    # loose rule
+    for close_node in state.get_nodes_from(char_node, Relation.CLOSE):
+        if _has_relation(state, close_node, Relation.CLOSE, node):
+            return True
+        if _has_relation(state, node, Relation.ON, close_node):
+            return True
+    return False
+
+
+def _is_character_face_to(state: EnvironmentState, node: Node, char_index: int):
+    char_node = _get_character_node(state, char_index)
+    if _has_relation(state, char_node, Relation.FACING, node):
+        return True
+    for face_node in state.get_nodes_from(char_node, Relation.FACING):
+        if _has_relation(state, face_node, Relation.FACING, node):
+            return True
+    return False
+
+
+def _get_character_node(state: EnvironmentState, char_index: int):
+    return next(state.get_char_node(char_index), None)
+
+
+def _get_room_node(state: EnvironmentState, node: Node):
+    if node.category == 'Rooms':
+        return node
+    inside_nodes = state.get_nodes_from(node, Relation.INSIDE) 
+    # print(node)
+    if len(inside_nodes) > 1:
+        for n in state.get_nodes_from(node, Relation.INSIDE):
+            if n.category == 'Rooms':
+                return n
+    else:
+        while len(inside_nodes) > 0:
+            n = inside_nodes[0]
+            if n.category == 'Rooms':
+                return n
+            else:
+                inside_nodes = state.get_nodes_from(n, Relation.INSIDE)
+
+    return None
+
+
+def _find_nodes_to(state: EnvironmentState, node: Node, relations: List[Relation]):
+    nodes = []
+    for src_node in AnyNode().enumerate(state):
+        for r in relations:
+            nl = state.get_nodes_from(src_node, r)
+            if node in nl:
+                nodes.append(src_node)
+    return nodes
+
+def _find_nodes_from(state: EnvironmentState, node: Node, relations: List[Relation]):
+    nodes = []
+    for r in relations:
+        nl = state.get_nodes_from(node, r)
+        nodes += nl
+    return nodes
+
+
+def _find_first_node_from(state: EnvironmentState, node: Node, relations: List[Relation]):
+    for r in relations:
+        for n in state.get_nodes_from(node, r):
+            if n.category != 'Rooms':
+                return n, r
+    return None, None
+
+
+def _find_free_hand(state: EnvironmentState, char_index: int):
+    char_node = _get_character_node(state, char_index)
+    if not state.evaluate(_RELATION_TO_ANY[Relation.HOLDS_RH], node=char_node):
+        return Relation.HOLDS_RH
+    if not state.evaluate(_RELATION_TO_ANY[Relation.HOLDS_LH], node=char_node):
+        return Relation.HOLDS_LH
+    return None
+
+
+def _find_holding_hand(state: EnvironmentState, node: Node, char_index: int):
+    char_node = _get_character_node(state, char_index)
+    if _has_relation(state, char_node, Relation.HOLDS_RH, node):
+        return Relation.HOLDS_RH
+    if _has_relation(state, char_node, Relation.HOLDS_LH, node):
+        return Relation.HOLDS_LH
+    return None
+
+
+def _is_inside(state: EnvironmentState, node: Node):
+    return state.evaluate(_INSIDE_CLOSED, node=node)
+
+
+class RoomConnectivity(object):
+    """Rooms adjacency through doors and doorjambs, with memoized closed door queries.
+    Built for the door states of one EnvironmentState, which drops it as soon as a door changes.
+    """
+
+    def __init__(self, state: EnvironmentState):
+        self.door_ids = set()
+        self.closed_door_ids = set()
+        self.adj_lists = {}
+        self._closed_doors_between = {}  # map: (room1 id, room2 id) -> list of door ids or None
+        for class_name in DOOR_CLASS_NAMES:
+            for door_node in state.get_nodes_by_attr('class_name', class_name):
+                self.door_ids.add(door_node.id)
+                if State.CLOSED in door_node.states:
+                    self.closed_door_ids.add(door_node.id)
+                door_rooms = state.get_nodes_from(door_node, Relation.BETWEEN)
+                if len(door_rooms) > 1:
+                    self.adj_lists.setdefault(door_rooms[0].id, []).append((door_rooms[1].id, door_node.id))
+                    self.adj_lists.setdefault(door_rooms[1].id, []).append((door_rooms[0].id, door_node.id))
+
+    def closed_doors_between(self, room1_id: int, room2_id: int):
+        key = (room1_id, room2_id)
+        if key not in self._closed_doors_between:
+            self._closed_doors_between[key] = self._find_closed_doors(room1_id, room2_id)
+        return self._closed_doors_between[key]
+
+    def _find_closed_doors(self, room1_id: int, room2_id: int):
+        bfs_prev = BFS(self.adj_lists, room1_id, self.closed_door_ids)
+        if room2_id in bfs_prev:
+            return []
+        bfs_prev = BFS(self.adj_lists, room1_id)
+        if room2_id not in bfs_prev:
+            return None  # No path!
+        closed_between = []
+        current_id = room2_id
+        while current_id != room1_id:
+            next_id, door_id = bfs_prev[current_id]
+            if next_id is None:
+                break
+            if door_id in self.closed_door_ids:
+                closed_between.append(door_id)
+            current_id = next_id
+        return closed_between
+
+
+def _get_room_connectivity(state: EnvironmentState):
+    room_connectivity = state.get_room_connectivity()
+    if room_connectivity is None:
+        room_connectivity = RoomConnectivity(state)
+        state.set_room_connectivity(room_connectivity)
+    return room_connectivity
+
+
+def _create_walkable_graph(state: EnvironmentState):
+    return _get_room_connectivity(state).adj_lists
+
+
+def _check_closed_doors(state: EnvironmentState, room1: GraphNode, room2: GraphNode):
+    if not state.check_closed_doors or room2 is None:
+        return []
+    closed_door_ids = _get_room_connectivity(state).closed_doors_between(room1.id, room2.id)
+    if closed_door_ids is None:
+        return None
+    return [state.get_node(door_id) for door_id in closed_door_ids]
+
+
+def BFS(adj_lists: dict, s, closed_door_ids=None):
+    """Breadth first search over rooms, optionally not going through the closed doors"""
+    prev = {}
+    prev[s] = (None, None)
+    q = deque([s])
+    while q:
+        v = q.popleft()
+        for u, d in adj_lists.get(v, []):
+            if closed_door_ids is not None and d in closed_door_ids:
+                continue
+            if u not in prev:
+                prev[u] = (v, d)
+                q.append(u)
+    return prev
+
+
+# ScriptExecutor
+###############################################################################
+
+
+# Transposition table
+###############################################################################
+
+class TranspositionTable(object):
+    """
+    Bounded map (least recently used entries are dropped) from a state fingerprint and a script suffix
+    to the result of the execution of the suffix from the state. The keys include the name equivalence
+    and the options of the executor, so a table can be shared by executors with different ones. States
+    and graph dictionaries of the results are shared by all the hits and must not be changed in place.
+    """
+
+    def __init__(self, max_size: int=100000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        entry = self._entries.get(key, None)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+        return entry
+
+    def put(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class ExecutionSnapshots(object):
+    """
+    States before each line of the last script executed by a ScriptExecutor (states are changes over the
+    graph, keeping one per line is cheap). When the next script on an equal graph shares a prefix with it,
+    ScriptExecutor.execute resumes from the state after the prefix instead of executing the script again.
+    """
+
+    def __init__(self):
+        self.key = None  # graph fingerprint and execution options of the snapshots
+        self.line_strs = []
+        self.states = []  # states[i] is the state before line i, the last one is final if the script succeeded
+        self.graph_state_list = []
+        self.message_counts = []  # message_counts[i] is the number of messages before line i
+        self.messages = []
+
+    def clear(self):
+        self.__init__()
+
+    def resume_index(self, key, line_strs):
+        """
+        :return: number of lines of the script that can be skipped
+        """
+        if key != self.key:
+            return 0
+        index = 0
+        max_index = min(len(line_strs), len(self.states) - 1)
+        while index < max_index and line_strs[index] == self.line_strs[index]:
+            index += 1
+        return index
+
+
+class ScriptExecutor(object):
+
+    _action_executors = {
+        Action.WALK: WalkExecutor(),
+        Action.FIND: FindExecutor(),
+        Action.SIT: SitExecutor(),
+        Action.STANDUP: StandUpExecutor(),
+        Action.GRAB: GrabExecutor(),
+        Action.OPEN: OpenExecutor(False),
+        Action.CLOSE: OpenExecutor(True),
+        Action.PUTBACK: PutExecutor(Relation.ON),
+        Action.PUTIN: PutExecutor(Relation.INSIDE),
+        Action.SWITCHON: SwitchExecutor(True),
+        Action.SWITCHOFF: SwitchExecutor(False),
+        Action.DRINK: DrinkExecutor(), 
+        Action.LOOKAT: LookAtExecutor(), 
+        Action.TURNTO: TurnToExecutor(), 
+        Action.WIPE: WipeExecutor(), 
+        Action.RUN: WalkExecutor(),
+        Action.PUTON: PutOnExecutor(), 
+        Action.PUTOFF: PutOffExecutor(), 
+        Action.GREET: GreetExecutor(), 
+        Action.DROP: DropExecutor(), 
+        Action.READ: ReadExecutor(), 
+        Action.POINTAT: PointAtExecutor(), 
+        Action.TOUCH: TouchExecutor(), 
+        Action.LIE: LieExecutor(),
+        Action.PUTOBJBACK: PutBackExecutor(), 
+        Action.POUR: PourExecutor(), 
+        Action.TYPE: TypeExecutor(), 
+        Action.WATCH: WatchExecutor(), 
+        Action.PUSH: MoveExecutor(), 
+        Action.PULL: MoveExecutor(), 
+        Action.MOVE: MoveExecutor(), 
+        Action.RINSE: WashExecutor(),
+        Action.WASH: WashExecutor(), 
+        Action.SCRUB: WashExecutor(), 
+        Action.SQUEEZE: SqueezeExecutor(), 
+        Action.PLUGIN: PlugExecutor(True), 
+        Action.PLUGOUT: PlugExecutor(False), 
+        Action.CUT: CutExecutor(), 
+        Action.EAT: EatExecutor(), 
+        Action.SLEEP: SleepExecutor(), 
+        Action.WAKEUP: WakeUpExecutor(), 
+        Action.RELEASE: DropExecutor()
+    }
+
+    def __init__(self, graph: EnvironmentGraph, name_equivalence, char_index: int=0, check_closed_doors: bool=False,
+                 transposition_table: TranspositionTable=None, snapshots: ExecutionSnapshots=None):
+        self.graph = graph
+        self.name_equivalence = name_equivalence
+        self.processing_time_limit = 10  # 10 seconds
+        self.processing_limit = 0
+        self.info = ExecutionInfo()
+        self.char_index = char_index
+        # walking through a closed door is an error only if this is set
+        self.check_closed_doors = check_closed_doors
+        # results of execute without initial changers are looked up and stored here, if set (may be shared by
+        # several executors)
+        self.transposition_table = transposition_table
+        # states of the lines executed by execute, if set; a script sharing a prefix with the previous one
+        # (also of another executor on an equal graph) is executed from the end of the prefix
+        self.snapshots = snapshots
+
+    def find_solutions(self, script: Script, init_changers: List[StateChanger]=None, processes: int=1,
+                       max_solutions: int=None):
+        """
+        Enumerates the final states of the script, for the possible bindings of script objects to nodes.
+        :param processes: if > 1, the branches at the first choice point are searched in a process pool
+        :param max_solutions: stop after this many solutions (None: all solutions found within the time limit)
+        """
+        self.processing_limit = time.time() + self.processing_time_limit
+        init_state = EnvironmentState(self.graph, self.name_equivalence, check_closed_doors=self.check_closed_doors)
+        _apply_initial_changers(init_state, script, init_changers)
+        search = SolutionSearch(self, script, self.processing_limit, max_solutions)
+        if processes > 1:
+            return search.parallel_solutions(init_state, processes)
+        return search.solutions(0, init_state)
+
+    def find_solutions_rec(self, script: Script, script_index: int, state: EnvironmentState):
+        return SolutionSearch(self, script, self.processing_limit).solutions(script_index, state)
+
+    def execute(self, script: Script, init_changers: List[StateChanger]=None, w_graph_list: bool=True):
+        """
+        :return: (executable, final state, list of the graph dictionaries before each line and after the last
+            one executed). With a transposition table or snapshots, the graph dictionaries may be shared with
+            other results and are read-only
+        """
+        info = self.info
+        state = EnvironmentState(self.graph, self.name_equivalence, instance_selection=True,
+                                 check_closed_doors=self.check_closed_doors)
+        _apply_initial_changers(state, script, init_changers)
+        graph_state_list = []
+        # initial changers may be random, and change the nodes in place without updating the fingerprint of
+        # the state, their states are not reused
+        table = self.transposition_table if init_changers is None else None
+        table_keys = []  # (key, graph_state_list index, info.messages index) of the states reached
+        snapshots = self.snapshots if init_changers is None else None
+        line_strs = [str(script_line) for script_line in script] if table is not None or snapshots is not None else None
+        start = 0
+        if snapshots is not None:
+            snapshot_key = (self.graph.fingerprint(), id(self.name_equivalence), self.char_index,
+                            self.check_closed_doors, w_graph_list)
+            start = snapshots.resume_index(snapshot_key, line_strs)
+            if start > 0:
+                state = snapshots.states[start]
+                graph_state_list.extend(snapshots.graph_state_list[:start])
+                message_start = len(info.messages)
+                info.messages.extend(snapshots.messages[:snapshots.message_counts[start]])
+            else:
+                message_start = len(info.messages)
+            snapshot_states = snapshots.states[:start]
+            message_counts = snapshots.message_counts[:start]
+        executable = True
+        for i in range(start, len(script)):
+            if snapshots is not None:
+                snapshot_states.append(state)
+                message_counts.append(len(info.messages) - message_start)
+            if table is not None:
+                key = (state.fingerprint(), tuple(line_strs[i:]), id(self.name_equivalence), self.char_index,
+                       self.check_closed_doors, w_graph_list)
+                entry = table.get(key)
+                if entry is not None:
+                    executable, state, messages, cached_state_list = entry
+                    info.messages.extend(messages)
+                    graph_state_list.extend(cached_state_list)
+                    break
+                table_keys.append((key, len(graph_state_list), len(info.messages)))
+
+            prev_state = state
+            if w_graph_list:
+                graph_state_list.append(state.to_dict())
+            
+            future_script = script.from_index(i)
+            state = next(self.call_action_method(future_script, state, info, self.char_index), None)
+            if state is None:
+                executable, state = False, prev_state
+                break
+        else:
+            if w_graph_list:
+                graph_state_list.append(state.to_dict())
+            if snapshots is not None:
+                snapshot_states.append(state)
+                message_counts.append(len(info.messages) - message_start)
+
+        for key, list_index, message_index in table_keys:
+            table.put(key, (executable, state, info.messages[message_index:], graph_state_list[list_index:]))
+
+        if snapshots is not None:
+            snapshots.key = snapshot_key
+            snapshots.line_strs = line_strs
+            snapshots.states = snapshot_states
+            snapshots.graph_state_list = graph_state_list[:len(snapshot_states)] if w_graph_list else []
+            snapshots.message_counts = message_counts
+            snapshots.messages = info.messages[message_start:]
+
+        return executable, state, graph_state_list
+
+    def execute_batch(self, scripts: List[Script], init_changers: List[StateChanger]=None):
+        """
+        Executes several scripts from the same initial state. The scripts are arranged in a trie of their
+        lines, so a prefix shared by several scripts is executed once and the state after the prefix is
+        shared by the branches (action executors create new states, they do not modify the ones they get).
+        :param init_changers: the changers choose the objects to add from the classes of the script, so the
+            scripts are grouped by their set of classes and the changers are applied once per group, as execute
+            does with any script of the group. The scripts of a group share the random choices of the changers
+        :return: list of (executable, final_state, error string), one item per script
+        """
+        groups = {}  # map: classes of the scripts -> indices of the scripts
+        for script_index, script in enumerate(scripts):
+            classes = frozenset(so.name for sl in script for so in sl.parameters) if init_changers is not None else None
+            groups.setdefault(classes, []).append(script_index)
+
+        results = [None] * len(scripts)
+        for script_indices in groups.values():
+            state = EnvironmentState(self.graph, self.name_equivalence, instance_selection=True,
+                                     check_closed_doors=self.check_closed_doors)
+            _apply_initial_changers(state, scripts[script_indices[0]], init_changers)
+            self._execute_trie(scripts, script_indices, state, results)
+        return results
+
+    def _execute_trie(self, scripts: List[Script], script_indices: List[int], state: EnvironmentState, results: list):
+        root = _ScriptTrieNode()
+        for script_index in script_indices:
+            script = scripts[script_index]
+            trie_node = root
+            for i in range(len(script)):
+                trie_node = trie_node.child(script, i)
+            trie_node.script_indices.append(script_index)
+
+        stack = [(root, state, [])]
+        while len(stack) > 0:
+            trie_node, state, messages = stack.pop()
+            for script_index in trie_node.script_indices:
+                results[script_index] = (True, state, ','.join(messages))
+            for child in trie_node.children.values():
+                info = ExecutionInfo()
+                future_script = child.script.from_index(child.line_index)
+                next_state = next(self.call_action_method(future_script, state, info, self.char_index), None)
+                child_messages = messages + info.messages
+                if next_state is None:
+                    for script_index in child.subtree_script_indices():
+                        results[script_index] = (False, state, ','.join(child_messages))
+                else:
+                    stack.append((child, next_state, child_messages))
+
+    @classmethod
+    def call_action_method(cls, script: Script, state: EnvironmentState, info: ExecutionInfo, char_index, modify=True, in_place=False):
+        executor = cls._action_executors.get(script[0].action, UnknownExecutor())
+        return executor.execute(script, state, info, char_index, modify, in_place)
+
+    def check_one_step(self, script: Script, state: EnvironmentState):
+        prev_state = state
+        state = next(self.call_action_method(script, state, self.info, self.char_index, False), None)
+        if state is None:
+            return False
+
+        return True
+
+    def execute_one_step(self, script: Script, state: EnvironmentState, in_place=False):
+        prev_state = state
+        #print("in execute_one_step, char_index = {}".format(self.char_index))
+        state = next(self.call_action_method(script, state, self.info, self.char_index, in_place=in_place), None)
+        if state is None:
+            return False, prev_state
+
+        return True, state
+
+def _apply_initial_changers(state: EnvironmentState, script: Script, changers: List[StateChanger]=None):
+    if changers is not None:
+        for changer in changers:
+            changer.apply_changes(state, script=script)
+
+
+# Batch execution
+###############################################################################
+
+class _ScriptTrieNode(object):
+
+    def __init__(self, script: Script=None, line_index: int=-1):
+        self.script = script  # first script containing the line of this node, at line_index
+        self.line_index = line_index
+        self.children = {}  # map: (action, parameters, line index) -> _ScriptTrieNode
+        self.script_indices = []  # scripts ending at this node
+
+    def child(self, script: Script, line_index: int):
+        script_line = script[line_index]
+        key = (script_line.action, tuple((p.name, p.instance) for p in script_line.parameters), script_line.index)
+        trie_node = self.children.get(key, None)
+        if trie_node is None:
+            trie_node = _ScriptTrieNode(script, line_index)
+            self.children[key] = trie_node
+        return trie_node
+
+    def subtree_script_indices(self):
+        result = []
+        stack = [self]
+        while len(stack) > 0:
+            trie_node = stack.pop()
+            result.extend(trie_node.script_indices)
+            stack.extend(trie_node.children.values())
+        return result
+
+
+# Solution search
+###############################################################################
+
+# Actions whose executors bind a script object to one of the nodes returned by select_nodes
+_BINDING_ACTIONS = {Action.WALK, Action.RUN, Action.FIND}
+
+
+class SolutionSearch(object):
+    """
+    Depth first search of the script object bindings (non instance_selection mode). A state already
+    expanded at the same script index is not expanded again, candidate nodes of an unbound script
+    object are tried first if they have the properties required by the lines using the object and
+    are in the character room, and the deadline is checked before every expansion.
+    """
+
+    def __init__(self, executor: ScriptExecutor, script: Script, deadline: float, max_solutions: int=None):
+        self.executor = executor
+        self.script = script
+        self.deadline = deadline
+        self.max_solutions = max_solutions
+        self._visited = set()  # (script index, state fingerprint)
+        self._constraints = _script_object_constraints(script)
+
+    def timed_out(self):
+        return time.time() > self.deadline
+
+    def solutions(self, script_index: int, state: EnvironmentState):
+        found = 0
+        for solution in self._search(script_index, state):
+            yield solution
+            found += 1
+            if self.max_solutions is not None and found >= self.max_solutions:
+                break
+
+    def parallel_solutions(self, state: EnvironmentState, processes: int):
+        # follow the script in this process until it branches
+        script_index = 0
+        next_states = [state]
+        while len(next_states) == 1:
+            state = next_states[0]
+            if self.timed_out():
+                return
+            if script_index >= len(self.script):
+                yield state
+                return
+            next_states = list(self.next_states(script_index, state))
+            script_index += 1
+        if len(next_states) == 0:
+            return
+
+        executor = self.executor
+        tasks = [(script_index, next_state.get_delta()) for next_state in next_states]
+        init_args = (executor.graph, executor.name_equivalence, executor.char_index, executor.check_closed_doors,
+                     self.script, self.deadline, self.max_solutions)
+        found = 0
+        with Pool(processes=min(processes, len(tasks)), initializer=_init_search_worker, initargs=init_args) as pool:
+            for deltas in pool.imap(_search_worker, tasks):
+                for delta in deltas:
+                    yield EnvironmentState.from_delta(executor.graph, executor.name_equivalence, delta,
+                                                      check_closed_doors=executor.check_closed_doors)
+                    found += 1
+                    if self.max_solutions is not None and found >= self.max_solutions:
+                        return
+
+    def next_states(self, script_index: int, state: EnvironmentState):
+        script_line = self.script[script_index]
+        future_script = self.script.from_index(script_index)
+        obj = script_line.object()
+        if script_line.action in _BINDING_ACTIONS and not state.instance_selection and \
+                state.get_state_node(obj) is None:
+            for node in self.candidates(state, obj):
+                if self.timed_out():
+                    return
+                for next_state in self._call_action_method(future_script, state.change_state([], node, obj)):
+                    yield next_state
+        else:
+            for next_state in self._call_action_method(future_script, state):
+                yield next_state
+
+    def candidates(self, state: EnvironmentState, obj: ScriptObject):
+        constraints = self._constraints.get((obj.name, obj.instance), [])
+        char_room = _get_room_node(state, _get_character_node(state, self.executor.char_index))
+        char_room_id = None if char_room is None else char_room.id
+
+        def _rank(node):
+            unsatisfied = sum(1 for properties in constraints if properties.isdisjoint(node.properties))
+            node_room = _get_room_node(state, node)
+            return unsatisfied, node_room is None or node_room.id != char_room_id
+
+        return sorted([node for node in state.select_nodes(obj) if node is not None], key=_rank)
+
+    def _search(self, script_index: int, state: EnvironmentState):
+        if self.timed_out():
+            return
+        if script_index >= len(self.script):
+            yield state
+            return
+        key = (script_index, state.fingerprint())
+        if key in self._visited:
+            return
+        self._visited.add(key)
+        for next_state in self.next_states(script_index, state):
+            for solution in self._search(script_index + 1, next_state):
+                yield solution
+            if self.timed_out():
+                return
+
+    def _call_action_method(self, script: Script, state: EnvironmentState):
+        next_states = ScriptExecutor.call_action_method(script, state, self.executor.info, self.executor.char_index)
+        return [] if next_states is None else next_states
+
+
+def _script_object_constraints(script: Script):
+    """
+    Properties required by the actions on each script object
+    :return: map (name, instance) -> list of property sets, a node should have one property from each set
+    """
+    constraints = {}
+    for script_line in script:
+        action_properties = script_line.action.value[2] if len(script_line.action.value) > 2 else []
+        for parameter, properties in zip(script_line.parameters, action_properties):
+            properties = {Property[p] for p in properties if p in Property.__members__}
+            if len(properties) > 0:
+                constraints.setdefault((parameter.name, parameter.instance), []).append(properties)
+    return constraints
+
+
+_search_worker_data = None
+
+
+def _init_search_worker(graph, name_equivalence, char_index, check_closed_doors, script, deadline, max_solutions):
+    global _search_worker_data
+    _search_worker_data = (graph, name_equivalence, char_index, check_closed_doors, script, deadline, max_solutions)
+
+
+def _search_worker(task):
+    script_index, delta = task
+    graph, name_equivalence, char_index, check_closed_doors, script, deadline, max_solutions = _search_worker_data
+    executor = ScriptExecutor(graph, name_equivalence, char_index, check_closed_doors)
+    state = EnvironmentState.from_delta(graph, name_equivalence, delta, check_closed_doors=check_closed_doors)
+    search = SolutionSearch(executor, script, deadline, max_solutions)
+    return [solution.get_delta() for solution in search.solutions(script_index, state)]
+
+
+# state preparation
+
+_DEFAULT_PROPERTY_STATES = {Property.HAS_SWITCH: State.OFF,
+                            Property.CAN_OPEN: State.CLOSED}
+
+
+def _prepare_state(state: EnvironmentState, script: Script, name_equivalence, object_placing, properties_data):
+    state_classes = {n.class_name for n in state.get_nodes()}
+    script_classes = {so.name for sl in script for so in sl.parameters}
+    missing_classes = set()
+    for sc in script_classes:
+        if sc not in state_classes and len(set(name_equivalence.get(sc, [])) & state_classes) == 0:
+            missing_classes.add(sc)
+    if len(missing_classes) > 0:
+        for mc in missing_classes:
+            if mc not in object_placing:
+                raise ExecutionException('No placing information for "{0}"', mc)
+            if mc not in properties_data:
+                raise ExecutionException('No properties data for "{0}"', mc)
+            new_node_id = state.get_max_node_id() + 1
+            for pi in object_placing[mc]:
+                dest = pi['destination']
+                room_name = pi['room']
+                properties = properties_data.get(mc, [])
+                placed = False
+                for dest_node in state.get_nodes_by_attr('class_name', dest):
+                    if room_name is None:
+                        new_node = _create_node(new_node_id, mc, properties)
+                        _change_state(state, new_node, dest_node, [])
+                        new_node_id += 1
+                        placed = True
+                        break
+                    else:
+                        room_node = _get_room_node(state, dest_node)
+                        if room_node is not None and room_node.class_name == room_name:
+                            new_node = _create_node(new_node_id, mc, properties)
+                            _change_state(state, new_node, dest_node,
+                                          [AddEdges(NodeInstance(new_node), Relation.INSIDE, NodeInstance(room_node))])
+                            new_node_id += 1
+                            placed = True
+                            break
+                if placed:
+                    break
+
+
+def _create_node(node_id: int, class_name: str, properties):
+    states = [_DEFAULT_PROPERTY_STATES[p] for p in properties if p in _DEFAULT_PROPERTY_STATES]
+    return GraphNode(node_id, class_name, None, properties, states, None, None)
+
+
+def _change_state(state: EnvironmentState, new_node: GraphNode, dest_node: Node, add_changers: List[StateChanger]):
+    changers = [AddNode(new_node),
+                AddEdges(NodeInstance(new_node), Relation.ON, NodeInstance(dest_node)),
+                AddEdges(NodeInstance(new_node), Relation.CLOSE, NodeInstance(dest_node), add_reverse=True)]
+    changers.extend(add_changers)
+    state.apply_changes(changers)
+
+
+# Exception
+###############################################################################
+
+class ExecutionException(common.Error):
+    pass
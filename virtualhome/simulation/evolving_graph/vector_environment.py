@@ -0,0 +1,453 @@
+from functools import partial
+import numpy as np
+
+from . import utils
+from .environment import EnvironmentGraph, EnvironmentState, Property, Relation, State
+from .execution import ScriptExecutor
+from .scripts import Action, Script, ScriptLine, parse_script_line
+
+# Indices of the relations in VectorEnvironment.relations
+_ON, _INSIDE, _CLOSE, _FACING, _HOLDS_RH, _HOLDS_LH = [r.value - 1 for r in (
+    Relation.ON, Relation.INSIDE, Relation.CLOSE, Relation.FACING, Relation.HOLDS_RH, Relation.HOLDS_LH)]
+_WALK_DELETED = np.array([_INSIDE, _CLOSE, _FACING])
+_GRAB_DELETED = np.array([_ON, _INSIDE, _CLOSE, _HOLDS_LH, _HOLDS_RH])
+
+
+def _state_bit(state: State):
+    return 1 << (state.value - 1)
+
+
+def _property_bit(prop: Property):
+    return 1 << (prop.value - 1)
+
+
+_CLOSED, _OPEN, _ON_STATE, _OFF, _SITTING, _LYING, _PLUGGED_OUT = [_state_bit(s) for s in (
+    State.CLOSED, State.OPEN, State.ON, State.OFF, State.SITTING, State.LYING, State.PLUGGED_OUT)]
+_GRABBABLE, _CAN_OPEN, _HAS_SWITCH, _BODY_PART = [_property_bit(p) for p in (
+    Property.GRABBABLE, Property.CAN_OPEN, Property.HAS_SWITCH, Property.BODY_PART)]
+
+
+def _states_mask(states):
+    mask = 0
+    for s in states:
+        mask |= _state_bit(s)
+    return mask
+
+
+def _states_set(mask):
+    return {s for s in State if mask & _state_bit(s)}
+
+
+class VectorEnvironment(object):
+    """
+    Batch of evolving graph environments stepped together, with one script line per environment and step.
+    The environments are held as arrays, node i of environment b being the node with id node_ids[b, i]:
+    the bitmasks of the node states `states` (B, N) and the relation adjacency `relations` (B, len(Relation), N, N).
+    Walk, run, find, grab, open, close, switch on/off, put back, put in and put obj back are applied at once to
+    all the environments with the action, as array updates masked by the checks of their executors. The other
+    actions, and the lines whose effect depends on the iteration order of a set of the executor, are executed
+    by a ScriptExecutor on the EnvironmentState of their environment.
+    The results are the ones of ScriptExecutor.execute_one_step on an EnvironmentState with instance_selection
+    (the objects of the lines are selected by id) and without check_closed_doors.
+
+    :param graphs: list of the initial graphs of the environments, graph dictionaries or EnvironmentGraph-s
+    :param name_equivalence: class name equivalence of the executor, loaded from the resources if None
+    """
+
+    def __init__(self, graphs, name_equivalence=None):
+        self.name_equivalence = utils.load_name_equivalence() if name_equivalence is None else name_equivalence
+        self.graphs = [graph if isinstance(graph, EnvironmentGraph) else EnvironmentGraph(graph) for graph in graphs]
+        self._nodes = [sorted(graph.get_nodes(), key=lambda node: node.id) for graph in self.graphs]
+        num_envs = len(self.graphs)
+        num_nodes = max([len(nodes) for nodes in self._nodes], default=0)
+        max_id = max([graph.get_max_node_id() for graph in self.graphs], default=0)
+        chars = [[node for node in nodes if node.class_name == 'character'] for nodes in self._nodes]
+
+        self.node_ids = np.full((num_envs, num_nodes), -1, dtype=np.int64)
+        self._node_index = np.full((num_envs, max_id + 1), -1, dtype=np.int64)
+        self._properties = np.zeros((num_envs, num_nodes), dtype=np.int64)
+        self._is_room = np.zeros((num_envs, num_nodes), dtype=bool)
+        self._grab_class = np.zeros((num_envs, num_nodes), dtype=bool)  # grabbable without the property
+        self._open_class = np.zeros((num_envs, num_nodes), dtype=bool)  # openable without the property
+        self._initial_states = np.zeros((num_envs, num_nodes), dtype=np.int32)
+        self._char_nodes = np.full((num_envs, max([len(c) for c in chars] + [1])), -1, dtype=np.int64)
+        # the executors check the states of the characters of the graph (see EnvironmentState.get_char_node)
+        self._char_blocked = np.zeros(self._char_nodes.shape, dtype=bool)
+        self._initial_edges = []
+        for b, nodes in enumerate(self._nodes):
+            for i, node in enumerate(nodes):
+                self.node_ids[b, i] = node.id
+                self._node_index[b, node.id] = i
+                for p in node.properties:
+                    self._properties[b, i] |= _property_bit(p)
+                self._is_room[b, i] = node.category == 'Rooms'
+                self._grab_class[b, i] = node.class_name in ['water', 'child']
+                self._open_class[b, i] = node.class_name in ['desk', 'window']
+                self._initial_states[b, i] = _states_mask(node.states)
+            for char_index, node in enumerate(chars[b]):
+                self._char_nodes[b, char_index] = self._node_index[b, node.id]
+                self._char_blocked[b, char_index] = State.SITTING in node.states or State.LYING in node.states
+            edges = [(relation.value - 1, self._node_index[b, from_id], self._node_index[b, to_id])
+                     for from_id, relation in self.graphs[b].get_from_pairs()
+                     for to_id in self.graphs[b].get_node_ids_from(from_id, relation)]
+            self._initial_edges.append(tuple(np.array(a, dtype=np.int64).reshape(-1) for a in zip(*edges))
+                                       if len(edges) > 0 else None)
+
+        self.states = self._initial_states.copy()
+        self.relations = np.zeros((num_envs, len(Relation), num_nodes, num_nodes), dtype=bool)
+        # executor data of the grabbed objects: the node and the relation they were grabbed from
+        self.grab_dest = np.full((num_envs, num_nodes), -1, dtype=np.int64)
+        self.grab_relation = np.full((num_envs, num_nodes), -1, dtype=np.int64)
+        self.reset()
+
+        self._action_handlers = {
+            Action.WALK: self._walk,
+            Action.RUN: self._walk,
+            Action.FIND: self._find,
+            Action.GRAB: self._grab,
+            Action.OPEN: partial(self._open, close=False),
+            Action.CLOSE: partial(self._open, close=True),
+            Action.SWITCHON: partial(self._switch, switch_on=True),
+            Action.SWITCHOFF: partial(self._switch, switch_on=False),
+            Action.PUTBACK: partial(self._put, relation=_ON),
+            Action.PUTIN: partial(self._put, relation=_INSIDE),
+            Action.PUTOBJBACK: self._put_obj_back
+        }
+
+    def __len__(self):
+        return len(self.graphs)
+
+    def reset(self, env_indices=None):
+        """
+        Restores the initial graphs of the environments env_indices (all if None)
+        """
+        for b in range(len(self.graphs)) if env_indices is None else env_indices:
+            self.states[b] = self._initial_states[b]
+            self.relations[b] = False
+            if self._initial_edges[b] is not None:
+                self.relations[b][self._initial_edges[b]] = True
+            self.grab_dest[b] = -1
+            self.grab_relation[b] = -1
+
+    def step(self, lines, char_indices=0):
+        """
+        Executes a script line in every environment. The environments where the line can not be executed
+        are not changed.
+
+        :param lines: list with a script line for each environment, ScriptLine-s or strings like
+            '[Walk] <kitchen> (11)'; None leaves the environment unchanged
+        :param char_indices: index of the character executing the lines, an int or one per environment
+        :return: bool array, whether the line of each environment was executed (True for None)
+        """
+        num_envs = len(self.graphs)
+        char_indices = np.broadcast_to(np.asarray(char_indices, dtype=np.int64), (num_envs,))
+        success = np.zeros(num_envs, dtype=bool)
+        script_lines = [None] * num_envs
+        groups = {}  # map: action -> indices of the environments
+        for b, line in enumerate(lines):
+            if line is None:
+                success[b] = True
+                continue
+            if not isinstance(line, ScriptLine):
+                line = parse_script_line(line, 0)
+            script_lines[b] = line
+            groups.setdefault(line.action, []).append(b)
+
+        fallback = []
+        for action, env_list in groups.items():
+            handler = self._action_handlers.get(action)
+            if handler is None:
+                fallback.extend(env_list)
+                continue
+            e = np.array(env_list, dtype=np.int64)
+            c = self._char_node_index(e, char_indices[e])
+            # the executors fail on a missing character, they are run to raise their error
+            fallback.extend(e[c < 0])
+            x = self._node_index_of(e, [_instance(script_lines[b].object()) for b in env_list])
+            y = self._node_index_of(e, [_instance(script_lines[b].subject()) for b in env_list])
+            if action in (Action.PUTBACK, Action.PUTIN):
+                found = (x >= 0) & (y >= 0)
+            else:
+                found = x >= 0
+            valid = (c >= 0) & found
+            e, c, x, y = e[valid], c[valid], x[valid], y[valid]
+            blocked = self._char_blocked[e, char_indices[e]]
+            executed, not_vectorized = handler(e, c, blocked, x, y)
+            success[e] = executed
+            fallback.extend(e[not_vectorized])
+
+        for b in sorted(fallback):
+            success[b] = self._execute_line(b, script_lines[b], int(char_indices[b]))
+        return success
+
+    def to_state(self, env_index):
+        """
+        :return: the EnvironmentState (with instance_selection) of an environment
+        """
+        state = EnvironmentState(self.graphs[env_index], self.name_equivalence, instance_selection=True)
+        nodes = self._nodes[env_index]
+        for i in np.flatnonzero(self.states[env_index] != self._initial_states[env_index]):
+            node = nodes[i].copy()
+            node.states = _states_set(self.states[env_index, i])
+            state.change_node(node)
+        initial_relations = np.zeros(self.relations.shape[1:], dtype=bool)
+        if self._initial_edges[env_index] is not None:
+            initial_relations[self._initial_edges[env_index]] = True
+        for r, i, j in zip(*np.nonzero(self.relations[env_index] != initial_relations)):
+            if self.relations[env_index, r, i, j]:
+                state.add_edge(nodes[i], Relation(r + 1), nodes[j])
+            else:
+                state.delete_edge(nodes[i], Relation(r + 1), nodes[j])
+        for i in np.flatnonzero(self.grab_dest[env_index] >= 0):
+            state.executor_data[(Action.GRAB, nodes[i].id)] = (state.get_node(nodes[self.grab_dest[env_index, i]].id),
+                                                               Relation(self.grab_relation[env_index, i] + 1))
+        return state
+
+    def to_dict(self, env_index):
+        """
+        :return: graph dictionary of an environment
+        """
+        nodes = self._nodes[env_index]
+        states = self.states[env_index]
+        return {'nodes': [dict(node.to_dict(), states=[s.name for s in _states_set(states[i])])
+                          for i, node in enumerate(nodes)],
+                'edges': [{'from_id': nodes[i].id, 'relation_type': Relation(r + 1).name, 'to_id': nodes[j].id}
+                          for r, i, j in zip(*np.nonzero(self.relations[env_index]))]}
+
+    def _load_state(self, env_index, state: EnvironmentState):
+        index = self._node_index[env_index]
+        for node in state.get_nodes():
+            self.states[env_index, index[node.id]] = _states_mask(node.states)
+        self.relations[env_index] = False
+        for edge in state.to_dict()['edges']:
+            self.relations[env_index, Relation[edge['relation_type']].value - 1,
+                           index[edge['from_id']], index[edge['to_id']]] = True
+        self.grab_dest[env_index] = -1
+        self.grab_relation[env_index] = -1
+        for (action, node_id), (dest_node, relation) in state.executor_data.items():
+            if action == Action.GRAB:
+                self.grab_dest[env_index, index[node_id]] = index[dest_node.id]
+                self.grab_relation[env_index, index[node_id]] = relation.value - 1
+
+    def _execute_line(self, env_index, script_line, char_index):
+        executor = ScriptExecutor(self.graphs[env_index], self.name_equivalence, char_index)
+        success, state = executor.execute_one_step(Script([script_line]), self.to_state(env_index))
+        if success:
+            self._load_state(env_index, state)
+        return success
+
+    def _char_node_index(self, e, char_indices):
+        in_range = (char_indices >= 0) & (char_indices < self._char_nodes.shape[1])
+        return np.where(in_range, self._char_nodes[e, np.where(in_range, char_indices, 0)], -1)
+
+    def _node_index_of(self, e, node_ids):
+        node_ids = np.array(node_ids, dtype=np.int64).reshape(-1)
+        known = (node_ids >= 0) & (node_ids < self._node_index.shape[1])
+        return np.where(known, self._node_index[e, np.where(known, node_ids, 0)], -1)
+
+    # Conditions, for the nodes x of the environments e, as the helper functions of the executors
+    ###########################################################################
+
+    def _room_of(self, e, x):
+        """
+        :return: pair room, ambiguous: the rooms of the nodes as _get_room_node (-1 if None), and the nodes whose
+            room depends on the iteration order of the containers in _get_room_node
+        """
+        rel = self.relations
+        room = np.where(self._is_room[e, x], x, -1)
+        inside = rel[e, _INSIDE, x]
+        count = inside.sum(1)
+        rooms_inside = inside & self._is_room[e]
+        room_count = rooms_inside.sum(1)
+        several = (room < 0) & (count > 1)
+        room = np.where(several & (room_count == 1), rooms_inside.argmax(1), room)
+        ambiguous = several & (room_count > 1)
+        # the containers of a node in one container are followed up to a room
+        current = np.where((room < 0) & (count == 1), inside.argmax(1), -1)
+        for _ in range(rel.shape[-1]):
+            active = np.flatnonzero(current >= 0)
+            if len(active) == 0:
+                break
+            e_active, x_active = e[active], current[active]
+            found = self._is_room[e_active, x_active]
+            room[active[found]] = x_active[found]
+            up = rel[e_active, _INSIDE, x_active]
+            up_count = up.sum(1)
+            ambiguous[active[~found & (up_count > 1)]] = True
+            current[active] = np.where(~found & (up_count == 1), up.argmax(1), -1)
+        room[ambiguous] = -1
+        return room, ambiguous
+
+    def _close_to(self, e, c, x):
+        # _is_character_close_to
+        rel = self.relations
+        close = rel[e, _CLOSE, c]
+        return close[np.arange(len(e)), x] | (close & (rel[e, _CLOSE, :, x] | rel[e, _ON, x])).any(1)
+
+    def _inside_closed(self, e, x):
+        # _is_inside
+        closed = (self.states[e] & _CLOSED) != 0
+        return (self.relations[e, _INSIDE, x] & closed & ~self._is_room[e]).any(1)
+
+    def _has_free_hand(self, e, c):
+        rel = self.relations
+        return ~(rel[e, _HOLDS_RH, c].any(1) & rel[e, _HOLDS_LH, c].any(1))
+
+    # Changes
+    ###########################################################################
+
+    def _delete_edges(self, e, x, relations):
+        # the edges of the relations from and to the nodes x
+        rel = self.relations
+        rel[e[:, None], relations[None, :], x[:, None]] = False
+        rel[e[:, None], relations[None, :], :, x[:, None]] = False
+
+    def _add_close(self, e, x, nodes):
+        # CLOSE edges both ways between the nodes x and the nodes (bool array) of their environment
+        rel = self.relations
+        rel[e, _CLOSE, x] |= nodes
+        rel[e, _CLOSE, :, x] |= nodes
+
+    def _add_close_pair(self, e, x, y):
+        rel = self.relations
+        rel[e, _CLOSE, x, y] = True
+        rel[e, _CLOSE, y, x] = True
+
+    def _walk_to(self, e, c, x, node_room, char_room):
+        # changes of WalkExecutor
+        rel = self.relations
+        held = rel[e, _HOLDS_LH, c] | rel[e, _HOLDS_RH, c]
+        self._delete_edges(e, c, _WALK_DELETED)
+        rel[e, _INSIDE, c, node_room] = True
+        n = node_room != x
+        e_n, x_n = e[n], x[n]
+        near = rel[e_n, _INSIDE, x_n] & ~self._is_room[e_n]
+        near |= (self._properties[e_n] & _BODY_PART) != 0
+        near[np.arange(len(x_n)), x_n] = True
+        self._add_close(e_n, c[n], near)
+        held_envs, held_nodes = np.nonzero(held)
+        self._delete_edges(e[held_envs], held_nodes, _WALK_DELETED)
+        self._add_close_pair(e[held_envs], c[held_envs], held_nodes)
+        rel[e[held_envs], _INSIDE, held_nodes, char_room[held_envs]] = True
+        o = (self._properties[e, x] & _CAN_OPEN) != 0
+        self._add_close(e[o], c[o], rel[e[o], _INSIDE, :, x[o]])
+        self._add_close(e, c, rel[e, _ON, x])
+
+    # Actions, handlers (environments, character nodes, blocked characters, objects, subjects) ->
+    # (executed, to execute with the ScriptExecutor)
+    ###########################################################################
+
+    def _walk(self, e, c, blocked, x, y):
+        node_room, ambiguous = self._room_of(e, x)
+        char_room, char_ambiguous = self._room_of(e, c)
+        # the executor fails on a character without room
+        fallback = ~blocked & (ambiguous | (char_room < 0))
+        executed = ~blocked & ~fallback & (node_room >= 0)
+        self._walk_to(e[executed], c[executed], x[executed], node_room[executed], char_room[executed])
+        return executed, fallback
+
+    def _find(self, e, c, blocked, x, y):
+        rel = self.relations
+        close = self._close_to(e, c, x)
+        find = rel[e, _ON, x, c] | ((self._properties[e, x] & _BODY_PART) != 0) | close | blocked
+        node_room, ambiguous = self._room_of(e, x)
+        char_room, char_ambiguous = self._room_of(e, c)
+        fallback = ~find & (ambiguous | (char_room < 0))
+        walk = ~find & ~fallback & (node_room >= 0)
+        self._walk_to(e[walk], c[walk], x[walk], node_room[walk], char_room[walk])
+        find &= close
+        rel[e[find], _FACING, c[find]] = False
+        self._add_close_pair(e[find], c[find], x[find])
+        return walk | find, fallback
+
+    def _grab(self, e, c, blocked, x, y):
+        rel = self.relations
+        grabbable = ((self._properties[e, x] & _GRABBABLE) != 0) | self._grab_class[e, x]
+        executed = grabbable & (self.grab_dest[e, x] < 0) & self._close_to(e, c, x) & ~self._inside_closed(e, x)
+        holds_rh = rel[e, _HOLDS_RH, c].any(1)
+        executed &= ~(holds_rh & rel[e, _HOLDS_LH, c].any(1))
+        hand = np.where(holds_rh, _HOLDS_LH, _HOLDS_RH)
+        char_room, ambiguous = self._room_of(e, c)
+        # _find_first_node_from the relations ON, INSIDE, CLOSE of the object
+        close_node = np.full(len(e), -1, dtype=np.int64)
+        close_relation = np.full(len(e), -1, dtype=np.int64)
+        for r in (_ON, _INSIDE, _CLOSE):
+            nodes = rel[e, r, x] & ~self._is_room[e]
+            count = nodes.sum(1)
+            first = (close_relation < 0) & (count > 0)
+            close_node[first] = nodes[first].argmax(1)
+            close_relation[first] = r
+            ambiguous |= first & (count > 1)
+        fallback = executed & (ambiguous | (char_room < 0))
+        executed &= ~fallback
+
+        e, c, x = e[executed], c[executed], x[executed]
+        hand, char_room = hand[executed], char_room[executed]
+        close_node, close_relation = close_node[executed], close_relation[executed]
+        self._delete_edges(e, x, _GRAB_DELETED)
+        self._add_close_pair(e, c, x)
+        rel[e, hand, c, x] = True
+        rel[e, _INSIDE, x, char_room] = True
+        n = close_node >= 0
+        self._add_close_pair(e[n], c[n], close_node[n])
+        self.grab_dest[e[n], x[n]] = close_node[n]
+        self.grab_relation[e[n], x[n]] = close_relation[n]
+        return executed, fallback
+
+    def _open(self, e, c, blocked, x, y, close=False):
+        states = self.states[e, x]
+        executed = ((self._properties[e, x] & _CAN_OPEN) != 0) | self._open_class[e, x]
+        executed &= self._close_to(e, c, x)
+        if close:
+            executed &= (states & _OPEN) != 0
+        else:
+            executed &= self._has_free_hand(e, c) & ((states & _CLOSED) != 0) & ((states & _ON_STATE) == 0)
+        new_states = (states & ~(_OPEN | _CLOSED)) | (_CLOSED if close else _OPEN)
+        self.states[e[executed], x[executed]] = new_states[executed]
+        return executed, np.zeros(len(e), dtype=bool)
+
+    def _switch(self, e, c, blocked, x, y, switch_on=True):
+        states = self.states[e, x]
+        executed = ((self._properties[e, x] & _HAS_SWITCH) != 0) & self._close_to(e, c, x)
+        if switch_on:
+            executed &= ((states & _OFF) != 0) & ((states & _PLUGGED_OUT) == 0)
+        else:
+            executed &= (states & _ON_STATE) != 0
+        new_states = (states & ~(_ON_STATE | _OFF)) | (_ON_STATE if switch_on else _OFF)
+        self.states[e[executed], x[executed]] = new_states[executed]
+        return executed, np.zeros(len(e), dtype=bool)
+
+    def _puttable(self, e, c, x, y, relation):
+        # _check_puttable
+        rel = self.relations
+        holding = rel[e, _HOLDS_RH, c, x] | rel[e, _HOLDS_LH, c, x]
+        openable = ((self._properties[e, y] & _CAN_OPEN) != 0) & ((self.states[e, y] & _OPEN) == 0)
+        return holding & self._close_to(e, c, y) & ((relation != _INSIDE) | ~openable)
+
+    def _put_changes(self, e, c, x, y, relation):
+        rel = self.relations
+        rel[e, _HOLDS_LH, c, x] = False
+        rel[e, _HOLDS_RH, c, x] = False
+        self._add_close_pair(e, c, y)
+        self._add_close_pair(e, x, y)
+        rel[e, relation, x, y] = True
+        self.grab_dest[e, x] = -1
+        self.grab_relation[e, x] = -1
+
+    def _put(self, e, c, blocked, x, y, relation=_ON):
+        executed = self._puttable(e, c, x, y, relation)
+        self._put_changes(e[executed], c[executed], x[executed], y[executed], relation)
+        return executed, np.zeros(len(e), dtype=bool)
+
+    def _put_obj_back(self, e, c, blocked, x, y):
+        grabbed = self.grab_dest[e, x] >= 0
+        e, c, x = e[grabbed], c[grabbed], x[grabbed]
+        y, relation = self.grab_dest[e, x], self.grab_relation[e, x]
+        # PutBackExecutor succeeds without changes when the object can not be put back
+        put = self._puttable(e, c, x, y, relation)
+        self._put_changes(e[put], c[put], x[put], y[put], relation[put])
+        return grabbed, np.zeros(len(grabbed), dtype=bool)
+
+
+def _instance(obj):
+    return -1 if obj is None else obj.instance
@@ -0,0 +1,23 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fake_simulator import FakeSimulator
+
+
+@pytest.fixture
+def fake_simulator():
+    """
+    Starts FakeSimulator-s, called with their arguments, they are closed after the test
+    """
+    simulators = []
+
+    def start(**kwargs):
+        simulators.append(FakeSimulator(**kwargs))
+        return simulators[-1]
+    yield start
+    for simulator in simulators:
+        simulator.close()
@@ -0,0 +1,129 @@
+# Stand-in of the simulator for the tests: an HTTP server answering the JSON commands of UnityCommunication
+import gzip
+import json
+import socket
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def free_base_port(num_ports):
+    """
+    :return: first port of num_ports consecutive free ports
+    """
+    for base_port in range(20000, 30000, num_ports):
+        sockets = []
+        try:
+            for port in range(base_port, base_port + num_ports):
+                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sockets.append(s)
+                s.bind(('127.0.0.1', port))
+            return base_port
+        except OSError:
+            continue
+        finally:
+            for s in sockets:
+                s.close()
+    raise RuntimeError('No free ports')
+
+
+def scene_graph():
+    """
+    :return: graph of a small scene, a character in the kitchen of a two rooms apartment
+    """
+    return {'nodes': [{'id': 1, 'class_name': 'character', 'category': 'Characters', 'properties': [], 'states': []},
+                      {'id': 11, 'class_name': 'kitchen', 'category': 'Rooms', 'properties': [], 'states': []},
+                      {'id': 12, 'class_name': 'livingroom', 'category': 'Rooms', 'properties': [], 'states': []}],
+            'edges': [{'from_id': 1, 'relation_type': 'INSIDE', 'to_id': 11}]}
+
+
+class FakeSimulator(object):
+    """
+    Serves the simulator commands on 127.0.0.1 and records them
+
+    :param int port: port of the server, a free one if 0
+    :param bool accept_batches: whether the lists of commands of batch_requests are answered, if not they get a 400
+    :param error_statuses: HTTP statuses of the first requests, e.g. 502 while the simulator starts
+    :param float delay: seconds each command takes
+    """
+
+    def __init__(self, port=0, accept_batches=True, error_statuses=(), delay=0.):
+        self.accept_batches = accept_batches
+        self.error_statuses = list(error_statuses)
+        self.delay = delay
+        self.graph = scene_graph()
+        self.camera_images = []  # base64 encoded images answered to camera_image
+        self.posts = []  # actions of each request, a list for the batches
+        self.encodings = []  # Content-Encoding of each request
+        self.connections = set()  # client addresses, one per connection
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def actions(self):
+        return [action for post in self.posts for action in (post if isinstance(post, list) else [post])]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def answer(self, request):
+        action = request['action']
+        response = {'id': request['id'], 'success': True, 'message': '{}', 'message_list': [], 'value': 0}
+        if action == 'environment_graph':
+            response['message'] = json.dumps(self.graph)
+        elif action == 'camera_count':
+            response['value'] = 3
+        elif action == 'camera_image':
+            response['message_list'] = self.camera_images
+        elif action == 'idle':
+            response['message'] = 'idle'
+        return response
+
+    def _handler_class(self):
+        simulator = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                encoding = self.headers.get('Content-Encoding')
+                if encoding == 'gzip':
+                    body = gzip.decompress(body)
+                request = json.loads(body)
+                is_batch = isinstance(request, list)
+                with simulator._lock:
+                    simulator.connections.add(self.client_address)
+                    simulator.encodings.append(encoding)
+                    simulator.posts.append([r['action'] for r in request] if is_batch else request['action'])
+                    status = simulator.error_statuses.pop(0) if len(simulator.error_statuses) > 0 else 200
+                if status == 200 and is_batch and not simulator.accept_batches:
+                    status = 400
+                if status != 200:
+                    response = {'message': 'error {}'.format(status)}
+                else:
+                    if simulator.delay > 0:
+                        threading.Event().wait(simulator.delay * (len(request) if is_batch else 1))
+                    response = [simulator.answer(r) for r in request] if is_batch else simulator.answer(request)
+                out = json.dumps(response).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+        return Handler
+
+
+if __name__ == '__main__':
+    # run as the simulator executable, with the arguments of UnityLauncher
+    port = next(int(arg[len('-http-port='):]) for arg in sys.argv if arg.startswith('-http-port='))
+    FakeSimulator(port=port)
+    threading.Event().wait()
@@ -0,0 +1,44 @@
+import json
+import os
+import shutil
+import subprocess
+import sys
+
+_SIMULATION_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def _write_program(tmp_path, name, lines):
+    path = tmp_path / name
+    path.write_text('Task\nDescription\n\n' + '\n'.join(lines) + '\n')
+    return str(path)
+
+
+def _program_versions(package_dir, programs):
+    # the versions of a copy of evolving_graph, in a new process
+    code = 'import json, sys\nfrom evolving_graph import check_programs\n' \
+           'print(json.dumps([check_programs.program_version(f) for f in sys.argv[1:]]))'
+    output = subprocess.check_output([sys.executable, '-c', code] + programs, cwd=str(package_dir))
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def test_program_versions_change_with_the_executors_of_their_actions(tmp_path):
+    programs = [_write_program(tmp_path, 'open.txt', ['[Walk] <fridge> (1)', '[Open] <fridge> (1)']),
+                _write_program(tmp_path, 'grab.txt', ['[Walk] <cup> (2)', '[Grab] <cup> (2)'])]
+    shutil.copytree(os.path.join(_SIMULATION_DIR, '..', 'resources'), str(tmp_path / 'resources'))
+    package_dir = tmp_path / 'simulation'
+    shutil.copytree(os.path.join(_SIMULATION_DIR, 'evolving_graph'), str(package_dir / 'evolving_graph'),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    versions = _program_versions(package_dir, programs)
+    assert versions[0] != versions[1]
+
+    execution_file = package_dir / 'evolving_graph' / 'execution.py'
+    source = execution_file.read_text()
+    class_start = source.index('class OpenExecutor(')
+    execution_file.write_text(source[:class_start] + source[class_start:].replace(
+        '    def execute(', '    # changed\n    def execute(', 1))
+    open_version, grab_version = _program_versions(package_dir, programs)
+    assert open_version != versions[0]
+    assert grab_version == versions[1]
+
+    execution_file.write_text(source.replace('def _get_room_node(', '# changed\ndef _get_room_node(', 1))
+    assert all(version not in versions for version in _program_versions(package_dir, programs))
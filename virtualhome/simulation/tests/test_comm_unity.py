@@ -0,0 +1,127 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from unity_simulator.comm_unity import UnityCommunication, UnityEngineException
+
+
+def test_commands_reuse_one_connection(fake_simulator):
+    simulator = fake_simulator()
+    comm = UnityCommunication(port=str(simulator.port))
+    for _ in range(10):
+        assert comm.camera_count() == (True, 3)
+    comm.close()
+    assert len(simulator.connections) == 1
+
+
+def test_large_bodies_are_gzipped(fake_simulator):
+    simulator = fake_simulator()
+    comm = UnityCommunication(port=str(simulator.port), compress_threshold=1000)
+    graph = {'nodes': [{'id': i, 'class_name': 'cup'} for i in range(100)], 'edges': []}
+    assert comm.expand_scene(graph)[0]
+    assert comm.camera_count() == (True, 3)
+    comm.close()
+    assert simulator.posts == ['expand_scene', 'camera_count']
+    assert simulator.encodings == ['gzip', None]
+
+
+def test_repeat_retries_while_the_simulator_starts(fake_simulator):
+    simulator = fake_simulator(error_statuses=[502, 500, 504])
+    comm = UnityCommunication(port=str(simulator.port), backoff_factor=0)
+    assert comm.check_connection()
+    comm.close()
+    assert simulator.posts == ['idle'] * 4
+
+
+def test_repeat_retries_are_bounded(fake_simulator):
+    simulator = fake_simulator(error_statuses=[502] * 10)
+    comm = UnityCommunication(port=str(simulator.port), retries=2, backoff_factor=0)
+    with pytest.raises(UnityEngineException):
+        comm.check_connection()
+    comm.close()
+    assert simulator.posts == ['idle'] * 3
+
+
+def test_commands_without_repeat_are_not_retried(fake_simulator):
+    simulator = fake_simulator(error_statuses=[502])
+    comm = UnityCommunication(port=str(simulator.port), backoff_factor=0)
+    with pytest.raises(UnityEngineException):
+        comm.camera_count()
+    comm.close()
+    assert simulator.posts == ['camera_count']
+
+
+def _queue_reset(batch):
+    batch.reset(1)
+    batch.environment_graph()
+    batch.camera_count()
+    batch.add_character('Chars/Male1', initial_room='kitchen')
+    batch.environment_graph()
+    batch.camera_count()
+
+
+_RESET_ACTIONS = ['clear', 'environment', 'environment_graph', 'camera_count', 'add_character', 'environment_graph',
+                  'camera_count']
+
+
+def test_batch_is_sent_in_one_request(fake_simulator):
+    simulator = fake_simulator()
+    comm = UnityCommunication(port=str(simulator.port), batch_requests=True)
+    batch = comm.batch()
+    _queue_reset(batch)
+    results = batch.send()
+    comm.close()
+    assert simulator.posts == [_RESET_ACTIONS]
+    assert results[1] == (True, simulator.graph)
+    assert results[2] == (True, 3)
+
+
+def test_batch_falls_back_to_commands_in_order(fake_simulator):
+    simulator = fake_simulator(accept_batches=False, delay=0.01)
+    comm = UnityCommunication(port=str(simulator.port), batch_requests=True)
+    for _ in range(2):
+        batch = comm.batch()
+        _queue_reset(batch)
+        results = batch.send()
+        assert results == [True, (True, simulator.graph), (True, 3), True, (True, simulator.graph), (True, 3)]
+    comm.close()
+    assert not comm.batch_requests
+    # a keep-alive connection for the calling thread and each thread sending queries
+    assert len(simulator.connections) <= 1 + comm.pool_maxsize
+    # the rejected batch, then the commands, the consecutive queries may arrive in any order
+    assert simulator.posts[0] == _RESET_ACTIONS
+    posts = simulator.posts[1:]
+    assert len(posts) == 2 * len(_RESET_ACTIONS)
+    for i in range(0, len(posts), len(_RESET_ACTIONS)):
+        assert posts[i:i + 2] == ['clear', 'environment']
+        assert sorted(posts[i + 2:i + 4]) == ['camera_count', 'environment_graph']
+        assert posts[i + 4] == 'add_character'
+        assert sorted(posts[i + 5:i + 7]) == ['camera_count', 'environment_graph']
+
+
+def _encode_png(image):
+    return base64.b64encode(cv2.imencode('.png', image)[1].tobytes()).decode('ascii')
+
+
+def test_camera_images_keep_their_depth_and_channels(fake_simulator):
+    simulator = fake_simulator()
+    depth = np.arange(12, dtype=np.uint16).reshape(3, 4) * 1000
+    color = np.arange(36, dtype=np.uint8).reshape(3, 4, 3)
+    simulator.camera_images = [_encode_png(depth), _encode_png(color)]
+    comm = UnityCommunication(port=str(simulator.port))
+    success, images = comm.camera_image([0, 1])
+    assert success
+    assert images[0].dtype == np.uint16 and np.array_equal(images[0], depth)
+    assert np.array_equal(images[1], color)
+
+    out = np.zeros((2, 3, 4, 1), dtype=np.float32)
+    simulator.camera_images = [_encode_png(depth), _encode_png(depth)]
+    comm.camera_image([0, 1], out=out)
+    assert np.array_equal(out[1, :, :, 0], depth)
+
+    simulator.camera_images = [_encode_png(color), _encode_png(color)]
+    with pytest.raises(ValueError):
+        comm.camera_image([0, 1], out=out)
+    comm.close()
@@ -0,0 +1,41 @@
+import pytest
+
+from environment.utils import action_mask, can_perform_action
+
+_ACTIONS = ['turnleft', 'walkforward', 'turnright', 'walktowards', 'open', 'close', 'putback', 'putin', 'put', 'grab',
+            'no_action', 'walk']
+
+
+def _node(node_id, class_name, properties=(), states=()):
+    return {'id': node_id, 'class_name': class_name, 'properties': list(properties), 'states': list(states)}
+
+
+def _graph(holds):
+    nodes = [_node(1, 'character'), _node(2, 'character'), _node(3, None), _node(10, 'kitchen'),
+             _node(20, 'fridge', ['CONTAINERS'], ['CLOSED']), _node(21, 'cabinet', ['CONTAINERS'], ['OPEN']),
+             _node(22, 'microwave', ['CONTAINERS'], ['OPEN', 'CLOSED']), _node(23, 'box', ['CONTAINERS'], ['CLOSED']),
+             _node(30, 'kitchen_table', ['SURFACES']), _node(31, 'cup', ['GRABBABLE']),
+             _node(32, 'apple', ['GRABBABLE'])]
+    edges = [{'from_id': 1, 'to_id': to_id, 'relation_type': 'CLOSE'} for to_id in [2, 20, 21, 22, 30, 31]]
+    if holds:
+        edges.append({'from_id': 1, 'to_id': 31, 'relation_type': 'HOLDS_RH'})
+    return {'nodes': nodes, 'edges': edges}
+
+
+@pytest.mark.parametrize('holds', [False, True])
+@pytest.mark.parametrize('object_restrictions', [
+    None, {'objects_inside': ['fridge', 'cabinet', 'microwave'], 'objects_surface': ['kitchen_table']}])
+@pytest.mark.parametrize('teleport', [False, True])
+def test_action_mask_matches_can_perform_action(holds, object_restrictions, teleport):
+    graph = _graph(holds)
+    object_ids = [node['id'] for node in graph['nodes']]
+    mask, action_strs = action_mask(_ACTIONS, object_ids, 1, graph, object_restrictions, teleport)
+    for i, action in enumerate(_ACTIONS):
+        for j, o1_id in enumerate(object_ids):
+            action_str = can_perform_action(action, o1_id, 1, graph, object_restrictions, teleport)
+            assert mask[i, j] == (action_str is not None), (action, o1_id)
+            assert action_strs.get((i, j)) == action_str, (action, o1_id)
+    # the graph covers every rule: each action can be performed on some of the objects but not on all of them
+    assert mask[[i for i, action in enumerate(_ACTIONS) if action not in ['no_action', 'grab'] and
+                 (holds or 'put' not in action)]].any(axis=1).all()
+    assert not mask.all(axis=1).any()
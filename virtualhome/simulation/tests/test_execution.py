@@ -0,0 +1,25 @@
+from evolving_graph import utils
+from evolving_graph.environment import EnvironmentGraph, State
+from evolving_graph.execution import ScriptExecutor, TranspositionTable
+from evolving_graph.preparation import ChangeState
+from evolving_graph.scripts import read_script_from_list_string
+
+
+def _node(node_id, class_name, category, properties=(), states=()):
+    return {'id': node_id, 'class_name': class_name, 'category': category, 'properties': list(properties),
+            'states': list(states), 'prefab_name': class_name, 'bounding_box': None}
+
+
+def test_executions_with_initial_changers_are_not_reused():
+    graph = {'nodes': [_node(1, 'character', 'Characters'), _node(10, 'kitchen', 'Rooms'),
+                       _node(30, 'fridge', 'Appliances', ['CAN_OPEN', 'CONTAINERS'], ['CLOSED'])],
+             'edges': [{'from_id': 1, 'relation_type': 'INSIDE', 'to_id': 10},
+                       {'from_id': 30, 'relation_type': 'INSIDE', 'to_id': 10}]}
+    name_equivalence = utils.load_name_equivalence()
+    script = read_script_from_list_string(['[Walk] <fridge> (30)', '[Open] <fridge> (30)'])
+    table = TranspositionTable()
+    results = []
+    for states in [State.OPEN], [State.CLOSED]:
+        executor = ScriptExecutor(EnvironmentGraph(graph), name_equivalence, transposition_table=table)
+        results.append(executor.execute(script, init_changers=[ChangeState('fridge', states)])[0])
+    assert results == [False, True]
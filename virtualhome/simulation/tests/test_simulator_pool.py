@@ -0,0 +1,83 @@
+import os
+import signal
+import stat
+import sys
+import time
+
+import pytest
+
+from fake_simulator import free_base_port
+from unity_simulator.comm_unity import UnityCommunication
+from unity_simulator.simulator_pool import SimulatorPool, SimulatorPoolException
+
+
+@pytest.fixture
+def stub_executable(tmp_path):
+    # a simulator executable running FakeSimulator, on the port given by UnityLauncher
+    executable = tmp_path / 'stub.x86_64'
+    executable.write_text('#!/bin/sh\nexec "{}" "{}" "$@"\n'.format(
+        sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_simulator.py')))
+    executable.chmod(executable.stat().st_mode | stat.S_IXUSR)
+    return str(tmp_path / 'stub')
+
+
+def _pool(file_name, **kwargs):
+    kwargs = dict({'num_simulators': 2, 'num_spares': 1, 'base_port': free_base_port(6), 'max_ports': 6,
+                   'health_check_interval': 60., 'health_check_timeout': 1., 'launch_timeout': 10.}, **kwargs)
+    return SimulatorPool(file_name, **kwargs)
+
+
+def _wait(condition, timeout=10.):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.05)
+    return condition()
+
+
+def test_acquire_leases_num_simulators(stub_executable):
+    pool = _pool(stub_executable)
+    leases = [pool.acquire(), pool.acquire()]
+    assert len({lease.port for lease in leases}) == 2
+    assert all(lease.healthy() for lease in leases)
+    assert UnityCommunication(port=str(leases[0].port)).check_connection()
+    with pytest.raises(SimulatorPoolException):
+        pool.acquire(timeout=0.2)
+    leases[0].release()
+    assert pool.acquire(timeout=1.).port == leases[0].port
+    pool.close()
+    with pytest.raises(SimulatorPoolException):
+        pool.acquire()
+
+
+def test_failover_gives_the_spare(stub_executable):
+    pool = _pool(stub_executable)
+    lease = pool.acquire()
+    crashed = lease._simulator
+    crashed.launcher.proc.kill()
+    crashed.launcher.proc.wait()
+    assert not lease.healthy()
+
+    start = time.time()
+    new_lease = pool.failover(lease, timeout=1.)
+    # the spare was running, the crashed simulator is launched again in the background
+    assert time.time() - start < 1.
+    assert new_lease.port != lease.port and new_lease.healthy()
+    assert crashed not in pool._simulators
+    assert _wait(lambda: sum(simulator.ready for simulator in pool._simulators) == 3)
+    pool.close()
+
+
+def test_health_check_replaces_the_simulators_not_answering(stub_executable):
+    pool = _pool(stub_executable, health_check_interval=0.2, health_check_timeout=0.5)
+    spare = next(simulator for simulator in pool._simulators if simulator.lease is None)
+    # the process is running but does not answer
+    os.kill(spare.launcher.proc.pid, signal.SIGSTOP)
+    assert _wait(lambda: spare not in pool._simulators)
+    assert spare.launcher.proc is None
+    assert _wait(lambda: sum(simulator.ready for simulator in pool._simulators) == 3)
+    pool.close()
+
+
+def test_launch_errors_are_raised(tmp_path):
+    with pytest.raises(SimulatorPoolException, match='could not be launched'):
+        _pool(str(tmp_path / 'missing'))
@@ -0,0 +1,87 @@
+import base64
+
+import cv2
+import numpy as np
+import pytest
+
+from environment import ImageObservations, SharedImageFrames, UnityEnvironment
+from fake_simulator import scene_graph
+
+
+def test_steps_the_evolving_graph_can_not_predict_fetch_the_graph(fake_simulator):
+    simulator = fake_simulator()
+    # a character outside of the rooms, the walk executor asserts that it is in one
+    simulator.graph['edges'] = []
+    env = UnityEnvironment(num_agents=1, base_port=simulator.port, observation_types=['full'],
+                           executable_args={'batch_requests': True}, graph_resync_steps=5)
+    env.step({0: '[walk] <livingroom> (12)'})
+    env.close()
+    assert env.graph_sync_counters['fetched'] == 2
+    assert env.graph_sync_counters['predicted'] == 0
+
+def test_steps_on_missing_objects_fetch_the_graph(fake_simulator):
+    simulator = fake_simulator()
+    env = UnityEnvironment(num_agents=1, base_port=simulator.port, observation_types=['full'],
+                           executable_args={'batch_requests': True}, graph_resync_steps=5)
+    env.step({0: '[walk] <livingroom> (999)'})
+    env.close()
+    assert env.graph_sync_counters['fetched'] == 2
+    assert env.graph_sync_counters['predicted'] == 0
+
+
+
+def test_image_observations_are_rendered_once_per_step(fake_simulator):
+    simulator = fake_simulator()
+    image = np.arange(36, dtype=np.uint8).reshape(3, 4, 3)
+    simulator.camera_images = [base64.b64encode(cv2.imencode('.png', image)[1].tobytes()).decode('ascii')]
+    env = UnityEnvironment(num_agents=1, base_port=simulator.port, observation_types=['image'],
+                           executable_args={'batch_requests': True})
+    env.image_observations = ImageObservations(env, image_width=4, image_height=3)
+    frames = SharedImageFrames(*env.image_observations.spec())
+    num_renders = simulator.actions.count('camera_image')
+
+    observations = env.reset(environment_id=0)
+    assert env.get_observations()[0][0] == observations[0][0] == 0
+    assert simulator.actions.count('camera_image') == num_renders + 1
+    frame_index, view = observations[0]
+    assert np.array_equal(view, image) and np.array_equal(frames.frame(frame_index)[0], image)
+
+    observations = env.step({0: '[walk] <livingroom> (12)'})[0]
+    assert observations[0][0] == 1
+    assert simulator.actions.count('camera_image') == num_renders + 2
+    frames.close()
+    env.image_observations.close()
+    env.close()
+
+
+def test_graph_backend_rejects_the_visual_observations():
+    with pytest.raises(ValueError):
+        UnityEnvironment(num_agents=1, observation_types=['image'], backend='graph')
+    env = UnityEnvironment(num_agents=1, backend='graph', executable_args={'scenes': {0: scene_graph()}})
+    env.reset(environment_id=0)
+    with pytest.raises(ValueError):
+        env.comm.add_character(position=[0, 0, 0])
+    env.close()
+
+
+def test_graph_backend_fails_on_missing_objects():
+    env = UnityEnvironment(num_agents=1, backend='graph', executable_args={'scenes': {0: scene_graph()}})
+    env.reset(environment_id=0)
+    graph = env.get_graph()
+    success, message = env.comm.render_script(['<char0> [walk] <livingroom> (999)'])
+    env.close()
+    assert not success and '999' in message
+    assert env.comm.environment_graph()[1] == graph
+
+
+def test_prepared_scenes_are_not_changed_by_the_callers(fake_simulator):
+    simulator = fake_simulator()
+    env = UnityEnvironment(num_agents=1, base_port=simulator.port, observation_types=['full'],
+                           executable_args={'batch_requests': True}, max_prepared_scenes=2)
+    env.reset(environment_id=0, init_rooms=['kitchen'])
+    env.graph['nodes'].clear()
+    observations = env.reset(environment_id=0, init_rooms=['kitchen'])
+    env.close()
+    assert observations[0] == simulator.graph
+    assert env.graph_sync_counters['prepared'] == 1
+
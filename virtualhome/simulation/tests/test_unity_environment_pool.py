@@ -0,0 +1,41 @@
+import time
+
+from environment import UnityEnvironment, UnityEnvironmentPool
+from fake_simulator import free_base_port, scene_graph
+
+
+def test_pool_steps_the_simulators_concurrently(fake_simulator):
+    num_envs = 4
+    base_port = free_base_port(num_envs)
+    simulators = [fake_simulator(port=base_port + i, delay=0.1) for i in range(num_envs)]
+    pool = UnityEnvironmentPool(num_envs, base_port=base_port, num_agents=1,
+                                executable_args={'batch_requests': True})
+    observations = pool.reset(environment_ids=[0] * num_envs)
+    assert len(observations) == num_envs
+
+    start = time.time()
+    results = pool.step([{0: '[walk] <livingroom> (12)'}] * num_envs)
+    elapsed = time.time() - start
+    pool.close()
+    assert len(results) == num_envs
+    # each simulator got the step of its environment, and they were waited for together
+    for simulator in simulators:
+        assert 'render_script' in simulator.actions
+    step_time = 0.1 * len(simulators[0].posts[-1])
+    assert elapsed < num_envs * step_time * 0.75
+
+
+def test_pool_of_graph_environments():
+    scenes = {0: scene_graph()}
+    env_args = {'num_agents': 1, 'backend': 'graph', 'executable_args': {'scenes': scenes, 'seed': 0}}
+    pool = UnityEnvironmentPool(2, **env_args)
+    env = UnityEnvironment(**env_args)
+    observations = pool.reset(environment_ids=[0, 0], init_rooms=[['kitchen'], ['kitchen']])
+    assert observations[0] == observations[1] == env.reset(environment_id=0, init_rooms=['kitchen'])
+
+    results = pool.step([{0: '[walk] <livingroom> (12)'}] * 2)
+    expected = env.step({0: '[walk] <livingroom> (12)'})
+    pool.close()
+    env.close()
+    assert results[0][0] == results[1][0] == expected[0]
+    assert {'from_id': 1, 'relation_type': 'INSIDE', 'to_id': 12} in expected[0][0]['edges']
@@ -0,0 +1,111 @@
+import random
+
+import pytest
+
+from evolving_graph import utils
+from evolving_graph.environment import EnvironmentGraph, EnvironmentState
+from evolving_graph.execution import ScriptExecutor
+from evolving_graph.scripts import Script, parse_script_line
+from evolving_graph.vector_environment import VectorEnvironment
+
+_ACTIONS = ['Walk', 'Run', 'Find', 'Grab', 'Open', 'Close', 'SwitchOn', 'SwitchOff', 'PutObjBack', 'Sit', 'StandUp',
+            'Drop', 'Lie', 'TurnTo', 'Wipe']
+_PUT_ACTIONS = ['PutBack', 'PutIn']
+
+
+def _node(node_id, class_name, category='Props', properties=(), states=()):
+    return {'id': node_id, 'class_name': class_name, 'category': category, 'properties': list(properties),
+            'states': list(states), 'prefab_name': class_name, 'bounding_box': None}
+
+
+def _scene(num_chars=1):
+    """
+    :return: graph of four rooms with doors, containers, switches and seats, the apple is inside two containers
+    """
+    nodes = [_node(10, 'kitchen', 'Rooms'), _node(11, 'living_room', 'Rooms'), _node(12, 'bathroom', 'Rooms'),
+             _node(13, 'bedroom', 'Rooms'),
+             _node(20, 'door', 'Doors', ['CAN_OPEN'], ['OPEN']), _node(21, 'door', 'Doors', ['CAN_OPEN'], ['CLOSED']),
+             _node(30, 'fridge', 'Appliances', ['CAN_OPEN', 'HAS_SWITCH', 'CONTAINERS'], ['CLOSED', 'OFF']),
+             _node(31, 'cup', 'Props', ['GRABBABLE', 'RECIPIENT', 'MOVABLE']),
+             _node(32, 'kitchen_table', 'Furniture', ['SURFACES']),
+             _node(33, 'plate', 'Props', ['GRABBABLE', 'RECIPIENT', 'SURFACES', 'MOVABLE']),
+             _node(34, 'tv', 'Electronics', ['HAS_SWITCH', 'LOOKABLE'], ['OFF']),
+             _node(35, 'sofa', 'Furniture', ['SITTABLE', 'LIEABLE', 'SURFACES']),
+             _node(36, 'remote_control', 'Props', ['GRABBABLE', 'HAS_SWITCH', 'MOVABLE'], ['OFF']),
+             _node(37, 'toilet', 'Furniture', ['SITTABLE', 'CAN_OPEN', 'CONTAINERS'], ['CLOSED']),
+             _node(38, 'towel', 'Props', ['GRABBABLE', 'MOVABLE']),
+             _node(39, 'bed', 'Furniture', ['SITTABLE', 'LIEABLE', 'SURFACES']),
+             _node(40, 'book', 'Props', ['GRABBABLE', 'CAN_OPEN', 'MOVABLE'], ['CLOSED']),
+             _node(41, 'cabinet', 'Furniture', ['CAN_OPEN', 'CONTAINERS', 'SURFACES'], ['OPEN']),
+             _node(42, 'light', 'Lamps', ['HAS_SWITCH'], ['ON']),
+             _node(43, 'apple', 'Food', ['GRABBABLE', 'MOVABLE'])]
+    edges = [(20, 'BETWEEN', 10), (20, 'BETWEEN', 11), (21, 'BETWEEN', 11), (21, 'BETWEEN', 12),
+             (20, 'INSIDE', 10), (21, 'INSIDE', 11), (31, 'INSIDE', 30), (33, 'ON', 32), (36, 'ON', 35),
+             (40, 'INSIDE', 41), (43, 'INSIDE', 30), (43, 'INSIDE', 41), (43, 'INSIDE', 13)]
+    edges += [(node_id, 'INSIDE', room) for node_id, room in [(30, 10), (32, 10), (33, 10), (34, 11), (35, 11),
+                                                             (36, 11), (37, 12), (38, 12), (39, 13), (40, 13),
+                                                             (41, 13), (42, 11)]]
+    for char_id in range(1, num_chars + 1):
+        nodes.append(_node(char_id, 'character', 'Characters'))
+        edges.append((char_id, 'INSIDE', 10))
+    return {'nodes': nodes, 'edges': [{'from_id': a, 'relation_type': r, 'to_id': b} for a, r, b in edges]}
+
+
+def _relations(graph):
+    return (sorted((node['id'], tuple(sorted(node['states']))) for node in graph['nodes']),
+            sorted((edge['from_id'], edge['relation_type'], edge['to_id']) for edge in graph['edges']))
+
+
+def _random_line(rnd, node_ids, last_id):
+    # the object of the last line is taken again most of the times, for sequences like walk, switch on, open
+    node_id = last_id if last_id is not None and rnd.random() < 0.7 else rnd.choice(node_ids)
+    action = rnd.choice(_ACTIONS * 3 + _PUT_ACTIONS)
+    if action in _PUT_ACTIONS:
+        return '[{}] <obj> ({}) <dest> ({})'.format(action, node_id, rnd.choice(node_ids)), node_id
+    if action == 'StandUp':
+        return '[StandUp]', node_id
+    return '[{}] <obj> ({})'.format(action, node_id), node_id
+
+
+def test_steps_are_the_ones_of_the_executors(monkeypatch):
+    name_equivalence = utils.load_name_equivalence()
+    graphs = [_scene(1), _scene(2)] * 16
+    node_ids = [[node['id'] for node in graph['nodes']] for graph in graphs]
+    env = VectorEnvironment(graphs, name_equivalence)
+    executed_lines = []
+    execute_line = env._execute_line
+    monkeypatch.setattr(env, '_execute_line', lambda *args: executed_lines.append(args) or execute_line(*args))
+
+    rnd = random.Random(0)
+    states = []
+    last_ids = [None] * len(graphs)
+    for step in range(300):
+        if step % 50 == 0:
+            env.reset()
+            states = [EnvironmentState(env.graphs[b], name_equivalence, instance_selection=True)
+                      for b in range(len(graphs))]
+        lines, last_ids = zip(*[_random_line(rnd, node_ids[b], last_ids[b]) for b in range(len(graphs))])
+        char_indices = [rnd.choice([0, 1]) if b % 2 == 1 else 0 for b in range(len(graphs))]
+        success = env.step(lines, char_indices)
+        for b, line in enumerate(lines):
+            executor = ScriptExecutor(env.graphs[b], name_equivalence, char_indices[b])
+            expected, states[b] = executor.execute_one_step(Script([parse_script_line(line, 0)]), states[b])
+            assert success[b] == expected, (step, b, line)
+            assert _relations(env.to_dict(b)) == _relations(states[b].to_dict()), (step, b, line)
+    # the lines of the actions without array updates and of the apple in two containers
+    assert any(line.action.name == 'SIT' for _, line, _ in executed_lines)
+    assert any(line.object() is not None and line.object().instance == 43 for _, line, _ in executed_lines)
+
+
+def test_lines_of_a_missing_character_fail_as_in_the_executor():
+    name_equivalence = utils.load_name_equivalence()
+    graph = _scene(1)
+    env = VectorEnvironment([graph], name_equivalence)
+    state = EnvironmentState(env.graphs[0], name_equivalence, instance_selection=True)
+    line = '[Walk] <fridge> (30)'
+    with pytest.raises(AssertionError):
+        ScriptExecutor(env.graphs[0], name_equivalence, 1).execute_one_step(Script([parse_script_line(line, 0)]),
+                                                                            state)
+    with pytest.raises(AssertionError):
+        env.step([line], char_indices=1)
+    assert _relations(env.to_dict(0)) == _relations(state.to_dict())
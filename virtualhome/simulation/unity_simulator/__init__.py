@@ -1,2 +1,2 @@
-""" from .comm_unity import UnityCommunication
+""" from .comm_unity import UnityCommunication
  """
\ No newline at end of file
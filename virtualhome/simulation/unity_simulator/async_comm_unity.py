@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+from .comm_unity import _COMMANDS, _command, UnityEngineException, UnityCommunicationException
+
+
+class AsyncUnityCommunication(object):
+    """
+    asyncio client of a running simulator. It has the commands of UnityCommunication as coroutines,
+    with the same parameters and results:
+
+        comm = AsyncUnityCommunication(port='8080')
+        success, graph = await comm.environment_graph()
+
+    The commands are sent in order over one keep-alive connection, written with asyncio streams.
+    The client does not launch the executable, use UnityCommunication for that.
+
+    :param str url: which url to use to communicate
+    :param str port: which port to use to communicate
+    :param int timeout_wait: how long to wait for the response of a command
+    :param bool batch_requests: whether the simulator accepts a list of commands in one request, see `UnityCommunication`
+    """
+
+    def __init__(self, url='127.0.0.1', port='8080', timeout_wait=30, batch_requests=False):
+        self._host = url
+        self._port = int(port)
+        self.port = port
+        self.timeout_wait = timeout_wait
+        self.batch_requests = batch_requests
+        self._reader = None
+        self._writer = None
+        self._lock = None
+
+    def __getattr__(self, name):
+        if name not in _COMMANDS:
+            raise AttributeError(name)
+
+        async def command(*args, **kwargs):
+            request_dicts, parse = _command(name, args, kwargs)
+            return parse((await self.post_commands(request_dicts))[-1])
+        return command
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+    async def send(self, batch):
+        """
+        Sends the commands of a UnityCommandBatch, the batch can be built with UnityCommunication.batch
+
+        :return: list with the result of each queued call
+        """
+        return batch.parse_responses(await self.post_commands(batch.collect_commands()))
+
+    async def post_command(self, request_dict, repeat=False):
+        status, resp_dict = await self._post(request_dict)
+        if status != 200:
+            raise UnityEngineException(status, resp_dict)
+        return resp_dict
+
+    async def post_commands(self, request_dicts):
+        """
+        Sends several commands, they are executed in order
+
+        :return: list with the response of each command
+        """
+        if len(request_dicts) == 0:
+            return []
+        if self.batch_requests:
+            status, responses = await self._post(request_dicts)
+            if status == 200 and isinstance(responses, list) and len(responses) == len(request_dicts):
+                return responses
+            print('The simulator does not accept batches of commands, sending them one by one')
+            self.batch_requests = False
+        return [await self.post_command(request_dict) for request_dict in request_dicts]
+
+    async def _post(self, request):
+        data = json.dumps(request).encode('utf-8')
+        header = 'POST / HTTP/1.1\r\nHost: {}:{}\r\nContent-Type: application/json\r\nContent-Length: {}\r\n\r\n'.format(
+            self._host, self._port, len(data)).encode('latin-1')
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                # each command of a batch has the time of a command sent alone
+                timeout = self.timeout_wait * (len(request) if isinstance(request, list) else 1)
+                return await asyncio.wait_for(self._exchange(header + data), timeout)
+            except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError, ValueError) as e:
+                await self.close()
+                raise UnityCommunicationException(repr(e))
+
+    async def _exchange(self, message):
+        reused = self._writer is not None
+        if not reused:
+            self._reader, self._writer = await asyncio.open_connection(self._host, self._port)
+        self._writer.write(message)
+        await self._writer.drain()
+        status_line = await self._reader.readline()
+        if len(status_line) == 0 and reused:
+            # the simulator closed the kept-alive connection before reading the command
+            await self.close()
+            return await self._exchange(message)
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            key, value = line.decode('latin-1').split(':', 1)
+            headers[key.strip().lower()] = value.strip()
+        if 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        elif headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    # the trailers end with an empty line
+                    while (await self._reader.readline()) not in (b'\r\n', b'\n', b''):
+                        pass
+                    break
+                chunks.append((await self._reader.readexactly(size + 2))[:size])
+            body = b''.join(chunks)
+        else:
+            body = await self._reader.read()
+            headers['connection'] = 'close'
+        if headers.get('connection', '').lower() == 'close':
+            await self.close()
+        return status, json.loads(body)
@@ -1,543 +1,829 @@
-
-import base64
-import collections
-import time
-import io
-import json
-import requests
-from PIL import Image
-import cv2
-import numpy as np
-import glob
-import atexit
-from sys import platform
-import sys
-import pdb
-from . import communication
-
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
-
-class UnityCommunication(object):
-    """
-    Class to communicate with the Unity simulator and generate videos or agent behaviors
-
-    :param str url: which url to use to communicate
-    :param str port: which port to use to communicate
-    :param str file_name: location of the Unity executable. If provided, it will open the executable, if `None`, it wil assume that the executable is already running
-    :param str x_display: if using a headless server, display to use for rendering
-    :param bool no_graphics: whether to run the simualtor without graphics
-    :param bool logging: log simulator data
-    :param int timeout_wait: how long to wait until connection with the simulator is called unsuccessful
-    :param bool docker_enabled: whether the simulator is running in a docker container
-    """
-
-    def __init__(self, url='127.0.0.1', port='8080', file_name=None, x_display=None, no_graphics=False, logging=True,
-                 timeout_wait=30, docker_enabled=False):
-        self._address = 'http://' + url + ':' + port
-        self.port = port
-        self.graphics = no_graphics
-        self.x_display = x_display
-        self.launcher = None
-        self.timeout_wait = timeout_wait
-        if file_name is not None:
-            self.launcher = communication.UnityLauncher(port=port, file_name=file_name, x_display=x_display,
-                                                        no_graphics=no_graphics, logging=logging,
-                                                        docker_enabled=docker_enabled)
-            
-            if self.launcher.batchmode:
-                print('Getting connection...')
-                succeeded = False
-                tries = 0
-                while tries < 5 and not succeeded:
-                    tries += 1
-                    try:
-                        self.check_connection()
-                        succeeded = True
-                    except:
-                        time.sleep(2)
-                if not succeeded:
-                    sys.exit()
-                    
-        # collections.Iterable was depreciated in Python 3.10, ensure compatability with current Python versions
-        if not hasattr(collections, 'Iterable'):
-            collections.Iterable = collections.abc.Iterable
-
-    def requests_retry_session(
-                            self,
-                            retries=5,
-                            backoff_factor=2,
-                            status_forcelist=(500, 502, 504),
-                            session=None,
-                        ):
-        session = session or requests.Session()
-        retry = Retry(
-            total=retries,
-            read=retries,
-            connect=retries,
-            backoff_factor=backoff_factor,
-            status_forcelist=status_forcelist,
-        )
-        adapter = HTTPAdapter(max_retries=retry)
-        session.mount('http://', adapter)
-    
-        return session
-
-    def close(self):
-        if self.launcher is not None:
-            self.launcher.close()
-
-
-    def post_command(self, request_dict, repeat=False):
-        try:
-            if repeat:
-                resp = self.requests_retry_session().post(self._address, json=request_dict) 
-            else:
-                resp = requests.post(self._address, json=request_dict, timeout=self.timeout_wait)
-            if resp.status_code != requests.codes.ok:
-                print(resp)
-                raise UnityEngineException(resp.status_code, resp.json())
-            return resp.json()
-        except requests.exceptions.RequestException as e:
-            raise UnityCommunicationException(str(e))
-
-    def check_connection(self):
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'idle'}, repeat=True)
-        return response['success']
-    
-    def get_visible_objects(self, camera_index):
-        """
-        Obtain visible objects according to a given camera
-
-        :param int camera_index: the camera for which you want to check the objects. Between 0 and `camera_count-1`
-
-        :return: pair success (bool), msg: the object indices visible according to the camera
-
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'observation', 'intParams': [camera_index]})
-
-        try:
-            msg = json.loads(response['message'])
-        except Exception as e:
-            msg = response['message']
-
-        return response['success'], msg
-
-    def add_character(self, character_resource='Chars/Male1', position=None, initial_room=""):
-        """
-        Add a character in the scene. 
-
-        :param str character_resource: which game object to use for the character
-        # :param int char_index: the index of the character you want to move
-        :param list position: the position where you want to place the character
-        :param str initial_room: the room where you want to put the character, 
-        if position is not specified. If this is not specified, it places character in random location
-
-        :return: success (bool)
-        """
-        mode = 'random'
-        pos = [0, 0, 0]
-        if position is not None:
-            mode = 'fix_position'
-            pos = position
-        elif not len(initial_room) == 0:
-            assert initial_room in ["kitchen", "bedroom", "livingroom", "bathroom"]
-            mode = 'fix_room'
-
-        response = self.post_command(
-            {'id': str(time.time()), 'action': 'add_character', 
-             'stringParams':[json.dumps({
-                'character_resource': character_resource,
-                'mode': mode,
-                'character_position': {'x': pos[0], 'y': pos[1], 'z': pos[2]},
-                'initial_room': initial_room
-                })]})
-        return response['success']
-
-    def move_character(self, char_index, pos):
-        """
-        Move the character `char_index` to a new position
-
-        :param int char_index: the index of the character you want to move
-        :param list pos: the position where you want to place the character
-
-        :return: succes (bool)
-        """
-        response = self.post_command(
-            {'id': str(time.time()),
-             'action': 'move_character',
-             'stringParams':[json.dumps({
-                'char_index': char_index,
-                'character_position': {'x': pos[0], 'y': pos[1], 'z': pos[2]},
-                })]
-            })
-        return response['success']
-
-    def check(self, script_lines):
-        response = self.post_command({'id': str(time.time()), 'action': 'check_script', 'stringParams': script_lines})
-        return response['success'], response['message']
-
-    def add_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=40):
-        """
-        Add a new scene camera. The camera will be static in the scene.
-
-        :param list position: the position of the camera, with respect to the agent
-        :param list rotation: the rotation of the camera, with respect to the agent
-        :param list field_view: the field of view of the camera
-
-        :return: succes (bool)
-        """
-        cam_dict = {
-                'position': {'x': position[0], 'y': position[1], 'z': position[2]},
-                'rotation': {'x': rotation[0], 'y': rotation[1], 'z': rotation[2]},
-                'field_view': field_view
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'add_camera',
-                    'stringParams': [json.dumps(cam_dict)]})
-        return response['success'], response['message']
-
-    def update_camera(self, camera_index, position=[0,1,0], rotation=[0,0,0], field_view=40):
-        """
-        Updates an existing camera, identified by index.
-        :param int camera_index: the index of the camera you want to update
-        :param list position: the position of the camera, with respect to the agent
-        :param list rotation: the rotation of the camera, with respect to the agent
-        :param list field_view: the field of view of the camera
-
-        :return: succes (bool)
-        """
-        cam_dict = {
-
-                'position': {'x': position[0], 'y': position[1], 'z': position[2]},
-                'rotation': {'x': rotation[0], 'y': rotation[1], 'z': rotation[2]},
-                'field_view': field_view
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'update_camera',
-                    'intParams': [camera_index],
-                    'stringParams': [json.dumps(cam_dict)]})
-        return response['success'], response['message']
-
-
-    def add_character_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=60, name="new_camera"):
-        """
-        Add a new character camera. The camera will be added to every character you include in the scene, and it will move with 
-        the character. This must be called before adding any character.
-
-        :param list position: the position of the camera, with respect to the agent
-        :param list rotation: the rotation of the camera, with respect to the agent
-        :name: the name of the camera, used for recording when calling render script
-
-        :return: succes (bool)
-        """
-        cam_dict = {
-                'position': {'x': position[0], 'y': position[1], 'z': position[2]},
-                'rotation': {'x': rotation[0], 'y': rotation[1], 'z': rotation[2]},
-                'field_view': field_view,
-                'camera_name': name
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'add_character_camera',
-                    'stringParams': [json.dumps(cam_dict)]})
-        return response['success'], response['message']
-
-    def update_character_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=60, name="PERSON_FRONT"):
-        """
-        Update character camera specified by name. This must be called before adding any character.
-
-        :param list position: the position of the camera, with respect to the agent
-        :param list rotation: the rotation of the camera, with respect to the agent
-        :name: the name of the camera, used for recording when calling render script
-
-        :return: succes (bool)
-        """
-        cam_dict = {
-                'position': {'x': position[0], 'y': position[1], 'z': position[2]},
-                'rotation': {'x': rotation[0], 'y': rotation[1], 'z': rotation[2]},
-                'field_view': field_view,
-                'camera_name': name
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'update_character_camera',
-                    'stringParams': [json.dumps(cam_dict)]})
-        return response['success'], response['message']
-
-    def reset(self, environment=None):
-        """
-        Reset scene. Deletes characters and scene changes, and loads the scene in scene_index
-
-        :param int environment: integer between 0 and 49, corresponding to the apartment we want to load
-        :return: succes (bool)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'clear',
-                                  'intParams': [] if environment is None else [environment]})
-        response = self.post_command({'id': str(time.time()), 'action': 'environment',
-                                    'intParams': [] if environment is None else [environment]})
-        return response['success']
-
-    def fast_reset(self, environment=None):
-        """
-        Fast scene. Deletes characters and scene changes
-
-        :return: success (bool)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'fast_reset',
-                                  'intParams': [] if environment is None else [environment]})
-        return response['success']
-
-    def procedural_generation(self, seed=None):
-        """
-        Generates new environments through procedural generation logic.
-
-        :param int seed: integer corresponding to the seed given during generation
-        :return: success (bool), seed: (integer)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'clear_procedural',
-                                      'intParams': []})
-        response = self.post_command({'id': str(time.time()), 'action': 'procedural_generation',
-                                  'intParams': [] if seed is None else [seed]})
-        return response['success'], response['message']
-
-    def camera_count(self):
-        """
-        Returns the number of cameras in the scene, including static cameras, and cameras for each character
-
-        :return: pair success (bool), num_cameras (int)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'camera_count'})
-        return response['success'], response['value']
-
-    def character_cameras(self):
-        """
-        Returns the number of cameras in the scene
-
-        :return: pair success (bool), camera_names: (list): the names of the cameras defined fo the characters
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'character_cameras'})
-        return response['success'], response['message']
-
-    def camera_data(self, camera_indexes):
-        """
-        Returns camera data for cameras given in camera_indexes list
-
-        :param list camera_indexes: the list of cameras to return, can go from 0 to `camera_count-1`
-        :return: pair success (bool), cam_data: (list): for every camera, the matrices with the camera parameters
-        """
-        if not isinstance(camera_indexes, collections.Iterable):
-            camera_indexes = [camera_indexes]
-        response = self.post_command({'id': str(time.time()), 'action': 'camera_data',
-                                      'intParams': camera_indexes})
-        return response['success'], json.loads(response['message'])
-
-    def camera_image(self, camera_indexes, mode='normal', image_width=640, image_height=480):
-        """
-        Returns a list of renderings of cameras given in camera_indexes.
-
-        :param list camera_indexes: the list of cameras to return, can go from 0 to `camera_count-1`
-        :param str mode: what kind of camera rendering to return. Possible modes are: "normal", "seg_inst", "seg_class", "depth", "flow", "albedo", "illumination", "surf_normals"
-        :param int image_width: width of the returned images
-        :param int image_height: height of the returned iamges
-
-        :return: pair success (bool), images: (list) a list of images according to the camera rendering mode
-        """
-        if not isinstance(camera_indexes, collections.Iterable):
-            camera_indexes = [camera_indexes]
-
-        params = {'mode': mode, 'image_width': image_width, 'image_height': image_height}
-        response = self.post_command({'id': str(time.time()), 'action': 'camera_image',
-                                      'intParams': camera_indexes, 'stringParams': [json.dumps(params)]})
-        return response['success'], _decode_image_list(response['message_list'])
-
-    def instance_colors(self):
-        """
-        Return a mapping from rgb colors, shown on `seg_inst` to object `id`, specified in the environment graph.
-
-        :return: pair success (bool), mapping: (dictionary)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'instance_colors'})
-        return response['success'], json.loads(response['message'])
-
-    def environment_graph(self):
-        """
-        Returns environment graph, at the current state
-
-        :return: pair success (bool), graph: (dictionary)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'environment_graph'})
-        return response['success'], json.loads(response['message'])
-
-    def expand_scene(self, new_graph, randomize=False, random_seed=-1, animate_character=False,
-                     ignore_placing_obstacles=False, prefabs_map=None, transfer_transform=True):
-        """
-        Expands scene with the given graph. Given a starting scene without characters, it updates the scene according to new_graph, which contains a modified description of the scene. Can be used to add, move, or remove objects or change their state or size.
-
-        :param dict new_graph: a dictionary corresponding to the new graph of the form `{'nodes': ..., 'edges': ...}`
-        :param int bool randomize: a boolean indicating if the new positioni/types of objects should be random
-        :param int random_seed: seed to use for randomize. random_seed < 0 means that seed is not set
-        :param bool animate_character: boolean indicating if the added character should be frozen or not.
-        :param bool ignore_placing_obstacles: when adding new objects, if the transform is not specified, whether to consider if it collides with existing objects
-        :param dict prefabs_map: dictionary to specify which Unity game objects should be used when creating new objects
-        :param bool transfer_transform: boolean indicating if we should set the exact position of new added objects or not
-
-        :return: pair success (bool), message: (str)
-        """
-        config = {
-            'randomize': randomize, 
-            'random_seed': random_seed, 
-            'animate_character': animate_character,
-            'ignore_obstacles': ignore_placing_obstacles, 
-            'transfer_transform': transfer_transform
-        }
-        string_params = [json.dumps(config), json.dumps(new_graph)]
-        int_params = [int(randomize), random_seed]
-
-        if prefabs_map is not None:
-            string_params.append(json.dumps(prefabs_map))
-        response = self.post_command({'id': str(time.time()), 'action': 'expand_scene',
-                                      'stringParams': string_params})
-        try:
-            message = json.loads(response['message'])
-        except ValueError:
-            message = response['message']
-        return response['success'], message
-
-    def set_time(self, hours=0, minutes=0, seconds=0):
-        """
-        Set the time in the environment
-
-        :param int hours: hours in 24-hour time
-        :param int minutes: minutes in 24-hour time
-        :param int seconds: seconds in 24-hour time
-        :param int scaler: scaler is a multipler that increase/decreases time step
-
-        :return: success (bool)
-        """
-        time_dict = {
-                'hours': hours,
-                'minutes': minutes,
-                'seconds': seconds
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'set_time',
-                    'stringParams': [json.dumps(time_dict)]})
-        return response['success']
-
-    def activate_physics(self, gravity=-10):
-        """
-        Activates gravity and realistic collisions in the environment
-
-        :param list gravity: int of gravity value experienced in the environment
-
-        :return: success (bool)
-        """
-        physics_dict = {
-                'gravity': gravity
-        }
-        response = self.post_command(
-                {'id': str(time.time()), 'action': 'activate_physics',
-                    'stringParams': [json.dumps(physics_dict)]})
-        return response['success']
-
-    def remove_terrain(self):
-        """
-        remove_terrain. Deletes terrain
-
-        :return: success (bool)
-        """
-        response = self.post_command({'id': str(time.time()), 'action': 'remove_terrain',
-                                      'intParams': []})
-        return response['success']
-
-    def point_cloud(self):
-        response = self.post_command({'id': str(time.time()), 'action': 'point_cloud'})
-        return response['success'], json.loads(response['message'])
-
-    def render_script(self, script, randomize_execution=False, random_seed=-1, processing_time_limit=10,
-                      skip_execution=False, find_solution=False, output_folder='Output/', file_name_prefix="script",
-                      frame_rate=5, image_synthesis=['normal'], save_pose_data=False,
-                      image_width=640, image_height=480, recording=False,
-                      save_scene_states=False, camera_mode=['AUTO'], time_scale=1.0, skip_animation=False):
-        """
-        Executes a script in the simulator. The script can be single or multi agent, 
-        and can be used to generate a video, or just to change the state of the environment
-
-        :param list script: a list of script lines, of the form `['<char{id}> [{Action}] <{object_name}> ({object_id})']`
-        :param bool randomize_execution: randomly choose elements
-        :param int random_seed: random seed to use when randomizing execution, -1 means that the seed is not set
-        :param bool find_solution: find solution (True) or use graph ids to determine object instances (False)
-        :param int processing_time_limit: time limit for finding a solution in seconds
-        :param int skip_execution: skip rendering, only check if a solution exists
-        :param str output_folder: folder to output renderings
-        :param str file_name_prefix: prefix of created files
-        :param int frame_rate: frame rate at which to generate the video
-        :param list image_synthesis: what information to save. Can be multiple at the same time. Modes are: "normal", "seg_inst", "seg_class", "depth", "flow", "albedo", "illumination", "surf_normals". Leave empty if you don't want to generate anythign
-        :param bool save_pose_data: save pose data, a skeleton for every agent and frame
-        :param int image_width: image_height for the generated frames
-        :param int image_height: image_height for the generated frames
-        :param bool recording: whether to record data with cameras
-        :param bool save_scene_states: save scene states (this will be unused soon)
-        :param list camera_mode: list with cameras used to render data. Can be a str(i) with i being a scene camera index or one of the cameras from `character_cameras`
-        :param int time_scale: accelerate time at which actions happen
-        :param bool skip_animation: whether agent should teleport/do actions without animation (True), or perform the animations (False) 
-
-        :return: pair success (bool), message: (str)
-        """
-
-        # validate parameters
-        assert isinstance(script, list), "script must be a list of strings"
-        assert isinstance(image_synthesis, list), "image_synthesis must be a list of strings"
-        assert isinstance(camera_mode, list), "camera_mode must be a list of strings"
-        
-        params = {'randomize_execution': randomize_execution, 'random_seed': random_seed,
-                  'processing_time_limit': processing_time_limit, 'skip_execution': skip_execution,
-                  'output_folder': output_folder, 'file_name_prefix': file_name_prefix,
-                  'frame_rate': frame_rate, 'image_synthesis': image_synthesis, 
-                  'find_solution': find_solution,
-                  'save_pose_data': save_pose_data, 'save_scene_states': save_scene_states,
-                  'camera_mode': camera_mode, 'recording': recording,
-                  'image_width': image_width, 'image_height': image_height,
-                  'time_scale': time_scale, 'skip_animation': skip_animation}
-        response = self.post_command({'id': str(time.time()), 'action': 'render_script',
-                                      'stringParams': [json.dumps(params)] + script})
-
-        try:
-            message = json.loads(response['message'])
-        except ValueError:
-            message = response['message']
-        
-        return response['success'], message
-
-        
-def _decode_image(img_string):
-    img_bytes = base64.b64decode(img_string)
-    if 'PNG' == img_bytes[1:4]:
-        img_file = cv2.imdecode(np.fromstring(img_bytes, np.uint8), cv2.IMREAD_COLOR)
-    else:
-        img_file = cv2.imdecode(np.fromstring(img_bytes, np.uint8), cv2.IMREAD_ANYDEPTH+cv2.IMREAD_ANYCOLOR)
-    return img_file
-
-
-def _decode_image_list(img_string_list):
-    image_list = []
-    for img_string in img_string_list:
-        image_list.append(_decode_image(img_string))
-    return image_list
-
-
-class UnityEngineException(Exception):
-    """
-    This exception is raised when an error in communication occurs:
-    - Unity has received invalid request
-    More information is in the message.
-    """
-    def __init__(self, status_code, resp_dict):
-        resp_msg = resp_dict['message'] if 'message' in resp_dict else 'Message not available'
-        self.message = 'Unity returned response with status: {0} ({1}), message: {2}'.format(
-            status_code, requests.status_codes._codes[status_code][0], resp_msg)
-
-
-class UnityCommunicationException(Exception):
-    def __init__(self, message):
-        self.message = message
+
+import base64
+import collections
+import collections.abc
+import functools
+import gzip
+import time
+import io
+import json
+import os
+import threading
+import requests
+from PIL import Image
+import cv2
+import numpy as np
+import glob
+import inspect
+import atexit
+from sys import platform
+import sys
+import pdb
+from concurrent.futures import ThreadPoolExecutor
+from . import communication
+
+from requests.adapters import HTTPAdapter
+
+# Options
+# threads decoding the images of camera_image, cv2 releases the GIL while decoding
+image_decode_threads = min(4, os.cpu_count() or 1)
+
+class UnityCommunication(object):
+    """
+    Class to communicate with the Unity simulator and generate videos or agent behaviors
+
+    :param str url: which url to use to communicate
+    :param str port: which port to use to communicate
+    :param str file_name: location of the Unity executable. If provided, it will open the executable, if `None`, it wil assume that the executable is already running
+    :param str x_display: if using a headless server, display to use for rendering
+    :param bool no_graphics: whether to run the simualtor without graphics
+    :param bool logging: log simulator data
+    :param int timeout_wait: how long to wait until connection with the simulator is called unsuccessful
+    :param bool docker_enabled: whether the simulator is running in a docker container
+    :param int retries: how many times the commands sent with `repeat=True` are retried when the connection fails or the simulator answers 500, 502 or 504
+    :param float backoff_factor: the n-th retry waits `backoff_factor * 2 ** n` seconds
+    :param int pool_maxsize: number of threads sending the consecutive queries of a batch concurrently, each keeps its keep-alive connection with the simulator
+    :param int compress_threshold: gzip the request bodies of at least this many bytes (e.g. the graphs sent by `expand_scene`), `None` to never compress them. The simulator must accept `Content-Encoding: gzip`
+    :param bool batch_requests: whether the simulator accepts a list of commands in one request, answered with the list of their responses. If it does not, the commands of a batch are sent one by one, the consecutive queries concurrently
+    """
+
+    def __init__(self, url='127.0.0.1', port='8080', file_name=None, x_display=None, no_graphics=False, logging=True,
+                 timeout_wait=30, docker_enabled=False, retries=5, backoff_factor=2, pool_maxsize=4,
+                 compress_threshold=None, batch_requests=False):
+        self._address = 'http://' + url + ':' + port
+        self.port = port
+        self.graphics = no_graphics
+        self.x_display = x_display
+        self.launcher = None
+        self.timeout_wait = timeout_wait
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.compress_threshold = compress_threshold
+        self.batch_requests = batch_requests
+        self.pool_maxsize = pool_maxsize
+        self._executor = None
+        # one keep-alive session per thread sending commands (requests.Session is not thread-safe), the retries
+        # are done in post_command so that only the commands sent with repeat=True are retried
+        self._sessions = []
+        self._thread_sessions = threading.local()
+        self._sessions_lock = threading.Lock()
+        if file_name is not None:
+            self.launcher = communication.UnityLauncher(port=port, file_name=file_name, x_display=x_display,
+                                                        no_graphics=no_graphics, logging=logging,
+                                                        docker_enabled=docker_enabled)
+            
+            if self.launcher.batchmode:
+                print('Getting connection...')
+                succeeded = False
+                tries = 0
+                while tries < 5 and not succeeded:
+                    tries += 1
+                    try:
+                        self.check_connection()
+                        succeeded = True
+                    except:
+                        time.sleep(2)
+                if not succeeded:
+                    sys.exit()
+                    
+        # collections.Iterable was depreciated in Python 3.10, ensure compatability with current Python versions
+        if not hasattr(collections, 'Iterable'):
+            collections.Iterable = collections.abc.Iterable
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        with self._sessions_lock:
+            for session in self._sessions:
+                session.close()
+            self._sessions = []
+            self._thread_sessions = threading.local()
+        if self.launcher is not None:
+            self.launcher.close()
+
+    def _post(self, request_dict, timeout):
+        data = json.dumps(request_dict).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.compress_threshold is not None and len(data) >= self.compress_threshold:
+            data = gzip.compress(data, compresslevel=1)
+            headers['Content-Encoding'] = 'gzip'
+        # the responses are decompressed by requests when the simulator compresses them
+        return self._get_session().post(self._address, data=data, headers=headers, timeout=timeout)
+
+    def _get_session(self):
+        session = getattr(self._thread_sessions, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=1, max_retries=0))
+            with self._sessions_lock:
+                self._thread_sessions.session = session
+                self._sessions.append(session)
+        return session
+
+    def post_command(self, request_dict, repeat=False):
+        try:
+            if repeat:
+                # retried when the connection fails or the simulator answers with an error while starting
+                retry = 0
+                while True:
+                    try:
+                        resp = self._post(request_dict, None)
+                        if resp.status_code not in _RETRY_STATUS_CODES or retry >= self.retries:
+                            break
+                    except _RETRY_EXCEPTIONS:
+                        if retry >= self.retries:
+                            raise
+                    time.sleep(self.backoff_factor * 2 ** retry)
+                    retry += 1
+            else:
+                resp = self._post(request_dict, self.timeout_wait)
+            if resp.status_code != requests.codes.ok:
+                print(resp)
+                raise UnityEngineException(resp.status_code, resp.json())
+            return resp.json()
+        except requests.exceptions.RequestException as e:
+            raise UnityCommunicationException(str(e))
+
+    def post_commands(self, request_dicts):
+        """
+        Sends several commands, they are executed in order
+
+        :param list request_dicts: the commands, as given to `post_command`
+        :return: list with the response of each command
+        """
+        if len(request_dicts) == 0:
+            return []
+        if self.batch_requests:
+            responses = self._post_batch(request_dicts)
+            if responses is not None:
+                return responses
+            print('The simulator does not accept batches of commands, sending them one by one')
+            self.batch_requests = False
+        responses = []
+        start = 0
+        while start < len(request_dicts):
+            end = start + 1
+            if request_dicts[start]['action'] in _QUERY_ACTIONS:
+                while end < len(request_dicts) and request_dicts[end]['action'] in _QUERY_ACTIONS:
+                    end += 1
+            if end - start == 1:
+                responses.append(self.post_command(request_dicts[start]))
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_maxsize)
+                responses.extend(self._executor.map(self.post_command, request_dicts[start:end]))
+            start = end
+        return responses
+
+    def _post_batch(self, request_dicts):
+        try:
+            # each command of the batch has the time of a command sent alone
+            resp = self._post(request_dicts, self.timeout_wait * len(request_dicts))
+        except requests.exceptions.RequestException as e:
+            raise UnityCommunicationException(str(e))
+        if resp.status_code != requests.codes.ok:
+            return None
+        responses = resp.json()
+        if not isinstance(responses, list) or len(responses) != len(request_dicts):
+            return None
+        return responses
+
+    def batch(self):
+        """
+        Starts a batch of commands, see `UnityCommandBatch`
+
+        :return: UnityCommandBatch
+        """
+        return UnityCommandBatch(self)
+
+    def _run(self, request_dicts):
+        # the commands of a call are sent in order, the call returns the response of the last one
+        for request_dict in request_dicts:
+            response = self.post_command(request_dict)
+        return response
+
+    def check_connection(self):
+        return _parse_success(self.post_command(_request_check_connection()[0], repeat=True))
+
+    def get_visible_objects(self, camera_index):
+        """
+        Obtain visible objects according to a given camera
+
+        :param int camera_index: the camera for which you want to check the objects. Between 0 and `camera_count-1`
+
+        :return: pair success (bool), msg: the object indices visible according to the camera
+
+        """
+        return _parse_optional_json_message(self._run(_request_get_visible_objects(camera_index)))
+
+    def add_character(self, character_resource='Chars/Male1', position=None, initial_room=""):
+        """
+        Add a character in the scene. 
+
+        :param str character_resource: which game object to use for the character
+        # :param int char_index: the index of the character you want to move
+        :param list position: the position where you want to place the character
+        :param str initial_room: the room where you want to put the character, 
+        if position is not specified. If this is not specified, it places character in random location
+
+        :return: success (bool)
+        """
+        return _parse_success(self._run(_request_add_character(character_resource, position, initial_room)))
+
+    def move_character(self, char_index, pos):
+        """
+        Move the character `char_index` to a new position
+
+        :param int char_index: the index of the character you want to move
+        :param list pos: the position where you want to place the character
+
+        :return: succes (bool)
+        """
+        return _parse_success(self._run(_request_move_character(char_index, pos)))
+
+    def check(self, script_lines):
+        return _parse_message(self._run(_request_check(script_lines)))
+
+    def add_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=40):
+        """
+        Add a new scene camera. The camera will be static in the scene.
+
+        :param list position: the position of the camera, with respect to the agent
+        :param list rotation: the rotation of the camera, with respect to the agent
+        :param list field_view: the field of view of the camera
+
+        :return: succes (bool)
+        """
+        return _parse_message(self._run(_request_add_camera(position, rotation, field_view)))
+
+    def update_camera(self, camera_index, position=[0,1,0], rotation=[0,0,0], field_view=40):
+        """
+        Updates an existing camera, identified by index.
+        :param int camera_index: the index of the camera you want to update
+        :param list position: the position of the camera, with respect to the agent
+        :param list rotation: the rotation of the camera, with respect to the agent
+        :param list field_view: the field of view of the camera
+
+        :return: succes (bool)
+        """
+        return _parse_message(self._run(_request_update_camera(camera_index, position, rotation, field_view)))
+
+    def add_character_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=60, name="new_camera"):
+        """
+        Add a new character camera. The camera will be added to every character you include in the scene, and it will move with 
+        the character. This must be called before adding any character.
+
+        :param list position: the position of the camera, with respect to the agent
+        :param list rotation: the rotation of the camera, with respect to the agent
+        :name: the name of the camera, used for recording when calling render script
+
+        :return: succes (bool)
+        """
+        return _parse_message(self._run(_request_add_character_camera(position, rotation, field_view, name)))
+
+    def update_character_camera(self, position=[0,1,0], rotation=[0,0,0], field_view=60, name="PERSON_FRONT"):
+        """
+        Update character camera specified by name. This must be called before adding any character.
+
+        :param list position: the position of the camera, with respect to the agent
+        :param list rotation: the rotation of the camera, with respect to the agent
+        :name: the name of the camera, used for recording when calling render script
+
+        :return: succes (bool)
+        """
+        return _parse_message(self._run(_request_update_character_camera(position, rotation, field_view, name)))
+
+    def reset(self, environment=None):
+        """
+        Reset scene. Deletes characters and scene changes, and loads the scene in scene_index
+
+        :param int environment: integer between 0 and 49, corresponding to the apartment we want to load
+        :return: succes (bool)
+        """
+        return _parse_success(self._run(_request_reset(environment)))
+
+    def fast_reset(self, environment=None):
+        """
+        Fast scene. Deletes characters and scene changes
+
+        :return: success (bool)
+        """
+        return _parse_success(self._run(_request_fast_reset(environment)))
+
+    def procedural_generation(self, seed=None):
+        """
+        Generates new environments through procedural generation logic.
+
+        :param int seed: integer corresponding to the seed given during generation
+        :return: success (bool), seed: (integer)
+        """
+        return _parse_message(self._run(_request_procedural_generation(seed)))
+
+    def camera_count(self):
+        """
+        Returns the number of cameras in the scene, including static cameras, and cameras for each character
+
+        :return: pair success (bool), num_cameras (int)
+        """
+        return _parse_value(self._run(_request_camera_count()))
+
+    def character_cameras(self):
+        """
+        Returns the number of cameras in the scene
+
+        :return: pair success (bool), camera_names: (list): the names of the cameras defined fo the characters
+        """
+        return _parse_message(self._run(_request_character_cameras()))
+
+    def camera_data(self, camera_indexes):
+        """
+        Returns camera data for cameras given in camera_indexes list
+
+        :param list camera_indexes: the list of cameras to return, can go from 0 to `camera_count-1`
+        :return: pair success (bool), cam_data: (list): for every camera, the matrices with the camera parameters
+        """
+        return _parse_json_message(self._run(_request_camera_data(camera_indexes)))
+
+    def camera_image(self, camera_indexes, mode='normal', image_width=640, image_height=480, out=None):
+        """
+        Returns a list of renderings of cameras given in camera_indexes.
+
+        :param list camera_indexes: the list of cameras to return, can go from 0 to `camera_count-1`
+        :param str mode: what kind of camera rendering to return. Possible modes are: "normal", "seg_inst", "seg_class", "depth", "flow", "albedo", "illumination", "surf_normals"
+        :param int image_width: width of the returned images
+        :param int image_height: height of the returned iamges
+        :param ndarray out: if given, array of shape (len(camera_indexes), image_height, image_width, channels) where the images are decoded
+
+        :return: pair success (bool), images: (list) a list of images according to the camera rendering mode, `out` if given
+        """
+        return _parse_camera_image(self._run(_request_camera_image(camera_indexes, mode, image_width, image_height)),
+                                   out)
+
+    def instance_colors(self):
+        """
+        Return a mapping from rgb colors, shown on `seg_inst` to object `id`, specified in the environment graph.
+
+        :return: pair success (bool), mapping: (dictionary)
+        """
+        return _parse_json_message(self._run(_request_instance_colors()))
+
+    def environment_graph(self):
+        """
+        Returns environment graph, at the current state
+
+        :return: pair success (bool), graph: (dictionary)
+        """
+        return _parse_json_message(self._run(_request_environment_graph()))
+
+    def expand_scene(self, new_graph, randomize=False, random_seed=-1, animate_character=False,
+                     ignore_placing_obstacles=False, prefabs_map=None, transfer_transform=True):
+        """
+        Expands scene with the given graph. Given a starting scene without characters, it updates the scene according to new_graph, which contains a modified description of the scene. Can be used to add, move, or remove objects or change their state or size.
+
+        :param dict new_graph: a dictionary corresponding to the new graph of the form `{'nodes': ..., 'edges': ...}`
+        :param int bool randomize: a boolean indicating if the new positioni/types of objects should be random
+        :param int random_seed: seed to use for randomize. random_seed < 0 means that seed is not set
+        :param bool animate_character: boolean indicating if the added character should be frozen or not.
+        :param bool ignore_placing_obstacles: when adding new objects, if the transform is not specified, whether to consider if it collides with existing objects
+        :param dict prefabs_map: dictionary to specify which Unity game objects should be used when creating new objects
+        :param bool transfer_transform: boolean indicating if we should set the exact position of new added objects or not
+
+        :return: pair success (bool), message: (str)
+        """
+        return _parse_optional_json_message(self._run(_request_expand_scene(
+            new_graph, randomize, random_seed, animate_character, ignore_placing_obstacles, prefabs_map,
+            transfer_transform)))
+
+    def set_time(self, hours=0, minutes=0, seconds=0):
+        """
+        Set the time in the environment
+
+        :param int hours: hours in 24-hour time
+        :param int minutes: minutes in 24-hour time
+        :param int seconds: seconds in 24-hour time
+        :param int scaler: scaler is a multipler that increase/decreases time step
+
+        :return: success (bool)
+        """
+        return _parse_success(self._run(_request_set_time(hours, minutes, seconds)))
+
+    def activate_physics(self, gravity=-10):
+        """
+        Activates gravity and realistic collisions in the environment
+
+        :param list gravity: int of gravity value experienced in the environment
+
+        :return: success (bool)
+        """
+        return _parse_success(self._run(_request_activate_physics(gravity)))
+
+    def remove_terrain(self):
+        """
+        remove_terrain. Deletes terrain
+
+        :return: success (bool)
+        """
+        return _parse_success(self._run(_request_remove_terrain()))
+
+    def point_cloud(self):
+        return _parse_json_message(self._run(_request_point_cloud()))
+
+    def render_script(self, script, randomize_execution=False, random_seed=-1, processing_time_limit=10,
+                      skip_execution=False, find_solution=False, output_folder='Output/', file_name_prefix="script",
+                      frame_rate=5, image_synthesis=['normal'], save_pose_data=False,
+                      image_width=640, image_height=480, recording=False,
+                      save_scene_states=False, camera_mode=['AUTO'], time_scale=1.0, skip_animation=False):
+        """
+        Executes a script in the simulator. The script can be single or multi agent, 
+        and can be used to generate a video, or just to change the state of the environment
+
+        :param list script: a list of script lines, of the form `['<char{id}> [{Action}] <{object_name}> ({object_id})']`
+        :param bool randomize_execution: randomly choose elements
+        :param int random_seed: random seed to use when randomizing execution, -1 means that the seed is not set
+        :param bool find_solution: find solution (True) or use graph ids to determine object instances (False)
+        :param int processing_time_limit: time limit for finding a solution in seconds
+        :param int skip_execution: skip rendering, only check if a solution exists
+        :param str output_folder: folder to output renderings
+        :param str file_name_prefix: prefix of created files
+        :param int frame_rate: frame rate at which to generate the video
+        :param list image_synthesis: what information to save. Can be multiple at the same time. Modes are: "normal", "seg_inst", "seg_class", "depth", "flow", "albedo", "illumination", "surf_normals". Leave empty if you don't want to generate anythign
+        :param bool save_pose_data: save pose data, a skeleton for every agent and frame
+        :param int image_width: image_height for the generated frames
+        :param int image_height: image_height for the generated frames
+        :param bool recording: whether to record data with cameras
+        :param bool save_scene_states: save scene states (this will be unused soon)
+        :param list camera_mode: list with cameras used to render data. Can be a str(i) with i being a scene camera index or one of the cameras from `character_cameras`
+        :param int time_scale: accelerate time at which actions happen
+        :param bool skip_animation: whether agent should teleport/do actions without animation (True), or perform the animations (False) 
+
+        :return: pair success (bool), message: (str)
+        """
+        return _parse_optional_json_message(self._run(_request_render_script(
+            script, randomize_execution, random_seed, processing_time_limit, skip_execution, find_solution,
+            output_folder, file_name_prefix, frame_rate, image_synthesis, save_pose_data, image_width,
+            image_height, recording, save_scene_states, camera_mode, time_scale, skip_animation)))
+
+
+class UnityCommandBatch(object):
+    """
+    Queues calls to the methods of a UnityCommunication and sends their commands together with `send`,
+    which returns the result of each call in order. For instance:
+
+        batch = comm.batch()
+        batch.render_script(script)
+        batch.environment_graph()
+        (success, message), (success_graph, graph) = batch.send()
+    """
+
+    def __init__(self, comm):
+        self._comm = comm
+        self._calls = []
+
+    def __len__(self):
+        return len(self._calls)
+
+    def __getattr__(self, name):
+        if name not in _COMMANDS:
+            raise AttributeError(name)
+
+        def queue_call(*args, **kwargs):
+            self._calls.append(_command(name, args, kwargs))
+        return queue_call
+
+    def send(self):
+        """
+        :return: list with the result of each queued call
+        """
+        return self.parse_responses(self._comm.post_commands(self.collect_commands()))
+
+    def collect_commands(self):
+        """
+        :return: list with the commands of the queued calls, to be sent in order
+        """
+        return [request_dict for request_dicts, parse in self._calls for request_dict in request_dicts]
+
+    def parse_responses(self, responses):
+        """
+        Empties the batch
+
+        :param list responses: the responses to the commands given by `collect_commands`
+        :return: list with the result of each queued call
+        """
+        results = []
+        end = 0
+        for request_dicts, parse in self._calls:
+            # a call returns the result of its last command
+            end += len(request_dicts)
+            results.append(parse(responses[end - 1]))
+        self._calls = []
+        return results
+
+
+# Responses and errors after which the commands sent with repeat=True are retried
+_RETRY_STATUS_CODES = (500, 502, 504)
+_RETRY_EXCEPTIONS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                     requests.exceptions.ChunkedEncodingError)
+
+# Commands that do not change the scene, consecutive ones can be sent concurrently
+_QUERY_ACTIONS = {'idle', 'observation', 'camera_count', 'character_cameras', 'camera_data', 'camera_image',
+                  'instance_colors', 'environment_graph', 'point_cloud'}
+
+
+# The commands sent by the methods of UnityCommunication: each `_request_<name>` takes the parameters of the method
+# `name` (with its defaults applied) and returns the list of its commands, the result of the method is parsed from the
+# response of the last one by the parser of `_COMMANDS`
+
+def _request(action, int_params=None, string_params=None):
+    request_dict = {'id': str(time.time()), 'action': action}
+    if int_params is not None:
+        request_dict['intParams'] = int_params
+    if string_params is not None:
+        request_dict['stringParams'] = string_params
+    return request_dict
+
+
+def _camera_dict(position, rotation, field_view):
+    return {
+        'position': {'x': position[0], 'y': position[1], 'z': position[2]},
+        'rotation': {'x': rotation[0], 'y': rotation[1], 'z': rotation[2]},
+        'field_view': field_view
+    }
+
+
+def _camera_indexes(camera_indexes):
+    if not isinstance(camera_indexes, collections.abc.Iterable):
+        return [camera_indexes]
+    return camera_indexes
+
+
+def _request_check_connection():
+    return [_request('idle')]
+
+
+def _request_get_visible_objects(camera_index):
+    return [_request('observation', int_params=[camera_index])]
+
+
+def _request_add_character(character_resource, position, initial_room):
+    mode = 'random'
+    pos = [0, 0, 0]
+    if position is not None:
+        mode = 'fix_position'
+        pos = position
+    elif not len(initial_room) == 0:
+        assert initial_room in ["kitchen", "bedroom", "livingroom", "bathroom"]
+        mode = 'fix_room'
+    return [_request('add_character', string_params=[json.dumps({
+        'character_resource': character_resource,
+        'mode': mode,
+        'character_position': {'x': pos[0], 'y': pos[1], 'z': pos[2]},
+        'initial_room': initial_room
+    })])]
+
+
+def _request_move_character(char_index, pos):
+    return [_request('move_character', string_params=[json.dumps({
+        'char_index': char_index,
+        'character_position': {'x': pos[0], 'y': pos[1], 'z': pos[2]},
+    })])]
+
+
+def _request_check(script_lines):
+    return [_request('check_script', string_params=script_lines)]
+
+
+def _request_add_camera(position, rotation, field_view):
+    return [_request('add_camera', string_params=[json.dumps(_camera_dict(position, rotation, field_view))])]
+
+
+def _request_update_camera(camera_index, position, rotation, field_view):
+    return [_request('update_camera', int_params=[camera_index],
+                     string_params=[json.dumps(_camera_dict(position, rotation, field_view))])]
+
+
+def _request_add_character_camera(position, rotation, field_view, name):
+    cam_dict = _camera_dict(position, rotation, field_view)
+    cam_dict['camera_name'] = name
+    return [_request('add_character_camera', string_params=[json.dumps(cam_dict)])]
+
+
+def _request_update_character_camera(position, rotation, field_view, name):
+    cam_dict = _camera_dict(position, rotation, field_view)
+    cam_dict['camera_name'] = name
+    return [_request('update_character_camera', string_params=[json.dumps(cam_dict)])]
+
+
+def _request_reset(environment):
+    int_params = [] if environment is None else [environment]
+    return [_request('clear', int_params=int_params), _request('environment', int_params=int_params)]
+
+
+def _request_fast_reset(environment):
+    return [_request('fast_reset', int_params=[] if environment is None else [environment])]
+
+
+def _request_procedural_generation(seed):
+    return [_request('clear_procedural', int_params=[]),
+            _request('procedural_generation', int_params=[] if seed is None else [seed])]
+
+
+def _request_camera_count():
+    return [_request('camera_count')]
+
+
+def _request_character_cameras():
+    return [_request('character_cameras')]
+
+
+def _request_camera_data(camera_indexes):
+    return [_request('camera_data', int_params=_camera_indexes(camera_indexes))]
+
+
+def _request_camera_image(camera_indexes, mode, image_width, image_height):
+    params = {'mode': mode, 'image_width': image_width, 'image_height': image_height}
+    return [_request('camera_image', int_params=_camera_indexes(camera_indexes), string_params=[json.dumps(params)])]
+
+
+def _request_instance_colors():
+    return [_request('instance_colors')]
+
+
+def _request_environment_graph():
+    return [_request('environment_graph')]
+
+
+def _request_expand_scene(new_graph, randomize, random_seed, animate_character, ignore_placing_obstacles,
+                          prefabs_map, transfer_transform):
+    config = {
+        'randomize': randomize,
+        'random_seed': random_seed,
+        'animate_character': animate_character,
+        'ignore_obstacles': ignore_placing_obstacles,
+        'transfer_transform': transfer_transform
+    }
+    string_params = [json.dumps(config), json.dumps(new_graph)]
+    if prefabs_map is not None:
+        string_params.append(json.dumps(prefabs_map))
+    return [_request('expand_scene', string_params=string_params)]
+
+
+def _request_set_time(hours, minutes, seconds):
+    time_dict = {
+        'hours': hours,
+        'minutes': minutes,
+        'seconds': seconds
+    }
+    return [_request('set_time', string_params=[json.dumps(time_dict)])]
+
+
+def _request_activate_physics(gravity):
+    return [_request('activate_physics', string_params=[json.dumps({'gravity': gravity})])]
+
+
+def _request_remove_terrain():
+    return [_request('remove_terrain', int_params=[])]
+
+
+def _request_point_cloud():
+    return [_request('point_cloud')]
+
+
+def _request_render_script(script, randomize_execution, random_seed, processing_time_limit, skip_execution,
+                           find_solution, output_folder, file_name_prefix, frame_rate, image_synthesis,
+                           save_pose_data, image_width, image_height, recording, save_scene_states, camera_mode,
+                           time_scale, skip_animation):
+    # validate parameters
+    assert isinstance(script, list), "script must be a list of strings"
+    assert isinstance(image_synthesis, list), "image_synthesis must be a list of strings"
+    assert isinstance(camera_mode, list), "camera_mode must be a list of strings"
+
+    params = {'randomize_execution': randomize_execution, 'random_seed': random_seed,
+              'processing_time_limit': processing_time_limit, 'skip_execution': skip_execution,
+              'output_folder': output_folder, 'file_name_prefix': file_name_prefix,
+              'frame_rate': frame_rate, 'image_synthesis': image_synthesis,
+              'find_solution': find_solution,
+              'save_pose_data': save_pose_data, 'save_scene_states': save_scene_states,
+              'camera_mode': camera_mode, 'recording': recording,
+              'image_width': image_width, 'image_height': image_height,
+              'time_scale': time_scale, 'skip_animation': skip_animation}
+    return [_request('render_script', string_params=[json.dumps(params)] + script)]
+
+
+def _parse_success(response):
+    return response['success']
+
+
+def _parse_message(response):
+    return response['success'], response['message']
+
+
+def _parse_json_message(response):
+    return response['success'], json.loads(response['message'])
+
+
+def _parse_optional_json_message(response):
+    try:
+        message = json.loads(response['message'])
+    except ValueError:
+        message = response['message']
+    return response['success'], message
+
+
+def _parse_value(response):
+    return response['success'], response['value']
+
+
+def _parse_camera_image(response, out=None):
+    return response['success'], _decode_image_list(response['message_list'], out)
+
+
+# The request and the parser of each method of UnityCommunication sending commands
+_COMMANDS = {
+    'check_connection': (_request_check_connection, _parse_success),
+    'get_visible_objects': (_request_get_visible_objects, _parse_optional_json_message),
+    'add_character': (_request_add_character, _parse_success),
+    'move_character': (_request_move_character, _parse_success),
+    'check': (_request_check, _parse_message),
+    'add_camera': (_request_add_camera, _parse_message),
+    'update_camera': (_request_update_camera, _parse_message),
+    'add_character_camera': (_request_add_character_camera, _parse_message),
+    'update_character_camera': (_request_update_character_camera, _parse_message),
+    'reset': (_request_reset, _parse_success),
+    'fast_reset': (_request_fast_reset, _parse_success),
+    'procedural_generation': (_request_procedural_generation, _parse_message),
+    'camera_count': (_request_camera_count, _parse_value),
+    'character_cameras': (_request_character_cameras, _parse_message),
+    'camera_data': (_request_camera_data, _parse_json_message),
+    'camera_image': (_request_camera_image, _parse_camera_image),
+    'instance_colors': (_request_instance_colors, _parse_json_message),
+    'environment_graph': (_request_environment_graph, _parse_json_message),
+    'expand_scene': (_request_expand_scene, _parse_optional_json_message),
+    'set_time': (_request_set_time, _parse_success),
+    'activate_physics': (_request_activate_physics, _parse_success),
+    'remove_terrain': (_request_remove_terrain, _parse_success),
+    'point_cloud': (_request_point_cloud, _parse_json_message),
+    'render_script': (_request_render_script, _parse_optional_json_message),
+}
+
+
+def _command(name, args, kwargs):
+    """
+    Builds the commands of a call to the method `name` of UnityCommunication
+
+    :return: pair with the list of commands and the function giving the result of the call from the response of the last one
+    """
+    request, parse = _COMMANDS[name]
+    arguments = inspect.signature(getattr(UnityCommunication, name)).bind(None, *args, **kwargs)
+    arguments.apply_defaults()
+    # the parameters of the method not sent to the simulator (e.g. the `out` of camera_image) are given to the parser
+    request_params = inspect.signature(request).parameters
+    parse_kwargs = {key: value for key, value in arguments.arguments.items()
+                    if key != 'self' and key not in request_params}
+    request_kwargs = {key: value for key, value in arguments.arguments.items() if key in request_params}
+    return request(**request_kwargs), functools.partial(parse, **parse_kwargs)
+
+
+def _decode_image(img_string, out=None):
+    img_bytes = base64.b64decode(img_string)
+    # the depth and channels of the images are kept (e.g. 16 bits or grayscale PNG, EXR depth)
+    img_file = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_ANYDEPTH+cv2.IMREAD_ANYCOLOR)
+    if out is not None:
+        if img_file is None or img_file.shape[:2] != out.shape[:2] or img_file.size != out.size:
+            raise ValueError('Image of shape {} does not fit the output of shape {}'.format(
+                None if img_file is None else img_file.shape, out.shape))
+        np.copyto(out, img_file.reshape(out.shape), casting='unsafe')
+        return out
+    return img_file
+
+
+_decode_executor = None
+
+
+def _decode_image_list(img_string_list, out=None):
+    global _decode_executor
+    outs = [None] * len(img_string_list) if out is None else out
+    if len(img_string_list) < 2 or image_decode_threads < 2:
+        image_list = [_decode_image(img_string, img_out) for img_string, img_out in zip(img_string_list, outs)]
+    else:
+        if _decode_executor is None:
+            _decode_executor = ThreadPoolExecutor(max_workers=image_decode_threads)
+        image_list = list(_decode_executor.map(_decode_image, img_string_list, outs))
+    return image_list if out is None else out
+
+
+class UnityEngineException(Exception):
+    """
+    This exception is raised when an error in communication occurs:
+    - Unity has received invalid request
+    More information is in the message.
+    """
+    def __init__(self, status_code, resp_dict):
+        resp_msg = resp_dict['message'] if 'message' in resp_dict else 'Message not available'
+        self.message = 'Unity returned response with status: {0} ({1}), message: {2}'.format(
+            status_code, requests.status_codes._codes[status_code][0], resp_msg)
+
+
+class UnityCommunicationException(Exception):
+    def __init__(self, message):
+        self.message = message
@@ -0,0 +1,261 @@
+import atexit
+import threading
+import time
+
+from . import communication
+from .comm_unity import UnityCommunication, UnityEngineException, UnityCommunicationException
+
+
+class SimulatorPool(object):
+    """
+    Keeps num_simulators + num_spares simulator executables running, on ports of [base_port, base_port + max_ports),
+    and hands out leases of num_simulators of them:
+
+        pool = SimulatorPool('linux_exec.v2.3.0', num_simulators=4)
+        lease = pool.acquire()
+        comm = UnityCommunication(port=str(lease.port))
+        ...
+        lease = pool.failover(lease)  # after a crash, the simulator of a warm spare
+
+    A thread checks the simulators every health_check_interval seconds. The free ones that do not answer and the
+    ones whose process exited are killed and launched again on another port, in the background, so that a failover
+    does not wait for a simulator to start as long as there are spares.
+
+    :param str file_name: location of the Unity executable, as in `UnityLauncher`
+    :param int num_simulators: number of leases
+    :param int num_spares: number of simulators kept running besides the leased ones
+    :param int base_port: first port of the simulators
+    :param int max_ports: number of ports used, 2 * (num_simulators + num_spares) if None. The relaunched simulators
+        take the next free port, so that the clients of a stopped simulator can not reach the new one
+    :param float health_check_interval: seconds between the health checks
+    :param float health_check_timeout: how long a simulator has to answer a health check
+    :param float launch_timeout: how long a simulator has to answer after being launched
+    """
+
+    def __init__(self, file_name, num_simulators=1, num_spares=1, base_port=8080, max_ports=None,
+                 health_check_interval=10., health_check_timeout=5., launch_timeout=120., x_display=None,
+                 no_graphics=False, logging=False):
+        self.file_name = file_name
+        self.num_simulators = num_simulators
+        self.num_spares = num_spares
+        self.ports = list(range(base_port, base_port + (2 * (num_simulators + num_spares) if max_ports is None
+                                                         else max_ports)))
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.launch_timeout = launch_timeout
+        self.launch_args = {'x_display': x_display, 'no_graphics': no_graphics, 'logging': logging}
+        self._cond = threading.Condition()
+        self._simulators = []
+        self._next_port = 0
+        self._closed = threading.Event()
+        atexit.register(self.close)
+
+        with self._cond:
+            for _ in range(num_simulators + num_spares):
+                self._launch()
+            self._cond.wait_for(lambda: all(not simulator.starting for simulator in self._simulators))
+            num_ready = sum(simulator.ready for simulator in self._simulators)
+            errors = [simulator.error for simulator in self._simulators if simulator.error is not None]
+        if num_ready < num_simulators:
+            self.close()
+            raise SimulatorPoolException('{} of the {} simulators started{}'.format(
+                num_ready, num_simulators, ''.join(', ' + error for error in errors)))
+        self._monitor = threading.Thread(target=self._monitor_health, daemon=True)
+        self._monitor.start()
+
+    def acquire(self, timeout=None):
+        """
+        Leases a running simulator, waiting until one is free
+
+        :param float timeout: seconds to wait, None to wait until there is one
+        :return: SimulatorLease
+        """
+        def free_simulator():
+            if sum(simulator.lease is not None for simulator in self._simulators) >= self.num_simulators:
+                return None
+            return next((simulator for simulator in self._simulators
+                         if simulator.ready and simulator.lease is None), None)
+
+        with self._cond:
+            simulator = self._cond.wait_for(lambda: self._closed.is_set() or free_simulator(), timeout)
+            if self._closed.is_set():
+                raise SimulatorPoolException('The simulator pool is closed')
+            if simulator is None:
+                raise SimulatorPoolException('No simulator available after {} seconds'.format(timeout))
+            simulator.lease = SimulatorLease(self, simulator)
+            return simulator.lease
+
+    def release(self, lease):
+        """
+        Returns the simulator of lease to the pool. It is launched again if it is not healthy
+        """
+        simulator = lease._simulator
+        with self._cond:
+            if simulator.lease is not lease:
+                return
+            simulator.lease = None
+            stopped = None
+            if not simulator.ready or not simulator.alive():
+                stopped = self._replace(simulator)
+            self._cond.notify_all()
+        if stopped is not None:
+            stopped.close()
+
+    def failover(self, lease, timeout=None):
+        """
+        Replaces the simulator of lease, e.g. after it crashed or stopped answering: it is killed and launched
+        again in the background, and a new lease is given, of a running spare if there is one
+
+        :return: SimulatorLease
+        """
+        simulator = lease._simulator
+        with self._cond:
+            if simulator.lease is lease:
+                simulator.ready = False
+        self.release(lease)
+        return self.acquire(timeout)
+
+    def check_health(self):
+        """
+        Checks the simulators, and launches again the ones not healthy that are not leased. The leased ones
+        are only checked to be running, the health check would wait behind their commands
+        """
+        with self._cond:
+            simulators = [simulator for simulator in self._simulators if simulator.ready]
+        failed = [simulator for simulator in simulators
+                  if not simulator.alive() or (simulator.lease is None and not self._answers(simulator))]
+        stopped = []
+        with self._cond:
+            for simulator in failed:
+                simulator.ready = False
+            for simulator in list(self._simulators):
+                if not simulator.ready and not simulator.starting and simulator.lease is None:
+                    stopped.append(self._replace(simulator))
+        for launcher in stopped:
+            if launcher is not None:
+                launcher.close()
+
+    def close(self):
+        with self._cond:
+            self._closed.set()
+            launchers = [simulator.launcher for simulator in self._simulators if simulator.launcher is not None]
+            self._simulators = []
+            self._cond.notify_all()
+        for launcher in launchers:
+            launcher.close()
+
+    def _monitor_health(self):
+        while not self._closed.wait(self.health_check_interval):
+            self.check_health()
+
+    def _launch(self):
+        # called with the lock, the simulator is started in the background
+        simulator = _Simulator(self._free_port(), self.health_check_timeout)
+        self._simulators.append(simulator)
+        threading.Thread(target=self._start, args=(simulator,), daemon=True).start()
+
+    def _replace(self, simulator):
+        # called with the lock, returns the launcher to close
+        self._simulators.remove(simulator)
+        if not self._closed.is_set():
+            self._launch()
+        return simulator.launcher
+
+    def _free_port(self):
+        used_ports = {simulator.port for simulator in self._simulators}
+        for _ in range(len(self.ports)):
+            port = self.ports[self._next_port]
+            self._next_port = (self._next_port + 1) % len(self.ports)
+            if port not in used_ports and _port_free(port):
+                return port
+        raise SimulatorPoolException('No free port in {}-{}'.format(self.ports[0], self.ports[-1]))
+
+    def _start(self, simulator):
+        ready = False
+        try:
+            simulator.launcher = communication.UnityLauncher(port=simulator.port, file_name=self.file_name,
+                                                             **self.launch_args)
+            deadline = time.time() + self.launch_timeout
+            while not ready and simulator.alive() and time.time() < deadline and not self._closed.is_set():
+                ready = self._answers(simulator)
+                if not ready:
+                    time.sleep(0.2)
+            if not ready and not self._closed.is_set():
+                simulator.error = 'the simulator on port {} did not answer'.format(simulator.port)
+        except Exception as e:
+            # the simulator is not ready, the pool raises the error if it can not start
+            simulator.error = 'the simulator on port {} could not be launched: {}'.format(simulator.port, e)
+        with self._cond:
+            simulator.starting = False
+            simulator.ready = ready
+            closed = simulator not in self._simulators
+            self._cond.notify_all()
+        if closed and simulator.launcher is not None:
+            simulator.launcher.close()
+
+    def _answers(self, simulator):
+        try:
+            return simulator.comm.post_command({'id': str(time.time()), 'action': 'idle'})['success']
+        except (UnityEngineException, UnityCommunicationException):
+            return False
+
+
+class SimulatorLease(object):
+    """
+    A simulator of a SimulatorPool, used by one client until released. It can be used as a context manager
+
+    :param int port: the port of the simulator
+    """
+
+    def __init__(self, pool, simulator):
+        self.pool = pool
+        self.port = simulator.port
+        self._simulator = simulator
+
+    def healthy(self):
+        """
+        :return: whether the simulator is running and passed its health checks
+        """
+        return self._simulator.ready and self._simulator.alive()
+
+    def release(self):
+        self.pool.release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+
+class _Simulator(object):
+
+    def __init__(self, port, timeout_wait):
+        self.port = port
+        self.launcher = None
+        # the client of the health checks, the commands without repeat fail after timeout_wait
+        self.comm = UnityCommunication(port=str(port), timeout_wait=timeout_wait)
+        self.starting = True
+        self.ready = False
+        self.lease = None
+        self.error = None  # why the launch failed
+
+    def alive(self):
+        return self.launcher is not None and self.launcher.proc is not None and self.launcher.proc.poll() is None
+
+
+def _port_free(port):
+    try:
+        communication.UnityLauncher.check_port(port)
+        return True
+    except Exception:
+        # check_port raises an Exception when the port is in use
+        return False
+
+
+class SimulatorPoolException(Exception):
+    def __init__(self, message):
+        self.message = message
+
+    def __str__(self):
+        return self.message